@@ -0,0 +1,125 @@
+"""Benchmark every read-only query against a data folder.
+
+    python benchmark.py                                   # the real data
+    python synthetic_data.py --scale 10 && python benchmark.py --data-dir "synthetic csvs/x10"
+
+Each query runs once cold (building whatever lazy store it needs), then
+--repeat more times with the result cache cleared before every run, so the
+median and p95 are the cost of answering it, not of a cache hit. Its peak
+Python allocation is measured in one more run under tracemalloc. Names and
+seasons are picked from the loaded data: the busiest player, team pair,
+venue, umpire and season. The renames (choices 20 and 21) write the CSVs
+and are left out.
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+import numpy as np
+
+import main_code
+
+
+def busiest(ids, resolver):
+    """Name of the most frequent id."""
+    values, counts = np.unique(np.asarray(ids), return_counts=True)
+    return resolver.name(int(values[counts.argmax()]))
+
+
+def sample_params():
+    """Parameters for every query, picked from the loaded data."""
+    d = main_code.delivery
+    r = main_code.resolvers
+    player = busiest(d['batter_id'], r['player'])
+    bowler_id = int(d['bowler_id'].value_counts().idxmax())
+    bowler = r['player'].name(bowler_id)
+    batter = busiest(d.loc[d['bowler_id'] == bowler_id, 'batter_id'], r['player'])
+    pairs = main_code.match_teams[['team_id1', 'team_id2']].to_numpy()
+    pair = np.unique(np.sort(pairs, axis=1), axis=0, return_counts=True)
+    team1, team2 = (r['team'].name(int(t)) for t in pair[0][pair[1].argmax()])
+    team = busiest(pairs.ravel(), r['team'])
+    venue = busiest(main_code.match['venue_id'], r['venue'])
+    umpire = busiest(main_code.umpire_match[['umpire_id1', 'umpire_id2']].to_numpy().ravel(), r['umpire'])
+    season = str(main_code.match['season'].value_counts().idxmax())
+    values = {'player': player, 'bowler': bowler, 'batter': batter,
+              'team1': team1, 'team2': team2, 'team': team, 'venue_name': venue,
+              'umpire_name': umpire, 'season': season}
+    return {choice: {name: values[name] for name, _ in spec if name in values}
+            for choice, (_, _, spec, _) in main_code.QUERIES.items()}
+
+
+def timed_run(choice, params):
+    main_code.cache.clear()
+    return main_code.run_query(choice, params)
+
+
+def bench_query(choice, params, repeat):
+    result, cold = timed_run(choice, params)
+    times = [timed_run(choice, params)[1] for _ in range(repeat)]
+    tracemalloc.start()
+    timed_run(choice, params)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'choice': choice,
+        'query': main_code.QUERIES[choice][0],
+        'params': params,
+        'ok': result['ok'],
+        'cold_s': round(cold, 6),
+        'median_s': round(float(np.median(times)), 6),
+        'p95_s': round(float(np.percentile(times, 95)), 6),
+        'peak_mb': round(peak / 1e6, 3),
+    }
+
+
+def run(data_dir, repeat, choices=None):
+    start = time.perf_counter()
+    main_code.load_data(data_dir)
+    report = {'data_dir': data_dir, 'rows': len(main_code.delivery), 'repeat': repeat,
+              'load_s': round(time.perf_counter() - start, 6), 'queries': []}
+    params = sample_params()
+    for choice in choices or main_code.QUERIES:
+        if choice in main_code.RENAME_TAGS:
+            continue
+        report['queries'].append(bench_query(choice, params[choice], repeat))
+    return report
+
+
+def print_report(report):
+    print(f"{report['data_dir']}: {report['rows']} deliveries, loaded in {report['load_s']:.3f}s, "
+          f"{report['repeat']} runs per query")
+    print(f"{'#':>3} {'median ms':>10} {'p95 ms':>10} {'cold ms':>10} {'peak MB':>9}  query")
+    for q in report['queries']:
+        flag = '' if q['ok'] else '  (not found)'
+        print(f"{q['choice']:>3} {q['median_s'] * 1000:>10.2f} {q['p95_s'] * 1000:>10.2f} "
+              f"{q['cold_s'] * 1000:>10.2f} {q['peak_mb']:>9.2f}  {q['query'][:60]}{flag}")
+
+
+def parse_choices(text):
+    """'1-5,8' -> [1, 2, 3, 4, 5, 8]."""
+    choices = []
+    for part in text.split(','):
+        lo, _, hi = part.partition('-')
+        choices.extend(range(int(lo), int(hi or lo) + 1))
+    return choices
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every query against a data folder")
+    parser.add_argument('--data-dir', default=main_code.DATA_DIR,
+                        help="folder holding the normalized CSVs (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per query (default: %(default)s)")
+    parser.add_argument('--queries', type=parse_choices, metavar='LIST',
+                        help="choices to run, e.g. 1-5,8 (default: all)")
+    parser.add_argument('--output', metavar='FILE', help="also write the report as JSON")
+    args = parser.parse_args(argv)
+    report = run(args.data_dir, args.repeat, args.queries)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Compressed-sparse-row style offset index over one integer column.
+
+The row positions of a table are sorted once by the key column (a stable
+argsort, so rows keep their original order within a key). Every distinct
+key then owns one contiguous slice of that permutation, delimited by an
+offsets array, and looking up a key's rows is a binary search plus a slice:
+O(log keys + result) instead of a boolean mask over the whole table.
+
+A categorical column is indexed by its integer codes: pass the codes and
+the categories, and keys are then looked up by label. Since the rows of
+one category are one slice, a filter on a few categories (a season, say)
+reads just those partitions.
+"""
+import numpy as np
+
+
+class CSRIndex:
+
+    def __init__(self, values, categories=None):
+        values = np.asarray(values)
+        self.categories = categories
+        self.perm = np.argsort(values, kind='stable')
+        sorted_values = values[self.perm]
+        self.keys, starts = np.unique(sorted_values, return_index=True)
+        self.offsets = np.append(starts, len(values)).astype(np.int64)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _slot(self, key):
+        if self.categories is not None:
+            if key not in self.categories:
+                return None
+            key = self.categories.get_loc(key)
+        i = np.searchsorted(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return i
+        return None
+
+    def count(self, key):
+        """Number of rows with key."""
+        i = self._slot(key)
+        return 0 if i is None else int(self.offsets[i + 1] - self.offsets[i])
+
+    def rows(self, key):
+        """Row positions holding key, in table order."""
+        i = self._slot(key)
+        if i is None:
+            return self.perm[:0]
+        return self.perm[self.offsets[i]:self.offsets[i + 1]]
+
+    def rows_many(self, keys):
+        """Row positions holding any of keys, grouped by key."""
+        slices = [self.rows(key) for key in keys]
+        return np.concatenate(slices) if slices else self.perm[:0]
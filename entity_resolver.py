@@ -0,0 +1,176 @@
+"""Name resolution for players, teams, venues and umpires.
+
+Every query used to lower-case and scan a whole table to turn a typed name
+into an id, sometimes with an exact comparison and sometimes with
+``str.contains``, so the same input resolved differently from one query to
+the next. An EntityResolver is built once per table at load and answers all
+of those lookups the same way:
+
+1. an exact match on the normalized name (hash map),
+2. otherwise a unique prefix match on the full name or on any word of it
+   (prefix trie, also used for autocomplete),
+3. otherwise a unique closest match within a small edit distance.
+
+Several ids can carry the same name (a venue recorded under a few ids);
+such ids count as one match and resolve to the lowest of them, the id an
+exact lookup returns.
+"""
+import re
+import unicodedata
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def normalize_name(name):
+    """Lower-case name, strip accents and collapse punctuation and spaces."""
+    if name is None:
+        return ''
+    text = unicodedata.normalize('NFKD', str(name))
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    return _NON_ALNUM.sub(' ', text).strip()
+
+
+def bounded_edit_distance(a, b, bound):
+    """Levenshtein distance between a and b, or bound + 1 once it exceeds bound."""
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+        if min(cur) > bound:
+            return bound + 1
+        prev = cur
+    return prev[-1] if prev[-1] <= bound else bound + 1
+
+
+class _TrieNode:
+    __slots__ = ('children', 'ids')
+
+    def __init__(self):
+        self.children = {}
+        self.ids = set()
+
+
+class EntityResolver:
+    """Resolve free-text names to ids for one entity table."""
+
+    def __init__(self, ids, names):
+        self.names = {}
+        for entity_id, name in zip(ids, names):
+            if isinstance(name, str):
+                self.names[int(entity_id)] = name
+        self._build()
+
+    @classmethod
+    def from_frame(cls, df, id_col, name_col):
+        return cls(df[id_col].tolist(), df[name_col].tolist())
+
+    def _build(self):
+        self._exact = {}
+        self._keys = {}
+        self._trie = _TrieNode()
+        for entity_id in sorted(self.names):
+            key = normalize_name(self.names[entity_id])
+            self._keys[entity_id] = key
+            self._exact.setdefault(key, entity_id)
+            words = key.split()
+            # index the full name and every word in it, so "kohli" finds "V Kohli"
+            for start in range(len(words)):
+                node = self._trie
+                for ch in ' '.join(words[start:]):
+                    node = node.children.setdefault(ch, _TrieNode())
+                    node.ids.add(entity_id)
+
+    def rename(self, entity_id, new_name):
+        """Point entity_id at new_name and rebuild the indexes."""
+        self.names[int(entity_id)] = new_name
+        self._build()
+
+    def name(self, entity_id):
+        return self.names.get(int(entity_id))
+
+    def prefix_ids(self, prefix):
+        """Ids whose name, or any word of it, starts with prefix."""
+        node = self._trie
+        for ch in normalize_name(prefix):
+            node = node.children.get(ch)
+            if node is None:
+                return set()
+        return node.ids
+
+    def complete(self, prefix, limit=10):
+        """Autocomplete prefix into at most limit distinct names, alphabetically."""
+        return sorted({self.names[i] for i in self.prefix_ids(prefix)})[:limit]
+
+    def fuzzy(self, name, max_distance=None):
+        """Return [(distance, id)] within max_distance of name, closest first.
+
+        The distance is taken against the full normalized name and against
+        each of its words, whichever is smaller.
+        """
+        key = normalize_name(name)
+        if not key:
+            return []
+        if max_distance is None:
+            max_distance = min(3, max(1, len(key) // 4))
+        hits = []
+        for entity_id, target in self._keys.items():
+            best = bounded_edit_distance(key, target, max_distance)
+            if best and ' ' not in key:
+                for word in target.split():
+                    if len(word) >= 3:
+                        best = min(best, bounded_edit_distance(key, word, max_distance))
+            if best <= max_distance:
+                hits.append((best, entity_id))
+        return sorted(hits, key=lambda h: (h[0], self.names[h[1]]))
+
+    def resolve(self, name, exact=False):
+        """Return the id for name, or None when it is unknown or ambiguous.
+
+        With exact=True only the normalized hash map is consulted, which is
+        what renames use so that they never touch the wrong row.
+        """
+        key = normalize_name(name)
+        if not key:
+            return None
+        if key in self._exact:
+            return self._exact[key]
+        if exact:
+            return None
+        keys = {self._keys[i] for i in self.prefix_ids(key)}
+        if len(keys) == 1:
+            return self._exact[keys.pop()]
+        if keys:
+            return None
+        hits = self._distinct(self.fuzzy(key))
+        if len(hits) == 1 or (len(hits) > 1 and hits[0][0] < hits[1][0]):
+            return hits[0][1]
+        return None
+
+    def _distinct(self, hits):
+        """hits with one (distance, id) per normalized name, the first kept."""
+        seen = set()
+        distinct = []
+        for distance, entity_id in hits:
+            if self._keys[entity_id] not in seen:
+                seen.add(self._keys[entity_id])
+                distinct.append((distance, self._exact[self._keys[entity_id]]))
+        return distinct
+
+    def candidates(self, name, limit=5):
+        """Ranked distinct names for name: exact match, prefix matches, then fuzzy ones."""
+        key = normalize_name(name)
+        ranked = []
+        if key in self._exact:
+            ranked.append(self._exact[key])
+        ranked.extend(sorted(self.prefix_ids(key), key=lambda i: self.names[i]))
+        ranked.extend(entity_id for _, entity_id in self.fuzzy(key))
+        seen = set()
+        names = []
+        for entity_id in ranked:
+            if self._keys[entity_id] not in seen:
+                seen.add(self._keys[entity_id])
+                names.append(self.names[entity_id])
+        return names[:limit]
@@ -0,0 +1,285 @@
+"""Rebuild the normalized CSVs from the raw ``original csvs``.
+
+    python etl.py                                   # matches.csv only
+    python etl.py --deliveries "original csvs/deliveries.csv" --workers 8
+
+The raw files are streamed in blocks of lines. Worker processes parse each
+block and dictionary-encode its team, venue, umpire and player names
+locally (``pd.factorize``, a hash table per block). The parent merges those
+block dictionaries in file order into the global ones, so every name keeps
+the id of its first appearance, turns the local codes into global ids with
+one array lookup, and appends the block to the output CSVs. Memory stays
+bounded by a few blocks whatever the size of the input.
+
+Ids already present in the output folder's teams, venue, umpire and players
+CSVs are kept, so regenerating after the raw data grows only appends new
+names; pass --fresh to number everything from scratch. --fresh renumbers
+the ids delivery.csv and dismissals.csv refer to, so it needs --deliveries
+unless the output folder has no delivery.csv yet. Blocks are split on
+line breaks, so quoted fields must not contain newlines (true of the IPL
+exports).
+"""
+import argparse
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+RAW_DIR = 'original csvs'
+OUT_DIR = 'normalized csvs'
+CHUNK_LINES = 100_000
+
+# name column groups of each raw file, per entity kind; within a group names
+# are numbered in row-major order (first column of a row before the second)
+MATCH_ENTITIES = {
+    'team': ['team1', 'team2', 'toss_winner', 'winner'],
+    'venue': ['venue'],
+    'umpire': ['umpire1', 'umpire2'],
+    'player': ['player_of_match'],
+}
+DELIVERY_ENTITIES = {
+    'team': ['batting_team', 'bowling_team'],
+    'player': ['batter', 'bowler', 'non_striker', 'fielder'],
+}
+# entity kind -> (output file, id column, name column)
+DICTIONARY_FILES = {
+    'team': ('teams.csv', 'team_id', 'team'),
+    'venue': ('venue.csv', 'venue_id', 'venue'),
+    'umpire': ('umpire.csv', 'umpire_id', 'umpire'),
+    'player': ('players.csv', 'player_id', 'player'),
+}
+
+
+class Dictionary:
+    """Name -> surrogate id, numbered in order of first appearance."""
+
+    def __init__(self):
+        self.ids = {}
+        self.next_id = 0
+
+    @classmethod
+    def from_csv(cls, path, id_col, name_col):
+        d = cls()
+        table = pd.read_csv(path)
+        d.ids = dict(zip(table[name_col], table[id_col].astype(int)))
+        d.next_id = int(table[id_col].max()) + 1 if len(table) else 0
+        return d
+
+    def encode(self, names):
+        """Ids for names, adding the ones not seen before."""
+        out = np.empty(len(names), dtype=np.int64)
+        for i, name in enumerate(names):
+            entity_id = self.ids.get(name)
+            if entity_id is None:
+                entity_id = self.ids[name] = self.next_id
+                self.next_id += 1
+            out[i] = entity_id
+        return out
+
+    def to_frame(self, id_col, name_col):
+        return pd.DataFrame({id_col: list(self.ids.values()), name_col: list(self.ids.keys())}) \
+            .sort_values(id_col, kind='stable')
+
+
+def read_blocks(path, lines=CHUNK_LINES):
+    """Yield (header, block) text pairs of up to lines data lines each."""
+    with open(path, newline='') as f:
+        header = f.readline()
+        while True:
+            block = ''.join(islice(f, lines))
+            if not block:
+                break
+            yield header, block
+
+
+def parse_block(header, block, entities):
+    """Parse one block and factorize its name groups (runs in a worker).
+
+    Returns (frame, {kind: (uniques, codes)}) where codes has one column per
+    name column of the group and -1 for missing names.
+    """
+    frame = pd.read_csv(io.StringIO(header + block))
+    encoded = {}
+    for kind, cols in entities.items():
+        present = [c for c in cols if c in frame.columns]
+        values = frame[present].to_numpy(dtype=object).ravel()
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        encoded[kind] = (list(uniques), codes.reshape(len(frame), len(present)), present)
+    return frame, encoded
+
+
+def parse_match_block(args):
+    return parse_block(*args, MATCH_ENTITIES)
+
+
+def parse_delivery_block(args):
+    return parse_block(*args, DELIVERY_ENTITIES)
+
+
+def ordered_map(executor, fn, items, window):
+    """executor.map that keeps at most window tasks in flight."""
+    if executor is None:
+        yield from map(fn, items)
+        return
+    pending = []
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.pop(0).result()
+    for future in pending:
+        yield future.result()
+
+
+def global_ids(dictionaries, encoded):
+    """{column: ids} for a block, with -1 where the name was missing."""
+    columns = {}
+    for kind, (uniques, codes, present) in encoded.items():
+        remap = np.append(dictionaries[kind].encode(uniques), -1)
+        for j, col in enumerate(present):
+            columns[col] = remap[codes[:, j]]
+    return columns
+
+
+def nullable(ids):
+    """Ids as float with NaN for missing, the way the nullable id columns are stored."""
+    return np.where(ids >= 0, ids, np.nan)
+
+
+class CsvSink:
+    """Writes a CSV block by block into a temp file, moved into place on close."""
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp = f"{path}.tmp-{os.getpid()}"
+        self.file = open(self.tmp, 'w', newline='')
+        self.header = True
+
+    def write(self, frame):
+        frame.to_csv(self.file, header=self.header, index=False)
+        self.header = False
+
+    def close(self):
+        self.file.close()
+        os.replace(self.tmp, self.path)
+
+
+def convert_matches(path, out_dir, dictionaries, executor, window, lines):
+    """Write every match-level table; returns (match_id, player_of_match name) pairs."""
+    names = ['match', 'match_teams', 'toss', 'match_result', 'umpire_match']
+    sinks = {name: CsvSink(os.path.join(out_dir, f'{name}.csv')) for name in names}
+    potm = []
+    for frame, encoded in ordered_map(executor, parse_match_block, read_blocks(path, lines), window):
+        # players are numbered from the deliveries first, so player of the
+        # match is encoded once those have been read
+        encoded = {kind: value for kind, value in encoded.items() if kind != 'player'}
+        ids = global_ids(dictionaries, encoded)
+        match_id = frame['id']
+        sinks['match'].write(pd.DataFrame({
+            'match_id': match_id, 'season': frame['season'], 'date': frame['date'],
+            'match_type': frame['match_type'], 'venue_id': ids['venue']}))
+        sinks['match_teams'].write(pd.DataFrame({
+            'match_id': match_id, 'team_id1': ids['team1'], 'team_id2': ids['team2']}))
+        sinks['toss'].write(pd.DataFrame({
+            'match_id': match_id, 'toss_winner': ids['toss_winner'],
+            'toss_decision': frame['toss_decision']}))
+        sinks['match_result'].write(pd.DataFrame({
+            'match_id': match_id, 'winner_id': nullable(ids['winner']), 'result': frame['result'],
+            'resut_margin': frame['result_margin'].astype(float),
+            'target_runs': frame['target_runs'].astype(float),
+            'target_over': frame['target_overs'].astype(float),
+            'super_over': frame['super_over'], 'method': frame['method']}))
+        sinks['umpire_match'].write(pd.DataFrame({
+            'match_id': match_id, 'umpire_id1': ids['umpire1'], 'umpire_id2': ids['umpire2']}))
+        potm.extend(zip(match_id, frame['player_of_match']))
+    for sink in sinks.values():
+        sink.close()
+    return potm
+
+
+def convert_deliveries(path, out_dir, dictionaries, executor, window, lines):
+    """Write delivery.csv and dismissals.csv from raw ball-by-ball rows."""
+    delivery_sink = CsvSink(os.path.join(out_dir, 'delivery.csv'))
+    dismissal_sink = CsvSink(os.path.join(out_dir, 'dismissals.csv'))
+    for frame, encoded in ordered_map(executor, parse_delivery_block, read_blocks(path, lines), window):
+        ids = global_ids(dictionaries, encoded)
+        delivery_sink.write(pd.DataFrame({
+            'match_id': frame['match_id'], 'inning': frame['inning'],
+            'batting_team_id': ids['batting_team'], 'bowling_team_id': ids['bowling_team'],
+            'over': frame['over'], 'ball': frame['ball'],
+            'batter_id': ids['batter'], 'bowler_id': ids['bowler'], 'non_striker_id': ids['non_striker'],
+            'batsman_runs': frame['batsman_runs'], 'extra_runs': frame['extra_runs'],
+            'total_runs': frame['total_runs']}))
+        wicket = frame['is_wicket'].astype(bool).to_numpy()
+        fielder = ids['fielder'] if 'fielder' in ids else np.full(len(frame), -1)
+        dismissal_sink.write(pd.DataFrame({
+            'match_id': frame['match_id'], 'inning': frame['inning'],
+            'over': frame['over'], 'ball': frame['ball'],
+            'dismissal_kind': frame['dismissal_kind'], 'fielder_id': nullable(fielder)})[wicket])
+    delivery_sink.close()
+    dismissal_sink.close()
+
+
+def run(raw_dir=RAW_DIR, out_dir=OUT_DIR, deliveries=None, workers=None, lines=CHUNK_LINES, fresh=False):
+    """Regenerate the normalized CSVs in out_dir from raw_dir/matches.csv.
+
+    delivery.csv and dismissals.csv are only written when a raw deliveries
+    file is given; otherwise the existing ones are left alone, and fresh
+    raises ValueError since it would renumber the ids they hold.
+    """
+    if fresh and not deliveries and os.path.exists(os.path.join(out_dir, 'delivery.csv')):
+        raise ValueError(f"--fresh renumbers the ids in {out_dir}/delivery.csv and dismissals.csv; "
+                         "pass --deliveries to rebuild them as well")
+    os.makedirs(out_dir, exist_ok=True)
+    dictionaries = {}
+    for kind, (filename, id_col, name_col) in DICTIONARY_FILES.items():
+        path = os.path.join(out_dir, filename)
+        dictionaries[kind] = Dictionary() if fresh or not os.path.exists(path) \
+            else Dictionary.from_csv(path, id_col, name_col)
+
+    workers = os.cpu_count() if workers is None else workers
+    executor = ProcessPoolExecutor(workers) if workers > 1 else None
+    window = 2 * max(workers, 1)
+    try:
+        potm = convert_matches(os.path.join(raw_dir, 'matches.csv'), out_dir,
+                               dictionaries, executor, window, lines)
+        if deliveries:
+            convert_deliveries(deliveries, out_dir, dictionaries, executor, window, lines)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    match_ids, names = zip(*potm) if potm else ((), ())
+    codes, uniques = pd.factorize(pd.Series(names, dtype=object), use_na_sentinel=True)
+    player_ids = np.append(dictionaries['player'].encode(list(uniques)), -1)[codes]
+    sink = CsvSink(os.path.join(out_dir, 'player_of_the_match.csv'))
+    sink.write(pd.DataFrame({'match_id': list(match_ids), 'player_of_the_match_id': nullable(player_ids)}))
+    sink.close()
+
+    for kind, (filename, id_col, name_col) in DICTIONARY_FILES.items():
+        sink = CsvSink(os.path.join(out_dir, filename))
+        sink.write(dictionaries[kind].to_frame(id_col, name_col))
+        sink.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild the normalized CSVs from the raw IPL exports")
+    parser.add_argument('--raw-dir', default=RAW_DIR, help="folder holding matches.csv (default: %(default)s)")
+    parser.add_argument('--deliveries', metavar='FILE', help="raw ball-by-ball CSV, if available")
+    parser.add_argument('--out', default=OUT_DIR, help="output folder (default: %(default)s)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes; 1 parses in this process (default: CPU count)")
+    parser.add_argument('--chunk-lines', type=int, default=CHUNK_LINES,
+                        help="raw lines per block (default: %(default)s)")
+    parser.add_argument('--fresh', action='store_true', help="number every name from scratch")
+    args = parser.parse_args(argv)
+    try:
+        run(args.raw_dir, args.out, args.deliveries, args.workers, args.chunk_lines, args.fresh)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+
+if __name__ == "__main__":
+    main()
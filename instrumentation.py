@@ -0,0 +1,167 @@
+"""Named timings for the load, join, aggregate, query and render stages.
+
+    with stage('join'):
+        ...
+
+    @timed('aggregate.profiles')
+    def player_profiles(delivery): ...
+
+Every stage records its wall time into ``metrics``, keyed by name, and
+``metrics.summary()`` reports count, total, mean, median, p95 and max per
+name. Two opt-in modes add detail at a cost: ``enable(trace_memory=True)``
+runs tracemalloc and records each stage's net allocation (and the peak of
+outermost stages), and ``enable(profile=True)`` runs cProfile until
+``disable()``, whose hottest functions ``profile_report()`` lists.
+Stages nest and are tracked per thread, so the service's worker threads can
+record concurrently.
+"""
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+import numpy as np
+
+# samples kept per name for the median and p95
+MAX_SAMPLES = 1000
+
+
+class Metrics:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, name, seconds, allocated=None, peak=None):
+        with self._lock:
+            stat = self._stats.get(name)
+            if stat is None:
+                stat = self._stats[name] = {'count': 0, 'total_s': 0.0, 'max_s': 0.0,
+                                            'samples': deque(maxlen=MAX_SAMPLES),
+                                            'traced': 0, 'allocated_bytes': 0, 'peak_bytes': None}
+            stat['count'] += 1
+            stat['total_s'] += seconds
+            stat['max_s'] = max(stat['max_s'], seconds)
+            stat['samples'].append(seconds)
+            if allocated is not None:
+                stat['traced'] += 1
+                stat['allocated_bytes'] += allocated
+            if peak is not None:
+                stat['peak_bytes'] = peak if stat['peak_bytes'] is None else max(stat['peak_bytes'], peak)
+
+    def summary(self):
+        """{name: {count, total_s, mean_s, median_s, p95_s, max_s}} per stage.
+
+        Stages run while tracing also report allocated_bytes (net, summed over
+        the traced runs) and, for outermost stages, peak_bytes.
+        """
+        with self._lock:
+            out = {}
+            for name, stat in sorted(self._stats.items()):
+                samples = np.fromiter(stat['samples'], dtype=float)
+                entry = {
+                    'count': stat['count'],
+                    'total_s': round(stat['total_s'], 6),
+                    'mean_s': round(stat['total_s'] / stat['count'], 6),
+                    'median_s': round(float(np.median(samples)), 6),
+                    'p95_s': round(float(np.percentile(samples, 95)), 6),
+                    'max_s': round(stat['max_s'], 6),
+                }
+                if stat['traced']:
+                    entry['allocated_bytes'] = stat['allocated_bytes']
+                if stat['peak_bytes'] is not None:
+                    entry['peak_bytes'] = stat['peak_bytes']
+                out[name] = entry
+            return out
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+metrics = Metrics()
+_local = threading.local()
+_profiler = None
+
+
+def enable(trace_memory=False, profile=False):
+    """Turn on allocation tracing and/or cProfile for everything that runs next."""
+    global _profiler
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if profile and _profiler is None:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+
+def disable():
+    global _profiler
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    if _profiler is not None:
+        _profiler.disable()
+
+
+@contextmanager
+def stage(name):
+    """Record the wall time (and, when tracing, the allocations) of a block.
+
+    Nested stages record their net allocation; the peak is only measured by
+    the outermost stage of a thread, since tracemalloc keeps a single peak.
+    """
+    tracing = tracemalloc.is_tracing()
+    depth = getattr(_local, 'depth', 0)
+    if tracing:
+        before, _ = tracemalloc.get_traced_memory()
+        if depth == 0:
+            tracemalloc.reset_peak()
+    _local.depth = depth + 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        _local.depth = depth
+        if tracing and tracemalloc.is_tracing():
+            after, peak = tracemalloc.get_traced_memory()
+            metrics.record(name, seconds, after - before, peak - before if depth == 0 else None)
+        else:
+            metrics.record(name, seconds)
+
+
+def timed(name):
+    """Decorator form of stage()."""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def profile_report(limit=25, sort='cumulative'):
+    """Text listing of the hottest functions seen by cProfile, or '' when off."""
+    if _profiler is None:
+        return ''
+    out = io.StringIO()
+    pstats.Stats(_profiler, stream=out).sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+def write_profile(path):
+    """Dump the cProfile stats to path (readable with pstats or snakeviz)."""
+    if _profiler is not None:
+        _profiler.dump_stats(path)
+
+
+def write_summary(path):
+    """Write metrics.summary() as JSON."""
+    with open(path, 'w') as f:
+        json.dump(metrics.summary(), f, indent=2)
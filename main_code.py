@@ -1,21 +1,25 @@
-import pandas as pd
-import numpy as np
+import argparse
+import csv
+import json
+import sys
+import threading
 import time
-from collections import defaultdict
-
-def display_projection(df, column_name, label):
-    start_time = time.time()
-
-    print("This is a projection type of query")
-    print(f"This query uses the {label}.csv and performs a projection on the attribute {column_name}")
+from contextlib import ExitStack
 
-    values = df[column_name].tolist()
-    print(f"List of all {label}s in IPL:")
-    for i, val in enumerate(values, 1):
-        print(f"{i}. {val}")
-    print(f"Total number of {label}s in IPL: {len(values)}")
+import pandas as pd
+import numpy as np
 
-    print(f" Time taken: {time.time() - start_time:.4f} seconds\n")
+from csr_index import CSRIndex
+from entity_resolver import EntityResolver, normalize_name
+import instrumentation
+from instrumentation import stage, timed
+from output import export_rows, page_rows, write_rows
+from query_cache import QueryCache
+import query_engine
+from query_engine import RollupSource, SqlSource, TableSource
+from schema import TABLE_DTYPES
+from snapshot_cache import append_rows, apply_dtypes, load_table
+import sqlite_store
 
 
 def find_col(df, candidates):
@@ -25,34 +29,52 @@ def find_col(df, candidates):
             return c
     return None
 
+# entity kind -> (table, id column, name column) of its resolver
+RESOLVER_TABLES = {
+    'player': ('players', 'player_id', 'player'),
+    'team': ('teams', 'team_id', 'team'),
+    'venue': ('venue', 'venue_id', 'venue'),
+    'umpire': ('umpire', 'umpire_id', 'umpire'),
+}
+
+
+class Resolvers(dict):
+    """The name resolvers shared by every query, keyed by entity kind.
+
+    Each one is built, loading its table if need be, the first time it is
+    looked up.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def __missing__(self, kind):
+        table, id_col, name_col = RESOLVER_TABLES[kind]
+        ensure_tables([table])
+        with self._lock:
+            if kind not in self:
+                with stage(f'load.resolvers.{kind}'):
+                    self[kind] = EntityResolver.from_frame(globals()[table], id_col, name_col)
+            return dict.__getitem__(self, kind)
+
 def get_player_id_by_name(name):
-    """Case-insensitive lookup; returns player_id or None. If multiple matches, returns first."""
-    if name is None or name.strip()=="":
-        return None
-    s = name.strip().lower()
-    if 'player' in players.columns:
-        hits = players[players['player'].str.lower().str.contains(s, na=False)]
-        if hits.empty:
-            return None
-        return hits.iloc[0]['player_id']
-    return None
+    """Resolve a typed player name to its player_id, or None if unknown or ambiguous."""
+    return resolvers['player'].resolve(name)
 
 def get_team_id_by_name(name):
-    s = str(name).strip().lower()
-    if 'team' in teams.columns:
-        hits = teams[teams['team'].str.lower() == s]
-        if hits.empty:
-            # try partial match
-            hits = teams[teams['team'].str.lower().str.contains(s, na=False)]
-            if hits.empty:
-                return None
-        return hits.iloc[0]['team_id']
-    return None
+    return resolvers['team'].resolve(name)
+
+def get_venue_id_by_name(name):
+    return resolvers['venue'].resolve(name)
+
+def get_umpire_id_by_name(name):
+    return resolvers['umpire'].resolve(name)
 
 def get_umpire_match_df():
     # handle possible variable name differences
-    if 'umpire_match' in globals():
-        return globals()['umpire_match']
+    if umpire_match is not None:
+        return umpire_match
     if 'umpir_match' in globals():
         return globals()['umpir_match']
     if 'umpire_match_df' in globals():
@@ -60,977 +82,2317 @@ def get_umpire_match_df():
     return None
 
 
-def season_mask_from_input(series, season_input):
+@timed('join.match')
+def enrich_delivery(delivery, match):
+    """Attach season, date, match_type and venue_id to every delivery row, in place.
+
+    Built once at load so that no query has to merge delivery with match again.
+    The string columns are categoricals sharing match's dictionaries and venue_id
+    is int16, so the extra columns cost a few bytes per ball.
+    """
+    pos = pd.Index(match['match_id']).get_indexer(delivery['match_id'])
+    found = pos >= 0
+    for col in ['season', 'date', 'match_type']:
+        values = match[col].astype('category')
+        codes = np.where(found, values.cat.codes.to_numpy()[pos], -1)
+        delivery[col] = pd.Categorical.from_codes(codes, categories=values.cat.categories)
+    delivery['venue_id'] = np.where(found, match['venue_id'].to_numpy()[pos], -1).astype(np.int16)
+    return delivery
+
+
+def ball_key(match_id, inning, over, ball):
+    """Pack (match_id, inning, over, ball) into a single int64 key.
+
+    match_id takes the high bits; inning, over and ball get 4, 8 and 8 bits,
+    which leaves room for super overs and long overs full of extras.
+    """
+    return ((np.asarray(match_id, dtype=np.int64) << 20)
+            | (np.asarray(inning, dtype=np.int64) << 16)
+            | (np.asarray(over, dtype=np.int64) << 8)
+            | np.asarray(ball, dtype=np.int64))
+
+
+# dismissal kinds that are not credited to the bowler
+NON_BOWLER_DISMISSALS = ['run out', 'retired hurt', 'retired out', 'obstructing the field']
+
+
+@timed('join.dismissals')
+def index_wickets(delivery, dismissals):
+    """Align dismissals to delivery rows, in place.
+
+    Adds ball_key, is_wicket, bowler_wicket, dismissal_kind and fielder_id
+    to delivery so that telling which balls took a wicket is a column read
+    instead of a four-column join. is_wicket marks every dismissal and
+    bowler_wicket only those credited to the bowler (no run outs or
+    retirements). Dismissals whose ball is missing from delivery are
+    dropped, matching the inner joins the queries used to run.
+    """
+    keys = ball_key(delivery['match_id'], delivery['inning'], delivery['over'], delivery['ball'])
+    delivery['ball_key'] = keys
+    pos = pd.Index(keys).get_indexer(
+        ball_key(dismissals['match_id'], dismissals['inning'], dismissals['over'], dismissals['ball']))
+    found = pos >= 0
+    pos = pos[found]
+
+    is_wicket = np.zeros(len(delivery), dtype=bool)
+    is_wicket[pos] = True
+    delivery['is_wicket'] = is_wicket
+
+    kinds = dismissals['dismissal_kind'].astype('category')
+    codes = np.full(len(delivery), -1, dtype=kinds.cat.codes.dtype)
+    codes[pos] = kinds.cat.codes.to_numpy()[found]
+    delivery['dismissal_kind'] = pd.Categorical.from_codes(codes, categories=kinds.cat.categories)
+    delivery['bowler_wicket'] = is_wicket & ~delivery['dismissal_kind'].isin(NON_BOWLER_DISMISSALS).to_numpy()
+
+    fielder = np.full(len(delivery), np.nan)
+    fielder[pos] = dismissals['fielder_id'].to_numpy(dtype=float, na_value=np.nan)[found]
+    delivery['fielder_id'] = fielder
+    return delivery
+
+
+@timed('aggregate.season_awards')
+def season_awards(delivery, match, match_result, match_teams):
+    """Compute every season's awards in one vectorized pass over delivery.
+
+    Returns a DataFrame indexed by season with the player id and value of the
+    orange cap (runs), purple cap (bowler wickets), most 4s, most 6s and most
+    dot balls, plus winner_id and runner_up_id taken from the season's final.
+    Per-player totals are np.bincount over a (season, player) key, so the
+    cost is a handful of array passes regardless of the number of players.
+    """
+    seasons = delivery['season'].cat.categories
+    season_code = delivery['season'].cat.codes.to_numpy()
+    valid = season_code >= 0
+    season_code = season_code[valid].astype(np.int64)
+    batter = delivery['batter_id'].to_numpy()[valid].astype(np.int64)
+    bowler = delivery['bowler_id'].to_numpy()[valid].astype(np.int64)
+    runs = delivery['batsman_runs'].to_numpy()[valid]
+    total_runs = delivery['total_runs'].to_numpy()[valid]
+    bowler_wicket = delivery['bowler_wicket'].to_numpy()[valid]
+
+    n_seasons = len(seasons)
+    n_players = int(max(batter.max(initial=-1), bowler.max(initial=-1))) + 1
+    batter_key = season_code * n_players + batter
+    bowler_key = season_code * n_players + bowler
+
+    def per_player(key, weights=None):
+        totals = np.bincount(key, weights=weights, minlength=n_seasons * n_players)
+        return totals.reshape(n_seasons, n_players)
+
+    awards = pd.DataFrame(index=pd.Index(seasons, name='season'))
+    for name, table in [
+        ('orange_cap', per_player(batter_key, runs)),
+        ('purple_cap', per_player(bowler_key, bowler_wicket)),
+        ('most_fours', per_player(batter_key, runs == 4)),
+        ('most_sixes', per_player(batter_key, runs == 6)),
+        ('most_dot_balls', per_player(bowler_key, total_runs == 0)),
+    ]:
+        best = table.argmax(axis=1)
+        awards[f'{name}_id'] = best
+        awards[name] = table[np.arange(n_seasons), best].astype(np.int64)
+
+    finals = match.loc[match['match_type'] == 'Final', ['match_id', 'season', 'date']] \
+        .merge(match_result[['match_id', 'winner_id']], on='match_id', how='left') \
+        .merge(match_teams, on='match_id', how='left') \
+        .sort_values('date') \
+        .drop_duplicates('season', keep='last') \
+        .set_index('season')
+    finals['runner_up_id'] = finals['team_id1'].where(finals['winner_id'] != finals['team_id1'], finals['team_id2'])
+    finals.loc[finals['winner_id'].isna(), 'runner_up_id'] = np.nan
+    awards['winner_id'] = finals['winner_id'].reindex(awards.index)
+    awards['runner_up_id'] = finals['runner_up_id'].reindex(awards.index)
+    return awards
+
+
+@timed('aggregate.partnerships')
+def partnerships(delivery):
+    """Split every innings into its real partnerships.
+
+    Balls are ordered by ball_key and a new partnership starts at the first
+    ball of an innings and on the ball after every wicket, so a pair that
+    comes together twice in one innings yields two rows. Runs (including
+    extras) and balls are cumulative-sum differences between partnership
+    boundaries; no Python code runs per ball.
+
+    Returns one row per partnership with season, match_id, inning,
+    batting_team_id, wicket (1 for the opening stand), p1/p2 (the two
+    batters, lower id first), runs and balls.
+    """
+    order = np.argsort(delivery['ball_key'].to_numpy(), kind='stable')
+    match_ids = delivery['match_id'].to_numpy()[order]
+    innings = delivery['inning'].to_numpy()[order]
+    is_wicket = delivery['is_wicket'].to_numpy()[order]
+
+    new_innings = np.ones(len(order), dtype=bool)
+    new_innings[1:] = (match_ids[1:] != match_ids[:-1]) | (innings[1:] != innings[:-1])
+    starts = new_innings.copy()
+    starts[1:] |= is_wicket[:-1]
+    start_idx = np.flatnonzero(starts)
+
+    runs_cum = np.concatenate([[0], np.cumsum(delivery['total_runs'].to_numpy()[order])])
+    bounds = np.append(start_idx, len(order))
+    innings_no = np.cumsum(new_innings[start_idx])
+    first_of_innings = np.flatnonzero(new_innings[start_idx])
+    wicket = np.arange(len(start_idx)) - first_of_innings[innings_no - 1] + 1
+
+    first_ball = order[start_idx]
+    batter = delivery['batter_id'].to_numpy()[first_ball]
+    non_striker = delivery['non_striker_id'].to_numpy()[first_ball]
+    return pd.DataFrame({
+        'season': delivery['season'].to_numpy()[first_ball],
+        'match_id': match_ids[start_idx],
+        'inning': innings[start_idx],
+        'batting_team_id': delivery['batting_team_id'].to_numpy()[first_ball],
+        'wicket': wicket,
+        'p1': np.minimum(batter, non_striker),
+        'p2': np.maximum(batter, non_striker),
+        'runs': runs_cum[bounds[1:]] - runs_cum[bounds[:-1]],
+        'balls': np.diff(bounds),
+    })
+
+
+def top_partnerships(parts, by, n=1):
+    """Return the n highest partnerships in each group of parts[by]."""
+    return parts.sort_values('runs', ascending=False, kind='stable') \
+        .groupby(by, observed=True, sort=True).head(n) \
+        .sort_values([by, 'runs'], ascending=[True, False], kind='stable')
+
+
+@timed('aggregate.profiles')
+def player_profiles(delivery):
+    """Per-player, per-season profile store built in one grouped pass over delivery.
+
+    Returns (seasons, career). seasons is indexed by (player_id, season) and
+    career by player_id, both with runs, balls, outs, wickets, catches,
+    matches, fifties, hundreds and five_wicket_hauls. seasons also holds the
+    team a player turned out for (batting side first, then bowling, then
+    fielding) and career the number of distinct teams. Runs, balls and outs
+    count deliveries faced; wickets count the dismissals credited to the
+    player's bowling (no run outs or retirements); matches count games in
+    which the player batted, took such a wicket or held a catch.
+
+    The data does not say which batter was out, so an out is charged to the
+    striker of the ball it fell on, even when the non-striker was run out.
+    """
+    keys = ['player_id', 'season']
+    batting = delivery.rename(columns={'batter_id': 'player_id'})
+    bowling = delivery.rename(columns={'bowler_id': 'player_id'})
+    caught = delivery.loc[delivery['dismissal_kind'] == 'caught'].rename(columns={'fielder_id': 'player_id'})
+    caught = caught.astype({'player_id': delivery['batter_id'].dtype})
+
+    bat = batting.groupby(keys, observed=True).agg(runs=('batsman_runs', 'sum'),
+                                                   balls=('batsman_runs', 'size'),
+                                                   outs=('is_wicket', 'sum'),
+                                                   batting_team_id=('batting_team_id', 'first'))
+    innings_runs = batting.groupby(keys + ['match_id'], observed=True)['batsman_runs'].sum()
+    milestones = pd.DataFrame({'fifties': innings_runs.between(50, 99),
+                               'hundreds': innings_runs >= 100}).groupby(level=keys, observed=True).sum()
+    bowl_team = bowling.groupby(keys, observed=True)['bowling_team_id'].first()
+    wicket_rows = bowling.loc[bowling['bowler_wicket']]
+    match_wickets = wicket_rows.groupby(keys + ['match_id'], observed=True).size()
+    wickets = pd.DataFrame({'wickets': match_wickets,
+                            'five_wicket_hauls': match_wickets >= 5}).groupby(level=keys, observed=True).sum()
+    catches = caught.groupby(keys, observed=True).agg(catches=('match_id', 'size'),
+                                                      fielding_team_id=('bowling_team_id', 'first'))
+    appearances = pd.concat([batting[keys + ['match_id']],
+                             wicket_rows[keys + ['match_id']],
+                             caught[keys + ['match_id']]]).drop_duplicates()
+    matches = appearances.groupby(keys, observed=True).size().rename('matches')
+
+    seasons = pd.concat([bat, milestones, wickets, catches, matches, bowl_team], axis=1).sort_index()
+    counts = ['runs', 'balls', 'outs', 'wickets', 'catches', 'matches',
+              'fifties', 'hundreds', 'five_wicket_hauls']
+    seasons[counts] = seasons[counts].fillna(0).astype(np.int64)
+    seasons['team_id'] = seasons['batting_team_id'] \
+        .fillna(seasons['bowling_team_id']) \
+        .fillna(seasons['fielding_team_id'])
+    seasons = seasons[counts + ['team_id']]
+
+    career = seasons[counts].groupby(level='player_id').sum()
+    career['teams'] = seasons.groupby(level='player_id')['team_id'].nunique()
+    return seasons, career
+
+
+MATCHUP_STATS = ['balls', 'runs', 'dots', 'fours', 'sixes', 'dismissals']
+
+
+PHASES = ['powerplay', 'middle', 'death']
+
+
+def match_phase(over):
+    """Powerplay (overs 1-6), middle (7-15) or death (16-20) for 0-based overs."""
+    labels = np.select([over < 6, over < 15], PHASES[:2], PHASES[2])
+    return pd.Categorical(labels, categories=PHASES, ordered=True)
+
+
+@timed('aggregate.matchups')
+def matchups(delivery):
+    """Bowler-vs-batter matchup store built in one grouped pass over delivery.
+
+    Returns (pairs, splits): pairs is indexed by (bowler_id, batter_id) and
+    splits by (bowler_id, batter_id, season, phase), both holding balls, runs
+    off the bat, dot balls, fours, sixes and dismissals on those balls.
+    Dismissals are the batter's wickets credited to the bowler, so run outs
+    and retirements are left out.
+    """
+    runs = delivery['batsman_runs']
+    frame = pd.DataFrame({
+        'bowler_id': delivery['bowler_id'],
+        'batter_id': delivery['batter_id'],
+        'season': delivery['season'],
+        'phase': match_phase(delivery['over'].to_numpy()),
+        'balls': 1,
+        'runs': runs,
+        'dots': delivery['total_runs'] == 0,
+        'fours': runs == 4,
+        'sixes': runs == 6,
+        'dismissals': delivery['bowler_wicket'],
+    })
+    splits = frame.groupby(['bowler_id', 'batter_id', 'season', 'phase'], observed=True)[MATCHUP_STATS] \
+        .sum().astype(np.int64)
+    pairs = splits.groupby(level=['bowler_id', 'batter_id']).sum()
+    return pairs, splits
+
+
+CUBE_DIMS = ['team_id', 'season', 'phase', 'inning', 'role']
+CUBE_ROLES = ['batting', 'bowling']
+CUBE_STATS = ['runs', 'balls', 'wickets', 'dismissals', 'fours', 'sixes', 'dots', 'innings']
+
+
+@timed('aggregate.phase_cube')
+def phase_cube(delivery):
+    """Team batting and bowling cube built in one grouped pass per side over delivery.
+
+    Indexed by (team_id, season, phase, inning, role): role 'batting' holds
+    what the team scored and lost, 'bowling' what it conceded and took.
+    Each cell holds runs (extras included), balls, wickets (credited to the
+    bowler), dismissals (every wicket, run outs included), fours, sixes,
+    dot balls and innings (the matches with a ball in that cell). Every
+    measure adds up along any dimension, see cube_rollup.
+    """
+    runs = delivery['batsman_runs']
+    measures = pd.DataFrame({
+        'season': delivery['season'],
+        'phase': match_phase(delivery['over'].to_numpy()),
+        'inning': delivery['inning'],
+        'match_id': delivery['match_id'],
+        'runs': delivery['total_runs'],
+        'balls': 1,
+        'wickets': delivery['bowler_wicket'],
+        'dismissals': delivery['is_wicket'],
+        'fours': runs == 4,
+        'sixes': runs == 6,
+        'dots': delivery['total_runs'] == 0,
+    })
+    sides = []
+    for role, column in zip(CUBE_ROLES, ['batting_team_id', 'bowling_team_id']):
+        keys = [delivery[column].rename('team_id'), 'season', 'phase', 'inning']
+        per_match = measures.groupby(keys + ['match_id'], observed=True)[CUBE_STATS[:-1]].sum()
+        grouped = per_match.groupby(level=['team_id', 'season', 'phase', 'inning'], observed=True)
+        side = grouped.sum()
+        side['innings'] = grouped.size()
+        sides.append(side)
+    cube = pd.concat(sides, keys=pd.CategoricalIndex(CUBE_ROLES, categories=CUBE_ROLES), names=['role'])
+    return cube.reorder_levels(CUBE_DIMS).sort_index().astype(np.int64)
+
+
+PLAYOFF_PATTERN = 'Qualifier|Eliminator|Final'
+
+
+@timed('aggregate.team_arrays')
+def team_aggregates(match, match_teams, match_result, toss, seasons=None, n_teams=None):
+    """Dense team-by-season count arrays built from the match tables.
+
+    Returns a dict with 'seasons' (Index of season labels) and int64 arrays
+    'pair_matches', 'pair_wins' and 'pair_toss_wins' indexed by
+    [team_a, team_b, season], where wins and toss wins are team_a's against
+    team_b, and 'team_matches', 'team_wins' and 'team_playoffs' indexed by
+    [team, season]. Team ids index the arrays directly. Pass seasons and
+    n_teams to build arrays shaped like an existing set, e.g. for one new
+    match.
+    """
+    games = match_teams.merge(match[['match_id', 'season', 'match_type']], on='match_id', how='inner') \
+        .merge(match_result[['match_id', 'winner_id']], on='match_id', how='left') \
+        .merge(toss[['match_id', 'toss_winner']], on='match_id', how='left')
+    if seasons is None:
+        seasons = pd.Index(match['season'].astype('category').cat.categories, name='season')
+    s = seasons.get_indexer(games['season'])
+    a = games['team_id1'].to_numpy()
+    b = games['team_id2'].to_numpy()
+    if n_teams is None:
+        n_teams = int(max(a.max(), b.max())) + 1 if len(games) else 0
+    shape = (n_teams, n_teams, len(seasons))
+    pair_matches = np.zeros(shape, dtype=np.int64)
+    pair_wins = np.zeros(shape, dtype=np.int64)
+    pair_toss_wins = np.zeros(shape, dtype=np.int64)
+    winner = games['winner_id'].to_numpy(dtype=float, na_value=np.nan)
+    toss_winner = games['toss_winner'].to_numpy()
+    # every match counts once from each side's point of view
+    for x, y in ((a, b), (b, a)):
+        np.add.at(pair_matches, (x, y, s), 1)
+        np.add.at(pair_wins, (x, y, s), winner == x)
+        np.add.at(pair_toss_wins, (x, y, s), toss_winner == x)
+    playoff = games['match_type'].astype(str).str.contains(PLAYOFF_PATTERN, case=False, na=False).to_numpy()
+    team_playoffs = np.zeros((n_teams, len(seasons)), dtype=np.int64)
+    np.add.at(team_playoffs, (a, s), playoff)
+    np.add.at(team_playoffs, (b, s), playoff)
+    return {
+        'seasons': seasons,
+        'pair_matches': pair_matches,
+        'pair_wins': pair_wins,
+        'pair_toss_wins': pair_toss_wins,
+        'team_matches': pair_matches.sum(axis=1),
+        'team_wins': pair_wins.sum(axis=1),
+        'team_playoffs': team_playoffs,
+    }
+
+
+@timed('aggregate.venues')
+def venue_aggregates(match, match_result, toss, delivery):
+    """Per-venue and per-venue-and-season results tables built from the match tables.
+
+    Returns (venues, venue_seasons), indexed by venue_id and by (venue_id,
+    season). Both count matches, abandoned matches (no winner), bat-first
+    and chase wins and the toss decisions (with how often the toss winner
+    went on to win); venues also holds the first-innings score distribution
+    and venue_seasons its mean. First-innings scores only count matches
+    that were not abandoned.
+    """
+    games = match[['match_id', 'season', 'venue_id']] \
+        .merge(match_result[['match_id', 'winner_id']], on='match_id', how='left') \
+        .merge(toss[['match_id', 'toss_winner', 'toss_decision']], on='match_id', how='left')
+    # first-innings totals per match, positioned like games
+    pos = pd.Index(games['match_id']).get_indexer(delivery['match_id'])
+    first = (delivery['inning'].to_numpy() == 1) & (pos >= 0)
+    runs = np.bincount(pos[first], weights=delivery['total_runs'].to_numpy()[first], minlength=len(games))
+    balls = np.bincount(pos[first], minlength=len(games))
+    winner = games['winner_id'].to_numpy(dtype=float, na_value=np.nan)
+    abandoned = np.isnan(winner)
+    toss_won = ~abandoned & (winner == games['toss_winner'].to_numpy(dtype=float, na_value=np.nan))
+    decision = games['toss_decision'].astype(object).to_numpy()
+    chose_bat = decision == 'bat'
+    chose_field = decision == 'field'
+    games['abandoned'] = abandoned
+    games['bat_first_wins'] = ~abandoned & ((chose_bat & toss_won) | (chose_field & ~toss_won))
+    games['chase_wins'] = ~abandoned & ((chose_field & toss_won) | (chose_bat & ~toss_won))
+    games['chose_bat'] = chose_bat
+    games['chose_field'] = chose_field
+    games['chose_bat_wins'] = chose_bat & toss_won
+    games['chose_field_wins'] = chose_field & toss_won
+    games['first_innings'] = np.where(~abandoned & (balls > 0), runs, np.nan)
+    counts = ['abandoned', 'bat_first_wins', 'chase_wins', 'chose_bat', 'chose_field',
+              'chose_bat_wins', 'chose_field_wins']
+
+    def totals(by):
+        grouped = games.groupby(by, observed=True)
+        table = grouped[counts].sum().astype(np.int64)
+        table.insert(0, 'matches', grouped.size().astype(np.int64))
+        scores = grouped['first_innings']
+        table['innings'] = scores.count().astype(np.int64)
+        table['first_innings_mean'] = scores.mean()
+        return table, scores
+
+    venues, scores = totals('venue_id')
+    venues['first_innings_median'] = scores.median()
+    venues['first_innings_p25'] = scores.quantile(0.25)
+    venues['first_innings_p75'] = scores.quantile(0.75)
+    venues['first_innings_min'] = scores.min()
+    venues['first_innings_max'] = scores.max()
+    venue_seasons, _ = totals(['venue_id', 'season'])
+    return venues, venue_seasons
+
+
+def seasons_from_input(categories, season_input):
+    """The season labels of categories that season_input names.
+
+    A plain year like '2017' matches every season containing it ('2017',
+    '2017/18'); anything else must match a label exactly. Only the season
+    dictionary is searched, never the rows.
+    """
     s = str(season_input).strip()
+    labels = pd.Index(categories)
     if s == "":
-        return pd.Series([True] * len(series), index=series.index)
-    # if user enters a simple year like '2017', match any season containing that substring
-    if s.isdigit():
-        return series.astype(str).str.contains(s)
-    # otherwise expect an exact match like '2017/18'
-    return series.astype(str) == s
+        return labels.tolist()
+    text = labels.astype(str)
+    keep = text.str.contains(s, regex=False) if s.isdigit() else text == s
+    return labels[np.asarray(keep, dtype=bool)].tolist()
 
-if __name__ == "__main__":
-    # Create a DataFrame with random data
-    delivery=pd.read_csv('normalized csvs/delivery.csv')
-    # delivery['delivery_time'] = pd.to_datetime(delivery['delivery_time'])
-    dismissals=pd.read_csv('normalized csvs/dismissals.csv')
-    match_result=pd.read_csv('normalized csvs/match_result.csv')
-    match_teams=pd.read_csv('normalized csvs/match_teams.csv')
-    match=pd.read_csv('normalized csvs/match.csv')
-    player_of_the_match=pd.read_csv('normalized csvs/player_of_the_match.csv')
-    players=pd.read_csv('normalized csvs/players.csv')
-    teams=pd.read_csv('normalized csvs/teams.csv')
-    toss=pd.read_csv('normalized csvs/toss.csv')
-    umpire=pd.read_csv('normalized csvs/umpire.csv')
-    umpire_match=pd.read_csv('normalized csvs/umpire_match.csv')
-    venue=pd.read_csv('normalized csvs/venue.csv')
+
+def season_mask_from_input(series, season_input):
+    """Boolean mask of series' rows in the seasons season_input names.
+
+    The input is resolved against the category dictionary once and rows
+    are compared by their integer code.
+    """
+    if str(season_input).strip() == "":
+        return pd.Series(True, index=series.index)
+    values = series if isinstance(series.dtype, pd.CategoricalDtype) else series.astype('category')
+    categories = values.cat.categories
+    codes = categories.get_indexer(seasons_from_input(categories, season_input))
+    return pd.Series(np.isin(values.cat.codes.to_numpy(), codes), index=series.index)
+
+
+DATA_DIR = 'normalized csvs'
+
+
+@timed('load')
+def load_data(data_dir=DATA_DIR, lazy=False, sqlite=None):
+    """Point the tables at data_dir and reset every structure derived from them.
+
+    The tables are module globals, which is what the query functions read.
+    With lazy=True they stay None until a query needs them (see
+    ensure_tables); otherwise every table and resolver is loaded now.
+    sqlite names a SQLite file (see sqlite_store.py), built from data_dir
+    if need be, that reports are then answered from with indexed SQL.
+    """
+    global resolvers, loaded_dir, profiles, matchup_tables, team_arrays, venue_tables, cube, database
+    loaded_dir = data_dir
+    database = sqlite_store.open_database(data_dir, sqlite) if sqlite else None
+    for name in TABLE_DTYPES:
+        globals()[name] = None
+    resolvers = Resolvers()
+    profiles = None
+    matchup_tables = None
+    team_arrays = None
+    venue_tables = None
+    cube = None
+    indexes.clear()
+    cache.clear()
+    if not lazy:
+        ensure_tables(TABLE_DTYPES)
+        for kind in RESOLVER_TABLES:
+            resolvers[kind]  # looking a kind up builds its resolver
+
+
+# tables a loaded table is built from: delivery carries columns of both
+TABLE_DEPENDS = {'delivery': ['match', 'dismissals']}
+_table_locks = {name: threading.Lock() for name in TABLE_DTYPES}
+
+
+def ensure_tables(names):
+    """Load each of the named tables that is not loaded yet.
+
+    Safe to call from several threads: each table is read once, and a thread
+    asking for a table another thread is reading waits for that read.
+    """
+    for name in names:
+        if globals()[name] is not None:
+            continue
+        ensure_tables(TABLE_DEPENDS.get(name, []))
+        with _table_locks[name]:
+            if globals()[name] is None:
+                globals()[name] = _read_table(name)
+
+
+def _read_table(name):
+    with stage(f'load.{name}'):
+        df = load_table(f'{loaded_dir}/{name}.csv', TABLE_DTYPES[name])
+    if name == 'delivery':
+        # every query reads season/date/match_type/venue_id straight off delivery
+        df = enrich_delivery(df, match)
+        # is_wicket / dismissal_kind / fielder_id aligned to delivery rows
+        df = index_wickets(df, dismissals)
+    return df
+
+
+def query_tables(choice):
+    """Tables query choice reads, as declared in QUERIES."""
+    return QUERIES[choice][3]
+
+
+def prefetch(names=('delivery',)):
+    """Load the named tables on a background daemon thread; returns the thread."""
+    thread = threading.Thread(target=ensure_tables, args=(list(names),), name='prefetch', daemon=True)
+    thread.start()
+    return thread
+
+
+profiles = None
+matchup_tables = None
+team_arrays = None
+venue_tables = None
+cube = None
+# sqlite_store.Database reports run against, when one is attached
+database = None
+# CSR indexes over delivery, keyed by column name
+indexes = {}
+# one lock per store built on first use, so that threads asking for a store
+# at once build it once; ingest_match holds them all while it updates them
+_store_locks = {name: threading.Lock()
+                for name in ['indexes', 'profiles', 'matchup_tables', 'cube', 'team_arrays', 'venue_tables']}
+
+
+def delivery_index(column):
+    """CSR index of delivery rows by column, built on first use.
+
+    Categorical columns are indexed by their integer codes and looked up by
+    label.
+    """
+    index = indexes.get(column)
+    if index is None:
+        ensure_tables(['delivery'])
+        with _store_locks['indexes']:
+            index = indexes.get(column)
+            if index is None:
+                with stage(f'index.{column}'):
+                    values = delivery[column]
+                    if isinstance(values.dtype, pd.CategoricalDtype):
+                        index = CSRIndex(values.cat.codes.to_numpy(), values.cat.categories)
+                    else:
+                        index = CSRIndex(values.to_numpy())
+                indexes[column] = index
+    return index
+
+
+def season_partition(season_input):
+    """Delivery rows of the seasons season_input names, in table order.
+
+    The input is resolved against the season dictionary and only those
+    seasons' partitions of the season index are read; a blank input is
+    every season.
+    """
+    table = loaded('delivery')
+    if str(season_input).strip() == "":
+        return table
+    labels = seasons_from_input(table['season'].cat.categories, season_input)
+    return table.iloc[np.sort(delivery_index('season').rows_many(labels))]
+
+
+def profile_store():
+    """(seasons, career) player profiles, built from delivery on first use."""
+    global profiles
+    built = profiles
+    if built is None:
+        with _store_locks['profiles']:
+            if profiles is None:
+                ensure_tables(['delivery'])
+                profiles = player_profiles(delivery)
+            built = profiles
+    return built
+
+
+def matchup_store():
+    """(pairs, splits) bowler-vs-batter matchups, built from delivery on first use."""
+    global matchup_tables
+    built = matchup_tables
+    if built is None:
+        with _store_locks['matchup_tables']:
+            if matchup_tables is None:
+                ensure_tables(['delivery'])
+                matchup_tables = matchups(delivery)
+            built = matchup_tables
+    return built
+
+
+def cube_store():
+    """The team phase cube (see phase_cube), built from delivery on first use."""
+    global cube
+    built = cube
+    if built is None:
+        with _store_locks['cube']:
+            if cube is None:
+                ensure_tables(['delivery'])
+                cube = phase_cube(delivery)
+            built = cube
+    return built
+
+
+def cube_rollup(by, **where):
+    """Sum the phase cube down to the by dimensions over the cells matching where.
+
+    where maps dimensions to a value or a list of values, e.g.
+    cube_rollup('season', team_id=3, phase='powerplay', role='batting').
+    """
+    cells = cube_store()
+    mask = np.ones(len(cells), dtype=bool)
+    for dim, value in where.items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        mask &= cells.index.get_level_values(dim).isin(values)
+    return cells[mask].groupby(level=by, observed=True).sum()
+
+
+def team_store():
+    """Dense head-to-head and per-team season arrays, built on first use."""
+    global team_arrays
+    built = team_arrays
+    if built is None:
+        with _store_locks['team_arrays']:
+            if team_arrays is None:
+                ensure_tables(['match', 'match_teams', 'match_result', 'toss'])
+                team_arrays = team_aggregates(match, match_teams, match_result, toss)
+            built = team_arrays
+    return built
+
+
+def team_slot(team_id):
+    """team_id as an index into the team arrays, or None if it never played."""
+    return team_id if 0 <= team_id < team_store()['team_matches'].shape[0] else None
+
+
+def venue_store():
+    """(venues, venue_seasons) venue results tables, built on first use."""
+    global venue_tables
+    built = venue_tables
+    if built is None:
+        with _store_locks['venue_tables']:
+            if venue_tables is None:
+                ensure_tables(['match', 'match_result', 'toss', 'delivery'])
+                venue_tables = venue_aggregates(match, match_result, toss, delivery)
+            built = venue_tables
+    return built
+
+
+def player_seasons(player_id):
+    """Season rows of the profile store for one player (empty if unknown)."""
+    seasons, career = profile_store()
+    if player_id not in career.index:
+        return seasons.iloc[:0].droplevel('player_id')
+    return seasons.xs(player_id, level='player_id')
+
+
+# ---------------------------------------------------------------------------
+# Declarative reports (see query_engine.py)
+# ---------------------------------------------------------------------------
+
+CUBE_MEASURES = {'total_runs': 'runs', 'balls': 'balls', 'wickets': 'wickets', 'dismissals': 'dismissals',
+                 'fours': 'fours', 'sixes': 'sixes', 'dots': 'dots'}
+MATCHUP_MEASURES = {'runs': 'runs', 'balls': 'balls', 'wickets': 'dismissals',
+                    'fours': 'fours', 'sixes': 'sixes', 'dots': 'dots'}
+DELIVERY_COLUMNS = {
+    'season': 'season', 'inning': 'inning', 'batter': 'batter_id', 'bowler': 'bowler_id',
+    'batting_team': 'batting_team_id', 'bowling_team': 'bowling_team_id',
+    'venue': 'venue_id', 'match': 'match_id',
+    'phase': lambda d: match_phase(d['over'].to_numpy()),
+    'runs': 'batsman_runs', 'total_runs': 'total_runs',
+    'wickets': 'bowler_wicket', 'dismissals': 'is_wicket',
+    'balls': lambda d: np.ones(len(d), dtype=np.int64),
+    'fours': lambda d: d['batsman_runs'].to_numpy() == 4,
+    'sixes': lambda d: d['batsman_runs'].to_numpy() == 6,
+    'dots': lambda d: d['total_runs'].to_numpy() == 0,
+}
+# delivery columns a filter can be looked up by, most selective first
+DELIVERY_LOOKUPS = ['match', 'batter', 'bowler', 'venue', 'batting_team', 'bowling_team', 'season']
+# the same dimensions and measures in SQL over the sqlite_store schema
+_SQL_DISMISSED = ('SUM(EXISTS (SELECT 1 FROM dismissals x WHERE x.match_id = d.match_id '
+                  'AND x.inning = d.inning AND x."over" = d."over" AND x.ball = d.ball {}))')
+SQL_TABLES = 'delivery d JOIN match m ON m.match_id = d.match_id'
+SQL_EXPRESSIONS = {
+    'season': 'm.season', 'inning': 'd.inning', 'batter': 'd.batter_id', 'bowler': 'd.bowler_id',
+    'batting_team': 'd.batting_team_id', 'bowling_team': 'd.bowling_team_id',
+    'venue': 'm.venue_id', 'match': 'd.match_id',
+    'phase': """CASE WHEN d."over" < 6 THEN 'powerplay' WHEN d."over" < 15 THEN 'middle' ELSE 'death' END""",
+    'runs': 'SUM(d.batsman_runs)', 'total_runs': 'SUM(d.total_runs)', 'balls': 'COUNT(*)',
+    'wickets': _SQL_DISMISSED.format("AND x.dismissal_kind NOT IN ("
+                                     + ", ".join(f"'{kind}'" for kind in NON_BOWLER_DISMISSALS) + ")"),
+    'dismissals': _SQL_DISMISSED.format(''),
+    'fours': 'SUM(d.batsman_runs = 4)', 'sixes': 'SUM(d.batsman_runs = 6)', 'dots': 'SUM(d.total_runs = 0)',
+}
+# report dimensions holding ids of a resolver's entities
+REPORT_ENTITIES = {'batter': 'player', 'bowler': 'player', 'batting_team': 'team',
+                   'bowling_team': 'team', 'venue': 'venue'}
+
+
+def report_sources():
+    """Sources a report spec can be answered from, smallest first."""
+    cube_dims = {'season': 'season', 'phase': 'phase', 'inning': 'inning'}
+    sql = [] if database is None else [
+        SqlSource(database.path, database.query, SQL_TABLES, SQL_EXPRESSIONS, {'phase': PHASES})]
+    return sql + [
+        RollupSource('phase cube (batting)', cube_store, lambda: cube is not None,
+                     dict(cube_dims, batting_team='team_id'), CUBE_MEASURES, fixed={'role': 'batting'}),
+        RollupSource('phase cube (bowling)', cube_store, lambda: cube is not None,
+                     dict(cube_dims, bowling_team='team_id'), CUBE_MEASURES, fixed={'role': 'bowling'}),
+        RollupSource('matchups', lambda: matchup_store()[1], lambda: matchup_tables is not None,
+                     {'bowler': 'bowler_id', 'batter': 'batter_id', 'season': 'season', 'phase': 'phase'},
+                     MATCHUP_MEASURES),
+        TableSource('delivery', lambda: loaded('delivery'), DELIVERY_COLUMNS, delivery_index, DELIVERY_LOOKUPS),
+    ]
+
+
+def resolve_report_filters(where):
+    """Spec filter values as the sources hold them: ids for names, labels for seasons.
+
+    Returns (where, None), or (None, result) for a value that does not resolve.
+    """
+    resolved = {}
+    for dim, values in where.items():
+        values = [str(v).strip() for v in values]
+        if dim in REPORT_ENTITIES:
+            kind = REPORT_ENTITIES[dim]
+            ids = [resolvers[kind].resolve(v) for v in values]
+            for value, found in zip(values, ids):
+                if found is None:
+                    return None, not_found(f"Invalid {dim.replace('_', ' ')}: {value}", kind, value)
+            resolved[dim] = ids
+        elif dim == 'season':
+            ensure_tables(['match'])
+            categories = match['season'].astype('category').cat.categories
+            matched = set().union(*(seasons_from_input(categories, v) for v in values))
+            resolved[dim] = [str(label) for label in categories if label in matched]
+        elif dim == 'phase':
+            unknown = [v for v in values if v.lower() not in PHASES]
+            if unknown:
+                return None, make_result(lines=[f"Invalid phase '{unknown[0]}': use powerplay, middle or death."],
+                                         ok=False)
+            resolved[dim] = [v.lower() for v in values]
+        else:
+            resolved[dim] = [int(v) for v in values]
+    return resolved, None
+
+
+def loaded(name):
+    """Table name, loaded first if need be."""
+    ensure_tables([name])
+    return globals()[name]
+
+
+def run_report(spec):
+    """(rows, plan) for a report spec whose filters name players, teams, venues and seasons.
+
+    Returns (None, result) when a filter does not resolve; raises ValueError
+    for a malformed spec.
+    """
+    spec = query_engine.parse_spec(spec)
+    spec['where'], error = resolve_report_filters(spec['where'])
+    if error is not None:
+        return None, error
+    plan = query_engine.plan(spec, report_sources())
+    with stage('report'):
+        return plan.run(), plan
+
+
+def entity_names(kind, ids):
+    """Names for an array of kind's ids, 'id:N' where unknown."""
+    table, id_col, name_col = RESOLVER_TABLES[kind]
+    ensure_tables([table])
+    frame = globals()[table]
+    names = dict(zip(frame[id_col], frame[name_col]))
+    return [names.get(i, f"id:{i}") for i in ids]
+
+
+# ---------------------------------------------------------------------------
+# Incremental ingest
+# ---------------------------------------------------------------------------
+
+# tables a new match brings rows for, in the order they are applied
+INGEST_TABLES = ['match', 'match_teams', 'toss', 'match_result', 'umpire_match',
+                 'player_of_the_match', 'dismissals', 'delivery']
+REQUIRED_INGEST_TABLES = {'match', 'match_teams', 'delivery'}
+
+
+def _ingest_frame(name, rows, columns):
+    """New rows for table name as a DataFrame holding exactly the CSV columns."""
+    frame = pd.DataFrame(rows if rows is not None else [], columns=None)
+    if frame.empty:
+        return apply_dtypes(pd.DataFrame(columns=columns), TABLE_DTYPES[name])
+    missing = [c for c in columns if c not in frame.columns]
+    extra = [c for c in frame.columns if c not in columns]
+    if missing or extra:
+        raise ValueError(f"{name}: missing columns {missing}, unexpected columns {extra}")
+    frame = frame[columns]
+    current = globals()[name]
+    for col in columns:
+        dtype = current[col].dtype
+        if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_numeric_dtype(frame[col].dtype):
+            frame[col] = pd.to_numeric(frame[col])
+    return apply_dtypes(frame, TABLE_DTYPES[name])
+
+
+def _align_categoricals(old, new):
+    """Give new's categorical columns old's categories, adding unseen ones to old.
+
+    Unseen categories go at the end, so the codes already stored in old stay
+    valid and nothing proportional to old has to be recoded.
+    """
+    for col in old.columns:
+        if not isinstance(old[col].dtype, pd.CategoricalDtype):
+            continue
+        values = new[col].astype(object)
+        unseen = pd.Index(values.dropna().unique()).difference(old[col].cat.categories)
+        if len(unseen):
+            old[col] = old[col].cat.add_categories(sorted(unseen))
+        new[col] = pd.Categorical(values, categories=old[col].cat.categories)
+    return old, new
+
+
+def _add_counts(store, delta, counts):
+    """Add delta's count columns into store, row by row on their shared index."""
+    shared = delta.index.isin(store.index)
+    if shared.any():
+        keys = delta.index[shared]
+        store.loc[keys, counts] = store.loc[keys, counts].to_numpy() + delta.loc[shared, counts].to_numpy()
+    if not shared.all():
+        store = pd.concat([store, delta[~shared]]).sort_index()
+    return store
+
+
+def _update_profiles(new_delivery):
+    global profiles
+    seasons, career = profiles
+    if not new_delivery['season'].isin(seasons.index.levels[1]).all():
+        profiles = None
+        return
+    new_seasons, new_career = player_profiles(new_delivery)
+    counts = [c for c in new_career.columns if c != 'teams']
+    seasons = _add_counts(seasons, new_seasons, counts)
+    career = _add_counts(career, new_career, counts)
+    touched = seasons.index.get_level_values('player_id').isin(new_career.index)
+    career.loc[new_career.index, 'teams'] = \
+        seasons.loc[touched, 'team_id'].groupby(level='player_id').nunique()
+    profiles = (seasons, career)
+
+
+def _update_matchups(new_delivery):
+    global matchup_tables
+    pairs, splits = matchup_tables
+    if not new_delivery['season'].isin(splits.index.levels[2]).all():
+        matchup_tables = None
+        return
+    new_pairs, new_splits = matchups(new_delivery)
+    matchup_tables = (_add_counts(pairs, new_pairs, MATCHUP_STATS),
+                      _add_counts(splits, new_splits, MATCHUP_STATS))
+
+
+def _update_cube(new_delivery):
+    global cube
+    if not new_delivery['season'].isin(cube.index.levels[1]).all():
+        cube = None
+        return
+    cube = _add_counts(cube, phase_cube(new_delivery), CUBE_STATS)
+
+
+def _update_team_arrays(new):
+    global team_arrays
+    n_teams = team_arrays['team_matches'].shape[0]
+    team_ids = new['match_teams'][['team_id1', 'team_id2']].to_numpy()
+    if not new['match']['season'].isin(team_arrays['seasons']).all() or (team_ids >= n_teams).any():
+        team_arrays = None
+        return
+    delta = team_aggregates(new['match'], new['match_teams'], new['match_result'], new['toss'],
+                            seasons=team_arrays['seasons'], n_teams=n_teams)
+    for key, values in delta.items():
+        if key != 'seasons':
+            team_arrays[key] += values
+
+
+@timed('ingest')
+def ingest_match(tables):
+    """Add one new match to the loaded data, its CSVs and their snapshots.
+
+    tables maps table names from INGEST_TABLES to the match's new rows (a
+    list of dicts or a DataFrame with the CSV's columns); match, match_teams
+    and delivery are required. Every table is checked before anything is
+    written, then the CSVs are all written or none are (see append_rows),
+    and only then are the database and the loaded tables updated.
+    Aggregates that have already been built
+    (player profiles, matchups, team arrays, the phase cube) are updated
+    from the new rows alone; a match from a season they have not seen drops
+    them for a rebuild on next use instead. The venue tables hold medians and
+    percentiles, which one match cannot be added to, so they are always
+    dropped. Returns the number of rows added per table.
+    """
+    global delivery, venue_tables
+    unknown = set(tables) - set(INGEST_TABLES)
+    if unknown:
+        raise ValueError(f"unknown tables: {', '.join(sorted(unknown))}")
+    for name, rows in tables.items():
+        if rows is not None and not isinstance(rows, (list, pd.DataFrame)):
+            raise ValueError(f"{name}: expected a list of rows, got {type(rows).__name__}")
+    missing = REQUIRED_INGEST_TABLES - {name for name, rows in tables.items() if rows is not None and len(rows)}
+    if missing:
+        raise ValueError(f"missing rows for: {', '.join(sorted(missing))}")
+    ensure_tables(INGEST_TABLES)
+
+    new = {}
+    for name in INGEST_TABLES:
+        columns = list(pd.read_csv(f'{loaded_dir}/{name}.csv', nrows=0).columns)
+        new[name] = _ingest_frame(name, tables.get(name), columns)
+    match_ids = set()
+    for frame in new.values():
+        match_ids.update(frame['match_id'].tolist())
+    if len(match_ids) != 1:
+        raise ValueError(f"rows must all belong to one match, got match ids {sorted(match_ids)}")
+    match_id = match_ids.pop()
+    if (match['match_id'] == match_id).any():
+        raise ValueError(f"match {match_id} is already loaded")
+    if len(new['match']) != 1 or len(new['match_teams']) != 1:
+        raise ValueError("match and match_teams take exactly one row")
+    balls = ball_key(new['delivery']['match_id'], new['delivery']['inning'],
+                     new['delivery']['over'], new['delivery']['ball'])
+    d = new['dismissals']
+    unmatched = ~np.isin(ball_key(d['match_id'], d['inning'], d['over'], d['ball']), balls)
+    if unmatched.any():
+        bad = d.loc[unmatched, ['inning', 'over', 'ball']].astype(int).itertuples(index=False)
+        raise ValueError(f"dismissals on balls missing from delivery (inning, over, ball): {[tuple(b) for b in bad]}")
+
+    append_rows({f'{loaded_dir}/{name}.csv': new[name] for name in INGEST_TABLES if len(new[name])})
+    if database is not None:
+        def insert(conn):
+            for name in INGEST_TABLES:
+                if len(new[name]):
+                    sqlite_store.insert_rows(conn, name, new[name])
+            sqlite_store.record_sources(conn, loaded_dir, INGEST_TABLES)
+        database.write(insert)
+
+    for name in INGEST_TABLES:
+        if len(new[name]) and name != 'delivery':
+            current, new[name] = _align_categoricals(globals()[name], new[name])
+            globals()[name] = pd.concat([current, new[name]], ignore_index=True)
+    new_delivery = enrich_delivery(new['delivery'].copy(), match)
+    new_delivery = index_wickets(new_delivery, new['dismissals'])
+    with ExitStack() as held:
+        # no store is built from the old delivery while the new rows go in
+        for lock in _store_locks.values():
+            held.enter_context(lock)
+        delivery, new_delivery = _align_categoricals(delivery, new_delivery)
+        delivery = pd.concat([delivery, new_delivery], ignore_index=True)
+
+        if profiles is not None:
+            _update_profiles(new_delivery)
+        if matchup_tables is not None:
+            _update_matchups(new_delivery)
+        if team_arrays is not None:
+            _update_team_arrays(new)
+        if cube is not None:
+            _update_cube(new_delivery)
+        venue_tables = None
+        indexes.clear()
+    cache.clear()
+    return {name: len(frame) for name, frame in new.items()}
+
+
+def read_ingest_file(path):
+    """Read a new match's rows from a JSON file: {"match": [{...}], "delivery": [...], ...}."""
+    with open(path) as f:
+        tables = json.load(f)
+    if not isinstance(tables, dict):
+        raise ValueError(f"{path}: expected an object mapping table names to rows")
+    return tables
+
+
+# ---------------------------------------------------------------------------
+# Query results
+#
+# A query returns a plain dict instead of printing, so the same result can be
+# shown in the menu, written by batch mode or serialised to JSON:
+#   lines      - text shown first (headings, messages)
+#   summary    - list of (label, value) pairs shown as "label: value"
+#   title      - heading shown just above the rows
+#   rows       - DataFrame, one line per row via row_format
+#   row_format - str.format template applied to each row's columns
+#   footer     - text shown after the rows
+#   ok         - False when the inputs could not be resolved
+# ---------------------------------------------------------------------------
+
+def make_result(lines=None, summary=None, title=None, rows=None, row_format=None, footer=None, ok=True):
+    return {
+        'lines': list(lines or []),
+        'summary': list(summary or []),
+        'title': title,
+        'rows': rows,
+        'row_format': row_format,
+        'footer': list(footer or []),
+        'ok': ok,
+    }
+
+
+def not_found(message, kind=None, name=None):
+    """Result for an input that did not resolve, with the closest candidates."""
+    lines = [message]
+    if kind is not None:
+        options = resolvers[kind].candidates(name)
+        if options:
+            lines.append("Did you mean: " + ", ".join(options) + "?")
+    return make_result(lines=lines, ok=False)
+
+
+@timed('render')
+def render_result(result, out=None, limit=None, offset=0, page_size=None, more=None):
+    """Print a query result the way the interactive menu shows it.
+
+    limit and offset print only that slice of the rows; page_size asks more()
+    whether to go on after every page (see output.write_rows).
+    """
+    out = out or sys.stdout
+    head = list(result['lines'])
+    head += [f"{label}: {value}" for label, value in result['summary']]
+    if result['title']:
+        head.append(result['title'])
+    if head:
+        out.write('\n'.join(head) + '\n')
+    rows = result['rows']
+    if rows is not None:
+        shown = page_rows(rows, limit, offset)
+        write_rows(shown, result['row_format'], out, page_size, more)
+        if shown is not rows:
+            out.write(f"(rows {offset + 1}-{offset + len(shown)} of {len(rows)})\n")
+    if result['footer']:
+        out.write('\n'.join(result['footer']) + '\n')
+
+
+def result_to_json(result, limit=None, offset=0):
+    """Convert a query result into JSON-serialisable Python objects."""
+    rows = result['rows']
+    shown = page_rows(rows, limit, offset)
+    return {
+        'ok': result['ok'],
+        'lines': result['lines'],
+        'summary': {label: _json_value(value) for label, value in result['summary']},
+        'title': result['title'],
+        'rows': json.loads(shown.to_json(orient='records')) if rows is not None else None,
+        'total_rows': len(rows) if rows is not None else None,
+        'footer': result['footer'],
+    }
+
+
+def _json_value(value):
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is pd.NA or isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+def _int_param(value, default):
+    try:
+        return int(value) if str(value).strip() else default
+    except (TypeError, ValueError):
+        return default
+
+
+# ---------------------------------------------------------------------------
+# Queries 1-34
+# ---------------------------------------------------------------------------
+
+def display_projection(df, column_name, label):
+    values = df[column_name].tolist()
+    rows = pd.DataFrame({'n': range(1, len(values) + 1), 'value': values})
+    return make_result(
+        lines=["This is a projection type of query",
+               f"This query uses the {label}.csv and performs a projection on the attribute {column_name}"],
+        title=f"List of all {label}s in IPL:",
+        rows=rows,
+        row_format="{n}. {value}",
+        footer=[f"Total number of {label}s in IPL: {len(values)}"],
+    )
+
+
+def list_teams():
+    return display_projection(teams, 'team', 'team')
+
+
+def list_players():
+    return display_projection(players, 'player', 'player')
+
+
+def list_umpires():
+    return display_projection(umpire, 'umpire', 'umpire')
+
+
+def list_venues():
+    return display_projection(venue, 'venue', 'venue')
+
+
+def list_matches():
+    merged = match.merge(venue, on='venue_id', how='left') \
+          .merge(match_teams, on='match_id', how='left') \
+          .merge(teams.rename(columns={'team_id': 'team_id1', 'team': 'team1_name'}), on='team_id1', how='left') \
+          .merge(teams.rename(columns={'team_id': 'team_id2', 'team': 'team2_name'}), on='team_id2', how='left') \
+          .merge(umpire_match, on='match_id', how='left') \
+          .merge(umpire.rename(columns={'umpire_id': 'umpire_id1', 'umpire': 'umpire1_name'}), on='umpire_id1', how='left') \
+          .merge(umpire.rename(columns={'umpire_id': 'umpire_id2', 'umpire': 'umpire2_name'}), on='umpire_id2', how='left') \
+          .merge(match_result, on='match_id', how='left') \
+          .merge(teams.rename(columns={'team_id': 'winner_id', 'team': 'winner_name'}), on='winner_id', how='left') \
+          .merge(player_of_the_match, on='match_id', how='left') \
+          .merge(players.rename(columns={'player_id': 'player_of_the_match_id', 'player': 'pom_name'}), on='player_of_the_match_id', how='left')
+    rows = merged[['match_id', 'season', 'date', 'venue', 'team1_name', 'team2_name',
+                   'umpire1_name', 'umpire2_name', 'winner_name', 'pom_name']]
+    return make_result(
+        lines=["This query uses the following csvs:",
+               "1. match.csv -> match_id, season, date, venue_id",
+               "2. match_teams.csv -> match_id, team_id1, team_id2",
+               "3. teams.csv -> team_id, team_name",
+               "4. venue.csv -> venue_id, venue_name",
+               "5. umpire_match.csv -> match_id, umpire_id1, umpire_id2",
+               "6. umpire.csv -> umpire_id, umpire_name",
+               "7. match_result.csv -> match_id, winner_id",
+               "8. player_of_the_match.csv -> match_id, player_of_the_match_id",
+               "9. players.csv -> player_id, player",
+               "10. toss.csv -> match_id, team_id, toss_winner",
+               "\nThe below is the information about the matches:"],
+        title="Match ID | Season | Date | Venue | Team 1 | Team 2 | Umpire 1 | Umpire 2 | Winner | Player of the Match",
+        rows=rows,
+        row_format="{match_id} | {season} | {date} | {venue} | {team1_name} | {team2_name} | "
+                   "{umpire1_name} | {umpire2_name} | {winner_name} | {pom_name}",
+    )
+
+
+def player_stats(player):
+    player_id = get_player_id_by_name(player)
+    if player_id is None:
+        return not_found("Player not found. Please check the name.", 'player', player)
+    player_name = resolvers['player'].name(player_id)
+    _, career = profile_store()
+    totals = career.loc[player_id] if player_id in career.index else pd.Series(0, index=career.columns)
+    return make_result(summary=[
+        ("Player Name", player_name),
+        ("Runs Scored", totals['runs']),
+        ("Wickets Taken", totals['wickets']),
+        ("Catches Taken", totals['catches']),
+        ("Total number of matches played by the player", totals['matches']),
+    ])
+
+
+def player_of_match_awards(player):
+    player_id = get_player_id_by_name(player)
+    if player_id is None:
+        return not_found("Player not found. Please check the name.", 'player', player)
+    player_name = resolvers['player'].name(player_id)
+    potm_matches = player_of_the_match[player_of_the_match['player_of_the_match_id'] == player_id]
+    if potm_matches.empty:
+        return make_result(lines=[f"{player_name} has never been Player of the Match."])
+    merged_df = potm_matches.merge(match, on='match_id').merge(venue, on='venue_id')
+    rows = pd.DataFrame({
+        'n': range(1, len(merged_df) + 1),
+        'player': player_name,
+        'date': merged_df['date'].to_numpy(),
+        'venue': merged_df['venue'].to_numpy(),
+    })
+    return make_result(
+        summary=[("Player Name", player_name),
+                 ("Total number of matches in which the player was Player of the Match", len(merged_df))],
+        title="Player of the Match in the following matches:",
+        rows=rows,
+        row_format="{n} | {player} | {date} | {venue}",
+    )
+
+
+def head_to_head(team1='', team2=''):
+    if not str(team1).strip() and not str(team2).strip():
+        return head_to_head_report()
+    team1_id = get_team_id_by_name(team1)
+    team2_id = get_team_id_by_name(team2)
+    if team1_id is None or team2_id is None:
+        result = not_found("One or both team names are invalid.")
+        for name, tid in [(team1, team1_id), (team2, team2_id)]:
+            if tid is None:
+                result['lines'] += not_found('', 'team', name)['lines'][1:]
+        return result
+    team1_name = resolvers['team'].name(team1_id)
+    team2_name = resolvers['team'].name(team2_id)
+    arrays = team_store()
+    a, b = team_slot(team1_id), team_slot(team2_id)
+    played = a is not None and b is not None
+    matches_played = arrays['pair_matches'][a, b].sum() if played else 0
+    team1_wins = arrays['pair_wins'][a, b].sum() if played else 0
+    team2_wins = arrays['pair_wins'][b, a].sum() if played else 0
+    team1_toss_winds = arrays['pair_toss_wins'][a, b].sum() if played else 0
+    team2_toss_winds = arrays['pair_toss_wins'][b, a].sum() if played else 0
+    return make_result(
+        lines=[f"Head to head stats between {team1_name} and {team2_name}:"],
+        summary=[("Total matches played", matches_played),
+                 (f"{team1_name} wins", team1_wins),
+                 (f"{team2_name} wins", team2_wins),
+                 (f"{team1_name} toss wins", team1_toss_winds),
+                 (f"{team2_name} toss wins", team2_toss_winds)],
+    )
+
+
+def head_to_head_report():
+    """Head-to-head record of every pair of teams that has met."""
+    arrays = team_store()
+    matches = arrays['pair_matches'].sum(axis=2)
+    wins = arrays['pair_wins'].sum(axis=2)
+    toss_wins = arrays['pair_toss_wins'].sum(axis=2)
+    a, b = np.nonzero(np.triu(matches))
+    team_names = dict(zip(teams['team_id'], teams['team']))
+    rows = pd.DataFrame({
+        'team1_id': a, 'team2_id': b,
+        'team1': [team_names.get(t, f"id:{t}") for t in a],
+        'team2': [team_names.get(t, f"id:{t}") for t in b],
+        'matches': matches[a, b],
+        'team1_wins': wins[a, b], 'team2_wins': wins[b, a],
+        'team1_toss_wins': toss_wins[a, b], 'team2_toss_wins': toss_wins[b, a],
+    })
+    return make_result(
+        title="Head to head stats between every pair of teams:",
+        rows=rows,
+        row_format="{team1} vs {team2}: {matches} matches, wins {team1_wins}-{team2_wins}, "
+                   "toss wins {team1_toss_wins}-{team2_toss_wins}",
+    )
+
+
+def player_team_history(player):
+    player_id = get_player_id_by_name(player)
+    if player_id is None:
+        return not_found("Invalid player name.", 'player', player)
+    player_name = resolvers['player'].name(player_id)
+    history = player_seasons(player_id)
+    team_names = dict(zip(teams['team_id'], teams['team']))
+    rows = pd.DataFrame({
+        'season': history.index.astype(str),
+        'team': [team_names.get(t, "Not Played") for t in history['team_id']],
+    })
+    return make_result(
+        summary=[("Player Name", player_name)],
+        title="Team history:",
+        rows=rows,
+        row_format="Season {season}: {team}",
+    )
+
+
+def venue_batting_first(venue_name=''):
+    if not str(venue_name).strip():
+        return venue_results_report()
+    venue_id = get_venue_id_by_name(venue_name)
+    if venue_id is None:
+        return not_found("Invalid venue name.", 'venue', venue_name)
+    venue_name = resolvers['venue'].name(venue_id)
+    venues, venue_seasons = venue_store()
+    if venue_id not in venues.index:
+        return make_result(lines=["No matches played at this venue."])
+    stats = venues.loc[venue_id]
+    seasons = venue_seasons.xs(venue_id, level='venue_id')
+    rows = pd.DataFrame({
+        'season': seasons.index.astype(str),
+        'matches': seasons['matches'].to_numpy(),
+        'bat_first_wins': seasons['bat_first_wins'].to_numpy(),
+        'chase_wins': seasons['chase_wins'].to_numpy(),
+        'abandoned': seasons['abandoned'].to_numpy(),
+    })
+    return make_result(
+        lines=[f"Venue Name: {venue_name}", "Stats:"],
+        summary=[("Total matches played", int(stats['matches'])),
+                 ("Matches won while batting first", int(stats['bat_first_wins'])),
+                 ("Matches won while batting second", int(stats['chase_wins'])),
+                 ("Matches abandoned", int(stats['abandoned'])),
+                 ("Toss winners who chose to bat (won)",
+                  f"{int(stats['chose_bat'])} ({int(stats['chose_bat_wins'])})"),
+                 ("Toss winners who chose to field (won)",
+                  f"{int(stats['chose_field'])} ({int(stats['chose_field_wins'])})")],
+        title="By season:",
+        rows=rows,
+        row_format="Season {season}: {matches} matches, {bat_first_wins} won batting first, "
+                   "{chase_wins} won batting second, {abandoned} abandoned",
+    )
+
+
+def venue_results_report():
+    """Every venue ranked by the share of its decided matches won batting first."""
+    venues, _ = venue_store()
+    decided = venues['bat_first_wins'] + venues['chase_wins']
+    ranked = venues[decided > 0]
+    venue_names = dict(zip(venue['venue_id'], venue['venue']))
+    rows = pd.DataFrame({
+        'venue': [venue_names.get(v, f"id:{v}") for v in ranked.index],
+        'matches': ranked['matches'].to_numpy(),
+        'bat_first_wins': ranked['bat_first_wins'].to_numpy(),
+        'chase_wins': ranked['chase_wins'].to_numpy(),
+        'abandoned': ranked['abandoned'].to_numpy(),
+        'bat_first_pct': (ranked['bat_first_wins'] / decided[decided > 0] * 100).round(2).to_numpy(),
+    }).sort_values(['bat_first_pct', 'matches'], ascending=False, ignore_index=True)
+    return make_result(
+        title="Venues by share of matches won batting first:",
+        rows=rows,
+        row_format="{venue}: {bat_first_pct:.2f}% won batting first ({bat_first_wins} of "
+                   "{matches} matches, {chase_wins} won batting second, {abandoned} abandoned)",
+    )
+
+
+def venue_first_innings_average(venue_name=''):
+    if not str(venue_name).strip():
+        return venue_first_innings_report()
+    venue_id = get_venue_id_by_name(venue_name)
+    if venue_id is None:
+        return not_found("Invalid venue name.", 'venue', venue_name)
+    venue_name = resolvers['venue'].name(venue_id)
+    venues, venue_seasons = venue_store()
+    if venue_id not in venues.index:
+        return make_result(lines=["No matches played in this venue."])
+    stats = venues.loc[venue_id]
+    summary = [("Total matches played", int(stats['matches'])),
+               ("Matches counted (abandoned excluded)", int(stats['innings']))]
+    if stats['innings']:
+        summary += [("Average first innings score", f"{stats['first_innings_mean']:.2f}"),
+                    ("Median first innings score", f"{stats['first_innings_median']:.1f}"),
+                    ("Middle half of first innings scores",
+                     f"{stats['first_innings_p25']:.1f} - {stats['first_innings_p75']:.1f}"),
+                    ("Lowest first innings score", int(stats['first_innings_min'])),
+                    ("Highest first innings score", int(stats['first_innings_max']))]
+    seasons = venue_seasons.xs(venue_id, level='venue_id')
+    seasons = seasons[seasons['innings'] > 0]
+    rows = pd.DataFrame({
+        'season': seasons.index.astype(str),
+        'innings': seasons['innings'].to_numpy(),
+        'average': seasons['first_innings_mean'].round(2).to_numpy(),
+    })
+    return make_result(
+        lines=[f"Venue Name: {venue_name}", "Stats:"],
+        summary=summary,
+        title="By season:",
+        rows=rows,
+        row_format="Season {season}: average {average:.2f} over {innings} matches",
+    )
+
+
+def venue_first_innings_report():
+    """Every venue ranked by its average first innings score."""
+    venues, _ = venue_store()
+    ranked = venues[venues['innings'] > 0]
+    venue_names = dict(zip(venue['venue_id'], venue['venue']))
+    rows = pd.DataFrame({
+        'venue': [venue_names.get(v, f"id:{v}") for v in ranked.index],
+        'innings': ranked['innings'].to_numpy(),
+        'average': ranked['first_innings_mean'].round(2).to_numpy(),
+        'median': ranked['first_innings_median'].to_numpy(),
+        'lowest': ranked['first_innings_min'].astype(np.int64).to_numpy(),
+        'highest': ranked['first_innings_max'].astype(np.int64).to_numpy(),
+    }).sort_values(['average', 'innings'], ascending=False, ignore_index=True)
+    return make_result(
+        title="Venues by average first innings score (abandoned matches excluded):",
+        rows=rows,
+        row_format="{venue}: average {average:.2f}, median {median:.1f}, range {lowest}-{highest} "
+                   "over {innings} matches",
+    )
+
+
+def boundaries_per_season():
+    season_totals, _ = run_report({'by': ['season'], 'metrics': ['fours', 'sixes']})
+    return make_result(
+        title="Total number of 4s and 6s per season:",
+        rows=season_totals.rename(columns={'fours': 'four', 'sixes': 'six'}),
+        row_format="Season {season}: 4s = {four}, 6s = {six}",
+    )
+
+
+# the two regular innings; super overs stay out of phase averages
+REGULAR_INNINGS = [1, 2]
+PHASE_LABELS = {'powerplay': 'powerplay', 'middle': 'middle overs', 'death': 'death overs'}
+
+
+def phase_from_input(phase):
+    """'' -> 'powerplay', otherwise the phase named (case-insensitive), or None."""
+    name = str(phase).strip().lower() or 'powerplay'
+    return name if name in PHASES else None
+
+
+def phase_averages(team, phase, role, stat, title, row_text):
+    """Per-season stat per innings of a team in one phase, from the phase cube.
+
+    An empty team lists every team. title and row_text are formatted with
+    the phase's label; row_text follows "Season {season}: " in each row.
+    """
+    phase_name = phase_from_input(phase)
+    if phase_name is None:
+        return make_result(lines=[f"Invalid phase '{phase}': use powerplay, middle or death."], ok=False)
+    label = PHASE_LABELS[phase_name]
+    title = title.format(label=label)
+    row_format = "Season {season}: " + row_text.format(label=label)
+    where = {'phase': phase_name, 'inning': REGULAR_INNINGS, 'role': role}
+    if str(team).strip():
+        team_id = get_team_id_by_name(team)
+        if team_id is None:
+            return not_found("Invalid team name", 'team', team)
+        stats = cube_rollup(['season'], team_id=team_id, **where)
+        rows = pd.DataFrame({'season': stats.index.astype(str)})
+    else:
+        stats = cube_rollup(['team_id', 'season'], **where)
+        team_names = dict(zip(teams['team_id'], teams['team']))
+        rows = pd.DataFrame({
+            'team': [team_names.get(t, f"id:{t}") for t in stats.index.get_level_values('team_id')],
+            'season': stats.index.get_level_values('season').astype(str),
+        })
+        title = "Every team: " + title
+        row_format = "{team}, " + row_format[0].lower() + row_format[1:]
+    rows[stat] = stats[stat].to_numpy()
+    rows['matches'] = stats['innings'].to_numpy()
+    rows['average'] = rows[stat] / rows['matches']
+    return make_result(title=title, rows=rows, row_format=row_format)
+
+
+def powerplay_score(team='', phase=''):
+    return phase_averages(team, phase, 'batting', 'runs',
+                          "Average {label} score for each season:",
+                          "Average {label} score = {{average:.2f}}")
+
+
+def powerplay_wickets(team='', phase=''):
+    # a team's wickets include its run outs, so every dismissal counts
+    return phase_averages(team, phase, 'bowling', 'dismissals',
+                          "Average wickets taken in {label} for each season:",
+                          "Average wickets taken = {{average:.2f}}")
+
+
+def season_stats(season=''):
+    season_in = str(season).strip()
+    awards = season_awards(delivery, match, match_result, match_teams)
+    lines = ["Season Awards:"]
+    if season_in:
+        if season_in in awards.index:
+            awards = awards.loc[[season_in]]
+        else:
+            lines.append(f"No data found for season {season_in}.")
+            awards = awards.iloc[:0]
+    player_names = dict(zip(players['player_id'], players['player']))
+    team_names = dict(zip(teams['team_id'], teams['team']))
+    rows = awards.reset_index()
+    for col in ['orange_cap', 'purple_cap', 'most_sixes', 'most_fours', 'most_dot_balls']:
+        rows[f'{col}_name'] = rows[f'{col}_id'].map(player_names).fillna('Unknown')
+    for col in ['winner', 'runner_up']:
+        rows[f'{col}_name'] = rows[f'{col}_id'].map(team_names).fillna('Unknown')
+    return make_result(
+        lines=lines,
+        rows=rows,
+        row_format="\n Season {season}:\n"
+                   " Orange Cap: {orange_cap_name} ({orange_cap} runs)\n"
+                   " Purple Cap: {purple_cap_name} ({purple_cap} wickets)\n"
+                   " Most Sixes: {most_sixes_name} ({most_sixes} sixes)\n"
+                   " Most Fours: {most_fours_name} ({most_fours} fours)\n"
+                   " Most Dot Balls: {most_dot_balls_name} ({most_dot_balls} dot balls)\n"
+                   " Winner: {winner_name}\n"
+                   " Runner Up: {runner_up_name}",
+    )
+
+
+def umpire_matches(umpire_name):
+    umpire_id = get_umpire_id_by_name(umpire_name)
+    if umpire_id is None:
+        return not_found(f"Umpire '{umpire_name}' not found.", 'umpire', umpire_name)
+    umpire_name = resolvers['umpire'].name(umpire_id)
+    matches_judged = (umpire_match['umpire_id1'] == umpire_id).sum()
+    matches_judged+=(umpire_match['umpire_id2'] == umpire_id).sum()
+    return make_result(summary=[("Umpire Name", umpire_name),
+                                ("Total number of matches judged by the umpire", matches_judged)])
+
+
+def fifties_and_hundreds():
+    match_runs = delivery.groupby(['batter_id', 'season', 'match_id'], observed=True)['batsman_runs'].sum().reset_index()
+    match_runs['fifty'] = match_runs['batsman_runs'].between(50, 99)
+    match_runs['hundred'] = match_runs['batsman_runs'] >= 100
+    fifties_count = match_runs.groupby(['batter_id', 'season'], observed=True)['fifty'].sum().reset_index()
+    hundreds_count = match_runs.groupby(['batter_id', 'season'], observed=True)['hundred'].sum().reset_index()
+    stats = fifties_count.merge(hundreds_count, on=['batter_id', 'season'])
+    most_fifties = stats.loc[stats.groupby('season', observed=True)['fifty'].idxmax()].set_index('season')
+    most_hundreds = stats.loc[stats.groupby('season', observed=True)['hundred'].idxmax()].set_index('season')
+    player_names = dict(zip(players['player_id'], players['player']))
+    rows = pd.DataFrame({
+        'season': most_fifties.index.astype(str),
+        'fifties_player': most_fifties['batter_id'].map(player_names).to_numpy(),
+        'fifties': most_fifties['fifty'].to_numpy(),
+        'hundreds_player': most_hundreds['batter_id'].reindex(most_fifties.index).map(player_names).to_numpy(),
+        'hundreds': most_hundreds['hundred'].reindex(most_fifties.index).to_numpy(),
+    })
+    return make_result(
+        lines=["Calculating most 50s and 100s per season..."],
+        title="Most Fifties and Hundreds per season:",
+        rows=rows,
+        row_format="\n Season {season}:\n"
+                   " Most Fifties: {fifties_player} ({fifties} fifties)\n"
+                   " Most Hundreds: {hundreds_player} ({hundreds} hundreds)",
+    )
+
+
+def five_wicket_hauls():
+    wickets_per_match = delivery[delivery['bowler_wicket']] \
+        .groupby(['bowler_id', 'season', 'match_id'], observed=True).size().reset_index(name='wicket_count')
+    wickets_per_match = wickets_per_match[wickets_per_match['wicket_count'] >= 5]
+    hauls = wickets_per_match.groupby(['bowler_id', 'season'], observed=True).size().reset_index(name='five_wicket_hauls')
+    most_five_wickets = hauls.loc[hauls.groupby('season', observed=True)['five_wicket_hauls'].idxmax()].copy()
+    most_five_wickets['player'] = most_five_wickets['bowler_id'].map(dict(zip(players['player_id'], players['player'])))
+    return make_result(
+        title="Most 5-Wicket Takers per Season:",
+        rows=most_five_wickets,
+        row_format="\n Season {season}:\n Most 5-Wicket Taker: {player} ({five_wicket_hauls} times)",
+    )
+
+
+def bowler_vs_batter(bowler, batter):
+    bowler_id = get_player_id_by_name(bowler)
+    batter_id = get_player_id_by_name(batter)
+    if bowler_id is None or batter_id is None:
+        result = not_found(" Invalid bowler or batter name.")
+        for name, pid in [(bowler, bowler_id), (batter, batter_id)]:
+            if pid is None:
+                result['lines'] += not_found('', 'player', name)['lines'][1:]
+        return result
+    bowler_name = resolvers['player'].name(bowler_id)
+    batter_name = resolvers['player'].name(batter_id)
+    pairs, splits = matchup_store()
+    if (bowler_id, batter_id) not in pairs.index:
+        return make_result(lines=[" No deliveries found between this bowler and batter."])
+    pair = pairs.loc[(bowler_id, batter_id)]
+    phases = splits.loc[(bowler_id, batter_id)].groupby(level='phase', observed=True).sum().reset_index()
+    return make_result(
+        lines=["Bowler vs Batter Comparison", f"\n Head-to-Head: {bowler_name} vs {batter_name}"],
+        summary=[(" Balls Bowled", pair['balls']),
+                 (" Runs Scored", pair['runs']),
+                 (" Wickets Taken", pair['dismissals']),
+                 (" Dot Balls", pair['dots'])],
+        title=" By phase:",
+        rows=phases,
+        row_format="  {phase}: {balls} balls, {runs} runs, {dismissals} wickets, {dots} dots, {fours} 4s, {sixes} 6s",
+    )
+
+
+def top_matchups(player, role='batter', by='dismissals', top_n=10):
+    role = str(role).strip().lower() or 'batter'
+    by = str(by).strip().lower() or 'dismissals'
+    top_n = _int_param(top_n, 10)
+    if role not in ('batter', 'bowler'):
+        return make_result(lines=["Role must be batter or bowler."], ok=False)
+    if by not in MATCHUP_STATS:
+        return make_result(lines=["Rank by must be one of: " + ", ".join(MATCHUP_STATS) + "."], ok=False)
+    player_id = get_player_id_by_name(player)
+    if player_id is None:
+        return not_found("Player not found.", 'player', player)
+    player_name = resolvers['player'].name(player_id)
+    pairs, _ = matchup_store()
+    level = 'batter_id' if role == 'batter' else 'bowler_id'
+    opponent = 'bowler_id' if role == 'batter' else 'batter_id'
+    if player_id not in pairs.index.get_level_values(level):
+        return make_result(lines=[f"No deliveries found for {player_name} as {role}."])
+    faced = pairs.xs(player_id, level=level).reset_index()
+    faced = faced.sort_values([by, 'balls'], ascending=False, kind='stable').head(top_n)
+    faced['opponent'] = faced[opponent].map(dict(zip(players['player_id'], players['player'])))
+    faced['strike_rate'] = faced['runs'] / faced['balls'] * 100.0
+    against = 'bowlers' if role == 'batter' else 'batters'
+    return make_result(
+        title=f"Top {against} against {player_name} by {by}:",
+        rows=faced[['opponent', opponent] + MATCHUP_STATS + ['strike_rate']],
+        row_format="{opponent}: {dismissals} dismissals, {runs} runs off {balls} balls "
+                   "(SR {strike_rate:.2f}, {dots} dots, {fours} 4s, {sixes} 6s)",
+    )
+
+
+def parse_report_text(text):
+    """'batter=V Kohli; phase=middle|death' -> {'batter': ['V Kohli'], 'phase': ['middle', 'death']}."""
+    pairs = {}
+    for part in str(text).split(';'):
+        if not part.strip():
+            continue
+        name, sep, value = part.partition('=')
+        if not sep:
+            raise ValueError(f"expected NAME=VALUE, got '{part.strip()}'")
+        pairs[name.strip()] = [v.strip() for v in value.split('|')]
+    return pairs
+
+
+def custom_report(where='', by='', metrics='', minimum='', order_by='', limit=''):
+    try:
+        spec = {
+            'where': parse_report_text(where),
+            'by': [b.strip() for b in str(by).split(',') if b.strip()],
+            'metrics': [m.strip() for m in str(metrics).split(',') if m.strip()],
+            'min': {name: float(values[0]) for name, values in parse_report_text(minimum).items()},
+            'order_by': str(order_by).strip(),
+            'limit': str(limit).strip(),
+        }
+        rows, plan = run_report(spec)
+    except ValueError as e:
+        return make_result(lines=[f"Invalid report: {e}"], ok=False)
+    if rows is None:
+        return plan
+    for dim, kind in REPORT_ENTITIES.items():
+        if dim in rows.columns:
+            rows[dim] = entity_names(kind, rows[dim])
+    metrics = [c for c in rows.columns if c in query_engine.METRICS]
+    groups = [c for c in rows.columns if c not in metrics]
+    fields = [f"{{{c}:.2f}}" if pd.api.types.is_float_dtype(rows[c]) else f"{{{c}}}" for c in metrics]
+    return make_result(
+        title=f"{', '.join(metrics)}" + (f" by {', '.join(groups)}:" if groups else ":"),
+        rows=rows,
+        row_format=" | ".join([f"{{{c}}}" for c in groups] + [f"{m} {f}" for m, f in zip(metrics, fields)]),
+        footer=[f"Plan: {plan}"],
+    )
+
+
+def _update_database(table, column, value, id_col, row_id):
+    """Mirror a one-row rename of table's CSV into the attached database."""
+    if database is None:
+        return
+
+    def update(conn):
+        conn.execute(f'UPDATE {table} SET {column} = ? WHERE {id_col} = ?', (value, int(row_id)))
+        sqlite_store.record_sources(conn, loaded_dir, [table])
+    database.write(update)
+
+
+def update_team_name(old_name, new_name):
+    old_team_name = str(old_name).strip()
+    new_team_name = str(new_name).strip()
+    # Check if input is empty
+    if not old_team_name or not new_team_name:
+        return make_result(lines=["Team names cannot be empty."], ok=False)
+    team_id = resolvers['team'].resolve(old_team_name, exact=True)
+    if team_id is None:
+        return not_found(f"Team '{old_team_name}' not found.", 'team', old_team_name)
+    teams.loc[teams['team_id'] == team_id, 'team'] = new_team_name
+    resolvers['team'].rename(team_id, new_team_name)
+    teams.to_csv(f'{loaded_dir}/teams.csv', index=False)
+    _update_database('teams', 'team', new_team_name, 'team_id', team_id)
+    return make_result(lines=[f"Team name updated successfully from '{old_team_name}' to '{new_team_name}'."])
+
+
+def update_venue_name(old_name, new_name):
+    old_venue_name = str(old_name).strip()
+    new_venue_name = str(new_name).strip()
+    # Check if input is empty
+    if not old_venue_name or not new_venue_name:
+        return make_result(lines=["Venue names cannot be empty."], ok=False)
+    venue_id = resolvers['venue'].resolve(old_venue_name, exact=True)
+    if venue_id is None:
+        return not_found(f"Venue '{old_venue_name}' not found.", 'venue', old_venue_name)
+    venue.loc[venue['venue_id'] == venue_id, 'venue'] = new_venue_name
+    resolvers['venue'].rename(venue_id, new_venue_name)
+    venue.to_csv(f'{loaded_dir}/venue.csv', index=False)
+    _update_database('venue', 'venue', new_venue_name, 'venue_id', venue_id)
+    return make_result(lines=[f"Venue name updated successfully from '{old_venue_name}' to '{new_venue_name}'."])
+
+
+def team_matches_per_season(team, season=''):
+    team_id = get_team_id_by_name(team)
+    if team_id is None:
+        return not_found("Invalid team name.", 'team', team)
+    team_name = resolvers['team'].name(team_id)
+    arrays = team_store()
+    slot = team_slot(team_id)
+    seasons = arrays['seasons']
+    counts = arrays['team_matches'][slot] if slot is not None else np.zeros(len(seasons), dtype=np.int64)
+    keep = (counts > 0) & season_mask_from_input(pd.Series(seasons), season).to_numpy()
+    if not keep.any():
+        return make_result(lines=["No matches found for given inputs."])
+    out = pd.DataFrame({'season': seasons[keep], 'matches_played': counts[keep]})
+    return make_result(
+        title=f"Matches for {team_name}:",
+        rows=out,
+        row_format="Season {season}: {matches_played}",
+    )
+
+
+def top_run_scorers(season=''):
+    season_in = str(season).strip()
+    dsel = season_partition(season_in)
+    if dsel.empty:
+        return make_result(lines=["No data for that season."])
+    runs = dsel.groupby('batter_id')['batsman_runs'].sum().reset_index()
+    runs = runs.merge(players[['player_id','player']], left_on='batter_id', right_on='player_id', how='left')
+    runs = runs.sort_values('batsman_runs', ascending=False).head(10)
+    runs['player'] = runs['player'].fillna('id:' + runs['batter_id'].astype(str))
+    return make_result(
+        title=f"Top run-scorers in season {season_in if season_in else 'ALL'} (top 10):",
+        rows=runs[['batter_id', 'player', 'batsman_runs']],
+        row_format="{player}: {batsman_runs} runs",
+    )
+
+
+def economical_bowlers(season='', min_balls=100):
+    season_in = str(season).strip()
+    min_balls = _int_param(min_balls, 100)
+    spec = {'where': {'season': season_in} if season_in else {}, 'by': ['bowler'],
+            'metrics': ['economy', 'balls', 'total_runs'], 'min': {'balls': min_balls}}
+    grp, _ = run_report(spec)
+    if grp.empty:
+        if run_report(dict(spec, by=[], min={}))[0]['balls'].iloc[0] == 0:
+            return make_result(lines=["No data for that season."])
+        return make_result(lines=[f"No bowlers with at least {min_balls} balls in given season."])
+    grp = grp.sort_values('economy').head(10)
+    return make_result(
+        title=f"Top economical bowlers in season {season_in if season_in else 'ALL'} (min {min_balls} balls):",
+        rows=pd.DataFrame({
+            'bowler_id': grp['bowler'].to_numpy(),
+            'player': entity_names('player', grp['bowler']),
+            'economy': grp['economy'].to_numpy(),
+            'balls': grp['balls'].to_numpy(),
+            'runs_conceded': grp['total_runs'].to_numpy(),
+        }),
+        row_format="{player}: economy {economy:.2f} (Balls {balls}, Runs {runs_conceded})",
+    )
+
+
+def team_strike_rates(team, season='', min_balls=60):
+    season_in = str(season).strip()
+    min_balls = _int_param(min_balls, 60)
+    team_id = get_team_id_by_name(team)
+    if team_id is None:
+        return not_found("Invalid team name.", 'team', team)
+    team_name = resolvers['team'].name(team_id)
+    where = {'batting_team': team_name}
+    if season_in:
+        where['season'] = season_in
+    spec = {'where': where, 'by': ['batter'], 'metrics': ['strike_rate', 'runs', 'balls'],
+            'min': {'balls': min_balls}}
+    grp, _ = run_report(spec)
+    if grp.empty:
+        if run_report(dict(spec, by=[], min={}))[0]['balls'].iloc[0] == 0:
+            return make_result(lines=["No data for that team/season."])
+        return make_result(lines=[f"No batters with at least {min_balls} balls."])
+    grp = grp.sort_values('strike_rate', ascending=False).head(10)
+    return make_result(
+        title=f"Top strike rates for {team_name} in {season_in if season_in else 'ALL'} (min {min_balls} balls):",
+        rows=pd.DataFrame({
+            'batter_id': grp['batter'].to_numpy(),
+            'player': entity_names('player', grp['batter']),
+            'strike_rate': grp['strike_rate'].to_numpy(),
+            'runs': grp['runs'].to_numpy(),
+            'balls': grp['balls'].to_numpy(),
+        }),
+        row_format="{player}: SR {strike_rate:.2f} (Runs {runs}, Balls {balls})",
+    )
+
+
+def player_best_season(player):
+    pid = get_player_id_by_name(player)
+    if pid is None:
+        return not_found("Player not found.", 'player', player)
+    stats = player_seasons(pid).reset_index()
+    batted = stats[stats['balls'] > 0].sort_values('runs', ascending=False, kind='stable')
+    bowled = stats[stats['wickets'] > 0].sort_values('wickets', ascending=False, kind='stable')
+    lines = []
+    if not batted.empty:
+        top_run = batted.iloc[0]
+        lines.append(f"Best batting season: {top_run['season']} with {int(top_run['runs'])} runs")
+    else:
+        lines.append("No batting records found.")
+    if not bowled.empty:
+        top_wkt = bowled.iloc[0]
+        lines.append(f"Best bowling season: {top_wkt['season']} with {int(top_wkt['wickets'])} wickets")
+    else:
+        lines.append("No bowling records found.")
+    return make_result(lines=lines)
+
+
+def player_season_averages(player):
+    pid = get_player_id_by_name(player)
+    if pid is None:
+        return not_found("Player not found.", 'player', player)
+    pname = resolvers['player'].name(pid)
+    stats = player_seasons(pid).reset_index()
+    stats = stats[stats['balls'] > 0].copy()
+    if stats.empty:
+        return make_result(lines=["No batting records for this player."])
+    stats['strike_rate'] = stats['runs'] / stats['balls'] * 100.0
+    stats['average'] = stats['runs'] / stats['outs'].where(stats['outs'] > 0)
+    stats['avg_str'] = stats['average'].map(lambda avg: "NA" if pd.isna(avg) else f"{avg:.2f}")
+    return make_result(
+        title=f"Season-wise SR & Avg for {pname}:",
+        rows=stats[['season', 'runs', 'balls', 'outs', 'strike_rate', 'average', 'avg_str']],
+        row_format="{season}: SR={strike_rate:.2f}, Avg={avg_str} (Runs {runs}, Balls {balls}, Outs {outs})",
+    )
+
+
+def highest_partnerships(season='', group_by='season', top_n=1):
+    season_in = str(season).strip()
+    group_in = str(group_by).strip().lower() or 'season'
+    top_n = _int_param(top_n, 1)
+    group_cols = {'season': 'season', 'team': 'batting_team_id', 'wicket': 'wicket'}
+    if 'non_striker_id' not in delivery.columns:
+        return make_result(lines=["Partnership query requires 'non_striker_id' in delivery."], ok=False)
+    if group_in not in group_cols:
+        return make_result(lines=["Grouping must be one of: season, team, wicket."], ok=False)
+    # whole seasons keep every innings intact, so only their partitions are split
+    parts = partnerships(season_partition(season_in))
+    if parts.empty:
+        return make_result(lines=["No deliveries for the specified season."])
+    top = top_partnerships(parts, group_cols[group_in], top_n).copy()
+    player_names = dict(zip(players['player_id'], players['player']))
+    team_names = dict(zip(teams['team_id'], teams['team']))
+    top['player1'] = [player_names.get(p, f"id:{int(p)}") for p in top['p1']]
+    top['player2'] = [player_names.get(p, f"id:{int(p)}") for p in top['p2']]
+    top['team'] = top['batting_team_id'].map(team_names).fillna('Unknown')
+    top['label'] = {'season': "Season " + top['season'].astype(str),
+                    'team': top['team'],
+                    'wicket': "Wicket " + top['wicket'].astype(str)}[group_in]
+    return make_result(
+        title=f"Top {top_n} partnership(s) per {group_in} for '{season_in if season_in else 'ALL'}':",
+        rows=top,
+        row_format="{label}: {player1} & {player2} -> {runs} runs off {balls} balls ({team}, {season}, wicket {wicket})",
+    )
+
+
+def umpire_pairings():
+    um_df = get_umpire_match_df()
+    if um_df is None or um_df.empty:
+        return make_result(lines=["Umpire-match data not available (expected 'umpire_match' or 'umpir_match')."], ok=False)
+    um = um_df.copy()
+    um['u1'] = um[['umpire_id1','umpire_id2']].min(axis=1)
+    um['u2'] = um[['umpire_id1','umpire_id2']].max(axis=1)
+    top = um.groupby(['u1','u2']).size().reset_index(name='count').sort_values('count', ascending=False).head(10)
+    top = top.merge(umpire[['umpire_id','umpire']], left_on='u1', right_on='umpire_id', how='left') \
+            .merge(umpire[['umpire_id','umpire']], left_on='u2', right_on='umpire_id', how='left', suffixes=('_u1','_u2'))
+    top['umpire_u1'] = top['umpire_u1'].fillna('id:' + top['u1'].astype(str))
+    top['umpire_u2'] = top['umpire_u2'].fillna('id:' + top['u2'].astype(str))
+    return make_result(
+        title="Most frequent umpire pairings:",
+        rows=top[['u1', 'u2', 'umpire_u1', 'umpire_u2', 'count']],
+        row_format="{umpire_u1} & {umpire_u2}: {count} matches",
+    )
+
+
+def umpire_win_bias(umpire_name):
+    if 'umpire' not in globals() or 'umpire_id' not in umpire.columns:
+        return make_result(lines=["Umpire table not present or missing columns."], ok=False)
+    uid = get_umpire_id_by_name(umpire_name)
+    if uid is None:
+        return not_found("Umpire not found.", 'umpire', umpire_name)
+    umdf = get_umpire_match_df()
+    if umdf is None:
+        return make_result(lines=["Umpire-match table not available."], ok=False)
+    mids = umdf.loc[(umdf['umpire_id1'] == uid) | (umdf['umpire_id2'] == uid), 'match_id'].unique().tolist()
+    if len(mids) == 0:
+        return make_result(lines=["No matches found for this umpire."])
+    winners = match_result[match_result['match_id'].isin(mids)]
+    win_counts = winners.groupby('winner_id').size().reset_index(name='wins')
+    matches_played = match_teams[match_teams['match_id'].isin(mids)]
+    mp = pd.melt(matches_played, id_vars=['match_id'], value_vars=['team_id1','team_id2'], value_name='team_id')[['match_id','team_id']]
+    mp_counts = mp.groupby('team_id')['match_id'].nunique().reset_index(name='matches')
+    info = mp_counts.merge(win_counts, left_on='team_id', right_on='winner_id', how='left').fillna(0)
+    info = info.merge(teams[['team_id','team']], left_on='team_id', right_on='team_id', how='left')
+    info['win_pct'] = info['wins'] / info['matches'] * 100.0
+    info = info.sort_values('win_pct', ascending=False).head(15)
+    info['wins'] = info['wins'].astype(int)
+    return make_result(
+        title=f"Win % for teams in matches officiated by {resolvers['umpire'].name(uid)}:",
+        rows=info[['team_id', 'team', 'win_pct', 'wins', 'matches']],
+        row_format="{team}: {win_pct:.2f}% ({wins}/{matches})",
+    )
+
+
+def highest_scoring_matches(season=''):
+    season_in = str(season).strip()
+    if 'total_runs' not in delivery.columns:
+        return make_result(lines=["Column 'total_runs' not found in delivery."], ok=False)
+    dsel = season_partition(season_in)
+    if dsel.empty:
+        return make_result(lines=["No deliveries for that season."])
+    totals = dsel.groupby('match_id')['total_runs'].sum().reset_index(name='total_runs').sort_values('total_runs', ascending=False).head(10)
+    info = totals.merge(match[['match_id','season','date']], on='match_id', how='left') \
+                .merge(match_teams, on='match_id', how='left') \
+                .merge(teams.rename(columns={'team_id':'team_id1','team':'team1'}), on='team_id1', how='left') \
+                .merge(teams.rename(columns={'team_id':'team_id2','team':'team2'}), on='team_id2', how='left')
+    return make_result(
+        title=f"Top 10 highest-scoring matches in season {season_in if season_in else 'ALL'}:",
+        rows=info[['match_id', 'season', 'date', 'team1', 'team2', 'total_runs']],
+        row_format="{season} | {date}: {team1} vs {team2} -> Total runs {total_runs}",
+    )
+
+
+def playoff_appearances():
+    appearances = team_store()['team_playoffs'].sum(axis=1)
+    if not appearances.any():
+        return make_result(lines=["No playoff matches found in 'match.match_type'."])
+    counts = pd.DataFrame({'team_id': np.arange(len(appearances)), 'appearances': appearances})
+    counts = counts[counts['appearances'] > 0].sort_values('appearances', ascending=False, kind='stable')
+    counts = counts.merge(teams, left_on='team_id', right_on='team_id', how='left')
+    return make_result(
+        title="Top teams by playoff matches appearance:",
+        rows=counts.head(10),
+        row_format="{team}: {appearances} playoff matches appearance",
+    )
+
+
+def finals_winners():
+    finals_mask = match['match_type'].astype(str).str.contains('final', case=False, na=False)
+    finals_df = match.loc[finals_mask, ['match_id', 'season', 'date', 'match_type']].copy()
+
+    if finals_df.empty:
+        return make_result(lines=["No Finals found (check match_type values)."])
+    finals_df['date_parsed'] = pd.to_datetime(finals_df['date'], errors='coerce')
+
+    def pick_one_final(g):
+        if g['date_parsed'].notna().any():
+            return g.loc[g['date_parsed'].idxmax()]
+        else:
+            return g.loc[g['match_id'].idxmax()]
+
+    finals_picked = finals_df.groupby('season', as_index=False).apply(pick_one_final).reset_index(drop=True)
+
+    finals_with_winner = finals_picked.merge(match_result[['match_id', 'winner_id']], on='match_id', how='left')
+
+    finals_with_winner = finals_with_winner.merge(teams[['team_id', 'team']], left_on='winner_id', right_on='team_id', how='left')
+
+    finals_with_winner = finals_with_winner.sort_values(by=['date_parsed', 'season'], ascending=[True, True])
+    finals_with_winner['team'] = finals_with_winner['team'].fillna('Unknown')
+    return make_result(
+        title="Finals winners by season:",
+        rows=finals_with_winner[['season', 'match_id', 'date', 'winner_id', 'team']],
+        row_format="{season}: {team}",
+    )
+
+
+def playoff_player_of_match():
+    # Pick only playoff matches (Qualifier, Eliminator, Semi Final, Final)
+    pmask = match['match_type'].astype(str).str.contains('Qualifier|Eliminator|Final|Semi', case=False, na=False)
+    playoffs = match.loc[pmask, ['match_id', 'season', 'date', 'match_type']].copy()
+
+    if playoffs.empty:
+        return make_result(lines=["No playoff matches found."])
+    pom = player_of_the_match.merge(playoffs, on='match_id', how='inner')
+    pom = pom.merge(players, left_on='player_of_the_match_id', right_on='player_id', how='left')
+
+    if pom.empty:
+        return make_result(lines=["No Player-of-the-Match data for playoff matches."])
+    pom['player'] = pom['player'].fillna("Unknown Player")
+    pom['match_type'] = pom['match_type'].fillna("Playoff Match")
+    return make_result(
+        title="Player of the Match in playoff matches:",
+        rows=pom[['match_id', 'season', 'date', 'player_of_the_match_id', 'player', 'match_type']],
+        row_format="{date}: {player} ({match_type})",
+    )
+
+
+# choice -> (menu text, function, [(parameter, prompt), ...], [tables it reads])
+# The tables are loaded before the query runs (see query_tables); reports
+# (run_report) load whatever their plan reads.
+QUERIES = {
+    1: ("List of all teams in IPL", list_teams, [], ['teams']),
+    2: ("List of all players played in IPL", list_players, [], ['players']),
+    3: ("List of all umpires in IPL", list_umpires, [], ['umpire']),
+    4: ("List of all venues in IPL", list_venues, [], ['venue']),
+    5: ("List of all matches played in IPL and all information about them", list_matches, [],
+        ['match', 'match_result', 'match_teams', 'player_of_the_match', 'players', 'teams',
+         'umpire', 'umpire_match', 'venue']),
+    6: ("Particular player stats in IPL", player_stats,
+        [('player', "Enter the name of the player: ")],
+        ['delivery']),
+    7: ("How many times has a particular player became the man of match and in which matches", player_of_match_awards,
+        [('player', "Enter the name of the player: ")],
+        ['match', 'player_of_the_match', 'venue']),
+    8: ("Head to Head stats of any 2 teams", head_to_head,
+        [('team1', "Enter the name of the first team (press Enter for every pair): "),
+         ('team2', "Enter the name of the second team: ")],
+        ['match', 'match_result', 'match_teams', 'teams', 'toss']),
+    9: ("Player team history (player played from which team in which season)", player_team_history,
+        [('player', "Enter the name of the player: ")],
+        ['delivery', 'teams']),
+    10: ("For a given stadium, winning while batting first and winning while batting second", venue_batting_first,
+         [('venue_name', "Enter the name of the venue (press Enter for every venue): ")],
+         ['delivery', 'match', 'match_result', 'toss', 'venue']),
+    11: ("For a given stadium, average first innings score", venue_first_innings_average,
+         [('venue_name', "Enter the name of the venue (press Enter for every venue): ")],
+         ['delivery', 'match', 'match_result', 'toss', 'venue']),
+    12: ("Total number of 4s or 6s per season", boundaries_per_season, [], []),
+    13: ("Average powerplay score of a team for each season", powerplay_score,
+         [('team', "Enter the name of the team (press Enter for every team): "),
+          ('phase', "Enter powerplay, middle or death (press Enter for powerplay): ")],
+         ['delivery', 'teams']),
+    14: ("Average wickets taken in powerplay of a team for each season", powerplay_wickets,
+         [('team', "Enter the name of the team (press Enter for every team): "),
+          ('phase', "Enter powerplay, middle or death (press Enter for powerplay): ")],
+         ['delivery', 'teams']),
+    15: ("Particular season stats - purple cap, orange cap, most 4s, most 6s, most number of dot balls, winner, runner up", season_stats,
+         [('season', "Enter season or press Enter for ALL: ")],
+         ['delivery', 'match', 'match_result', 'match_teams', 'players', 'teams']),
+    16: ("Number of matches judged by a particular umpire", umpire_matches,
+         [('umpire_name', "Enter the name of the umpire: ")],
+         ['umpire_match']),
+    17: ("Most hundreds and fifties per season", fifties_and_hundreds, [], ['delivery', 'players']),
+    18: ("Most 5 wicket takers in a match per season", five_wicket_hauls, [], ['delivery', 'players']),
+    19: ("Bowler vs Batter comparison", bowler_vs_batter,
+         [('bowler', "Enter the name of the bowler: "),
+          ('batter', "Enter the name of the batter: ")],
+         ['delivery']),
+    20: ("Update team name", update_team_name,
+         [('old_name', "Enter the old name of the team: "),
+          ('new_name', "Enter the new name of the team: ")],
+         ['teams']),
+    21: ("Update venue name", update_venue_name,
+         [('old_name', "Enter the old name of the venue: "),
+          ('new_name', "Enter the new name of the venue: ")],
+         ['venue']),
+    22: ("Matches per season for a team", team_matches_per_season,
+         [('team', "Enter team name: "),
+          ('season', "Enter season or press Enter for all seasons: ")],
+         ['match', 'match_result', 'match_teams', 'toss']),
+    23: ("Top run-scorers in a season", top_run_scorers,
+         [('season', "Enter season (e.g., 2017 or 2017/18): ")],
+         ['delivery', 'players']),
+    24: ("Most economical bowlers in a season", economical_bowlers,
+         [('season', "Enter season: "),
+          ('min_balls', "Enter minimum balls threshold (press Enter for 100): ")],
+         []),
+    25: ("Best strike rates for a team in a season", team_strike_rates,
+         [('team', "Enter team name: "),
+          ('season', "Enter season or press Enter for all: "),
+          ('min_balls', "Enter minimum balls threshold (default 60): ")],
+         []),
+    26: ("Player's best season (highest runs/wickets)", player_best_season,
+         [('player', "Enter player name: ")],
+         ['delivery']),
+    27: ("Player strike rate & average per season", player_season_averages,
+         [('player', "Enter player name: ")],
+         ['delivery']),
+    28: ("Highest partnerships per season", highest_partnerships,
+         [('season', "Enter season or press Enter for ALL: "),
+          ('group_by', "Group by season, team or wicket (press Enter for season): "),
+          ('top_n', "How many partnerships per group (press Enter for 1): ")],
+         ['delivery', 'players', 'teams']),
+    29: ("Most frequent umpire pairings", umpire_pairings, [], ['umpire', 'umpire_match']),
+    30: ("Umpire win bias (team win % under specific umpire)", umpire_win_bias,
+         [('umpire_name', "Enter umpire name: ")],
+         ['match_result', 'match_teams', 'teams', 'umpire', 'umpire_match']),
+    31: ("Top 10 highest scoring matches in a season", highest_scoring_matches,
+         [('season', "Enter season or press Enter for ALL: ")],
+         ['delivery', 'match', 'match_teams', 'teams']),
+    32: ("Teams with most playoff appearances", playoff_appearances, [],
+         ['match', 'match_result', 'match_teams', 'teams', 'toss']),
+    33: ("Finals winners by season", finals_winners, [], ['match', 'match_result', 'teams']),
+    34: ("Player of the Match in playoff games", playoff_player_of_match, [],
+         ['match', 'player_of_the_match', 'players']),
+    36: ("Top bowler vs batter matchups for a player", top_matchups,
+         [('player', "Enter player name: "),
+          ('role', "Rank bowlers against this batter or batters against this bowler? (batter/bowler, press Enter for batter): "),
+          ('by', "Rank by balls, runs, dots, fours, sixes or dismissals (press Enter for dismissals): ")],
+         ['delivery', 'players']),
+    37: ("Custom report: any metrics grouped by season, phase, player, team or venue", custom_report,
+         [('where', "Filters, e.g. batter=V Kohli; phase=middle|death (press Enter for none): "),
+          ('by', "Group by, e.g. season,phase (press Enter for totals): "),
+          ('metrics', "Metrics, e.g. runs,balls,strike_rate (press Enter for runs,balls): "),
+          ('minimum', "Minimums, e.g. balls=60 (press Enter for none): "),
+          ('order_by', "Sort by a metric, - for descending, e.g. -runs (press Enter to skip): "),
+          ('limit', "Show at most this many rows (press Enter for all): ")],
+         []),
+}
+# the menu's exit number; it was 35 before later queries were added, so new
+# queries are numbered after it instead of pushing it along
+EXIT_CHOICE = 35
+
+# Tables whose names a query shows or resolves its inputs against. Renaming a
+# team (choice 20) or venue (choice 21) evicts only the cached results tagged
+# with that table.
+QUERY_TAGS = {
+    1: {'team'}, 4: {'venue'}, 5: {'team', 'venue'}, 7: {'venue'}, 8: {'team'},
+    9: {'team'}, 10: {'venue'}, 11: {'venue'}, 13: {'team'}, 14: {'team'},
+    15: {'team'}, 22: {'team'}, 25: {'team'}, 28: {'team'}, 30: {'team'},
+    31: {'team'}, 32: {'team'}, 33: {'team'}, 37: {'team', 'venue'},
+}
+RENAME_TAGS = {20: 'team', 21: 'venue'}
+# parameters holding a typed name, compared the way the resolvers compare them
+NAME_PARAMS = {'player', 'team', 'team1', 'team2', 'venue_name', 'umpire_name', 'bowler', 'batter'}
+
+cache = QueryCache(maxsize=256)
+
+
+def cache_key(choice, params, spec):
+    """Key for a query call; a missing parameter means the same as an empty one."""
+    normalized = {}
+    for name, _ in spec:
+        value = str(params.get(name, '')).strip()
+        normalized[name] = normalize_name(value) if name in NAME_PARAMS else value
+    return cache.make_key(choice, normalized)
+
+
+def run_query(choice, params=None):
+    """Run query `choice` with a dict of parameters; returns (result, seconds).
+
+    Successful results of read-only queries are served from the LRU cache.
+    """
+    if choice not in QUERIES:
+        raise ValueError(f"unknown query {choice}")
+    _, func, spec, _ = QUERIES[choice]
+    params = dict(params or {})
+    unknown = set(params) - {name for name, _ in spec}
+    if unknown:
+        raise ValueError(f"query {choice} does not take {', '.join(sorted(unknown))}")
+    start_time = time.perf_counter()
+    if choice in RENAME_TAGS:
+        with stage(f'query.{choice}'):
+            ensure_tables(query_tables(choice))
+            result = func(**params)
+        if result['ok']:
+            cache.invalidate(RENAME_TAGS[choice])
+        return result, time.perf_counter() - start_time
+    key = cache_key(choice, params, spec)
+    result = cache.get(key)
+    if result is None:
+        with stage(f'query.{choice}'):
+            ensure_tables(query_tables(choice))
+            result = func(**params)
+        # unresolved names are cheap to retry and echo the typed spelling back
+        if result['ok']:
+            cache.put(key, result, QUERY_TAGS.get(choice, ()))
+    else:
+        instrumentation.metrics.record(f'query.{choice}.cached', time.perf_counter() - start_time)
+    return result, time.perf_counter() - start_time
+
+
+def read_batch_file(path):
+    """Read queries from a JSON Lines file: {"choice": 6, "params": {"player": "V Kohli"}}.
+
+    A line may also give "limit" and "offset" to keep only part of the rows.
+    """
+    queries = []
+    with open(path) as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            spec = json.loads(line)
+            if 'choice' not in spec:
+                raise ValueError(f"{path}:{line_no}: missing 'choice'")
+            queries.append({'choice': int(spec['choice']), 'params': spec.get('params', {}),
+                            'limit': spec.get('limit'), 'offset': spec.get('offset', 0)})
+    return queries
+
+
+def run_batch(queries, limit=None, offset=0):
+    """Run queries back to back and return one record per query with its timing.
+
+    limit and offset apply to every query that does not set its own.
+    """
+    records = []
+    for i, q in enumerate(queries, 1):
+        record = {'index': i, 'choice': q['choice'], 'params': q['params']}
+        try:
+            result, seconds = run_query(q['choice'], q['params'])
+        except (TypeError, ValueError) as exc:
+            record.update(status='error', seconds=0.0, error=str(exc), result=None)
+        else:
+            q_limit = q['limit'] if q.get('limit') is not None else limit
+            q_offset = q.get('offset') or offset
+            record.update(status='ok' if result['ok'] else 'not_found', seconds=round(seconds, 6),
+                          result=result_to_json(result, q_limit, q_offset))
+        records.append(record)
+    return records
+
+
+def write_batch_output(records, path=None):
+    """Write batch records as JSON, or as CSV when path ends in .csv; stdout by default."""
+    if path and path.lower().endswith('.csv'):
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['index', 'choice', 'params', 'status', 'seconds', 'result'])
+            for r in records:
+                writer.writerow([r['index'], r['choice'], json.dumps(r['params']), r['status'],
+                                 r['seconds'], json.dumps(r['result'] if r['result'] else r.get('error'))])
+        return
+    text = json.dumps(records, indent=2)
+    if path:
+        with open(path, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="IPL Data Analysis Program")
+    parser.add_argument('--batch', metavar='FILE',
+                        help="run the queries listed in a JSON Lines file instead of the menu")
+    parser.add_argument('--query', type=int, metavar='N',
+                        help="run a single query non-interactively, with parameters as NAME=VALUE")
+    parser.add_argument('params', nargs='*', metavar='NAME=VALUE',
+                        help="parameters for --query")
+    parser.add_argument('--output', metavar='FILE',
+                        help="write batch results to FILE (.json or .csv) instead of stdout")
+    parser.add_argument('--data-dir', default=DATA_DIR,
+                        help="folder holding the normalized CSVs (default: %(default)s)")
+    parser.add_argument('--sqlite', metavar='FILE',
+                        help="answer reports with indexed SQL from this SQLite file, built from --data-dir if missing or stale")
+    parser.add_argument('--ingest', metavar='FILE', action='append', default=[],
+                        help="append the new match in a JSON file to the data before anything else; repeatable")
+    parser.add_argument('--limit', type=int, metavar='N', help="show at most N rows of each result")
+    parser.add_argument('--offset', type=int, default=0, metavar='N', help="skip the first N rows of each result")
+    parser.add_argument('--export', metavar='FILE',
+                        help="with --query, write the result rows to FILE (.csv, .json or .jsonl)")
+    parser.add_argument('--page-size', type=int, metavar='N',
+                        help="in the menu, pause after every N rows of a long listing")
+    parser.add_argument('--prefetch', action='store_true',
+                        help="load the ball-by-ball table in the background while the menu starts")
+    parser.add_argument('--no-sleep', dest='pauses', action='store_false',
+                        help="skip the menu's cosmetic pauses")
+    parser.add_argument('--metrics', metavar='FILE',
+                        help="on exit, write per-stage and per-query timings to FILE as JSON")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="also record allocations per stage with tracemalloc (slower)")
+    parser.add_argument('--profile', metavar='FILE',
+                        help="run under cProfile, dump the stats to FILE and print the hottest functions")
+    args = parser.parse_args(argv)
+    if args.params and args.query is None:
+        parser.error("NAME=VALUE parameters need --query")
+    if args.export and args.query is None:
+        parser.error("--export needs --query")
+    bad = [p for p in args.params if '=' not in p]
+    if bad:
+        parser.error(f"parameters must look like NAME=VALUE: {' '.join(bad)}")
+    return args
+
+
+def run_menu(pauses=True, page_size=None):
+    def pause(seconds=1):
+        if pauses:
+            time.sleep(seconds)
+
+    def more():
+        return input("-- Enter for more, q to stop -- ").strip().lower() != 'q'
 
     print("Welcome to the IPL Data Analysis Program!")
-    time.sleep(1)
+    pause()
     print("This program consists of the data of all IPL matches from 2008 to 2024")
-    time.sleep(1)
+    pause()
 
     while(True):
         print("\n")
         print("------------------------------------------------------")
         print("Please select any one of the below query")
-        print("1 - List of all teams in IPL")
-        print("2 - List of all players played in IPL")
-        print("3 - List of all umpires in IPL")
-        print("4 - List of all venues in IPL")
-        print("5 - List of all matches played in IPL and all information about them")
-        print("6 - Particular player stats in IPL")
-        print("7 - How many times has a particular player became the man of match and in which matches")
-        print("8 - Head to Head stats of any 2 teams")
-        print("9 - Player team history (player played from which team in which season)")
-        print("10 - For a given stadium, winning while batting first and winning while batting second")
-        print("11 - For a given stadium, average first innings score")
-        print("12 - Total number of 4s or 6s per season")
-        print("13 - Average powerplay score of a team for each season")
-        print("14 - Average wickets taken in powerplay of a team for each season")
-        print("15 - Particular season stats - purple cap, orange cap, most 4s, most 6s, most number of dot balls, winner, runner up")
-        print("16 - Number of matches judged by a particular umpire")
-        print("17 - Most hundreds and fifties per season")
-        print("18 - Most 5 wicket takers in a match per season")
-        print("19 - Bowler vs Batter comparison")
-        print("20 - Update team name")
-        print("21 - Update venue name")
-        print("22 - Matches per season for a team")
-        print("23 - Top run-scorers in a season")
-        print("24 - Most economical bowlers in a season")
-        print("25 - Best strike rates for a team in a season")
-        print("26 - Player's best season (highest runs/wickets)")
-        print("27 - Player strike rate & average per season")
-        print("28 - Highest partnerships per season")
-        print("29 - Most frequent umpire pairings")
-        print("30 - Umpire win bias (team win % under specific umpire)")
-        print("31 - Top 10 highest scoring matches in a season")
-        print("32 - Teams with most playoff appearances")
-        print("33 - Finals winners by season")
-        print("34 - Player of the Match in playoff games")
-        print("35 - Exit the program")
+        menu = {number: text for number, (text, _, _, _) in QUERIES.items()}
+        menu[EXIT_CHOICE] = "Exit the program"
+        for number in sorted(menu):
+            print(f"{number} - {menu[number]}")
 
         print("\n")
 
         choice=int(input("Enter your choice: "))
-        if choice==1:
-            display_projection(teams, 'team', 'team')
-        elif choice==2:
-            display_projection(players, 'player', 'player')
-        elif choice==3:
-            display_projection(umpire, 'umpire', 'umpire')
-        elif choice==4:
-            display_projection(venue, 'venue', 'venue')
-        elif choice==5:
-            start_time = time.time()
-            print("This query uses the following csvs:")
-            print("1. match.csv -> match_id, season, date, venue_id")
-            print("2. match_teams.csv -> match_id, team_id1, team_id2")
-            print("3. teams.csv -> team_id, team_name")
-            print("4. venue.csv -> venue_id, venue_name")
-            print("5. umpire_match.csv -> match_id, umpire_id1, umpire_id2")
-            print("6. umpire.csv -> umpire_id, umpire_name")
-            print("7. match_result.csv -> match_id, winner_id")
-            print("8. player_of_the_match.csv -> match_id, player_of_the_match_id")
-            print("9. players.csv -> player_id, player")
-            print("10. toss.csv -> match_id, team_id, toss_winner")
-            print("\nThe below is the information about the matches:")
-            print("Match ID | Season | Date | Venue | Team 1 | Team 2 | Umpire 1 | Umpire 2 | Winner | Player of the Match")
-
-            merged = match.merge(venue, on='venue_id', how='left') \
-                  .merge(match_teams, on='match_id', how='left') \
-                  .merge(teams.rename(columns={'team_id': 'team_id1', 'team': 'team1_name'}), on='team_id1', how='left') \
-                  .merge(teams.rename(columns={'team_id': 'team_id2', 'team': 'team2_name'}), on='team_id2', how='left') \
-                  .merge(umpire_match, on='match_id', how='left') \
-                  .merge(umpire.rename(columns={'umpire_id': 'umpire_id1', 'umpire': 'umpire1_name'}), on='umpire_id1', how='left') \
-                  .merge(umpire.rename(columns={'umpire_id': 'umpire_id2', 'umpire': 'umpire2_name'}), on='umpire_id2', how='left') \
-                  .merge(match_result, on='match_id', how='left') \
-                  .merge(teams.rename(columns={'team_id': 'winner_id', 'team': 'winner_name'}), on='winner_id', how='left') \
-                  .merge(player_of_the_match, on='match_id', how='left') \
-                  .merge(players.rename(columns={'player_id': 'player_of_the_match_id', 'player': 'pom_name'}), on='player_of_the_match_id', how='left')
-            for i, row in merged.iterrows():
-                print(f"{row['match_id']} | {row['season']} | {row['date']} | {row['venue']} | "
-                    f"{row['team1_name']} | {row['team2_name']} | {row['umpire1_name']} | {row['umpire2_name']} | "
-                    f"{row['winner_name']} | {row['pom_name']}")
-            print(f"\n Time taken: {time.time() - start_time:.4f} seconds\n")
-        elif choice==6:
-            
-            player_name = input("Enter the name of the player: ")
-            start_time = time.time()
-            try:
-                player_id = players[players['player'] == player_name]['player_id'].values[0]
-                batter_deliveries = delivery[delivery['batter_id'] == player_id]
-                runs_scored = batter_deliveries['batsman_runs'].sum()
-                matches_batted = batter_deliveries['match_id'].unique()
-                dismissals_merged = dismissals.merge(
-                    delivery,
-                    on=['match_id', 'inning', 'over', 'ball'],
-                    how='inner'
-                )
-                bowler_dismissals = dismissals_merged[dismissals_merged['bowler_id'] == player_id]
-
-                # bowler_deliveries = delivery[(delivery['bowler_id'] == player_id) & (dismissals['is_wicket'] == 1)]
-                wickets_taken = len(bowler_dismissals)
-                matches_bowled = set(bowler_dismissals['match_id'].unique())
-                catches = dismissals[(dismissals['dismissal_kind'] == 'caught') & (dismissals['fielder_id'] == player_id)]
-                catches_taken = len(catches)
-                matches_fielded = catches['match_id'].unique()
-                all_matches = set(matches_batted) | set(matches_bowled) | set(matches_fielded)
-                print(f"Player Name: {player_name}")
-                print(f"Runs Scored: {runs_scored}")
-                print(f"Wickets Taken: {wickets_taken}")
-                print(f"Catches Taken: {catches_taken}")
-                print("Total number of matches played by the player:", len(all_matches))
-                print(f"\n Time taken: {time.time() - start_time:.4f} seconds\n")
-            except IndexError:
-                 print("Player not found. Please check the name.")
-            
-        elif choice==7:
-            
-            player_name = input("Enter the name of the player: ")
-            start_time= time.time()
-            try:
-                player_id = players[players['player'] == player_name]['player_id'].values[0]
-                potm_matches = player_of_the_match[player_of_the_match['player_of_the_match_id'] == player_id]
-                if potm_matches.empty:
-                    print(f"{player_name} has never been Player of the Match.")
-                else:
-                    merged_df = potm_matches.merge(match, on='match_id').merge(venue, on='venue_id')
-                    print(f"Player Name: {player_name}")
-                    print("Total number of matches in which the player was Player of the Match:", len(merged_df))
-                    print("Player of the Match in the following matches:")
-                    for idx, row in merged_df.iterrows():
-                        print(f"{idx+1} | {player_name} | {row['date']} | {row['venue']}")
-                print(f"\n Time taken: {time.time() - start_time:.4f} seconds\n")
-            except IndexError:
-                print("Player not found. Please check the name.")
-        elif choice==8:
-
-            
-            team1_name=input("Enter the name of the first team: ")
-            team2_name=input("Enter the name of the second team: ")
-            start_time= time.time()
-            team_id_map = dict(zip(teams['team'], teams['team_id']))
-            team1_id = team_id_map.get(team1_name)
-            team2_id = team_id_map.get(team2_name)
-            if team1_id is None or team2_id is None:
-                print("One or both team names are invalid.")
-            else:
-                mask = (
-                    ((match_teams['team_id1'] == team1_id) & (match_teams['team_id2'] == team2_id)) |
-                    ((match_teams['team_id1'] == team2_id) & (match_teams['team_id2'] == team1_id))
-                )
-                relevant_matches = match_teams[mask]
-                match_ids = relevant_matches['match_id'].unique()
-                matches_played = len(match_ids)
-                relevant_results = match_result[match_result['match_id'].isin(match_ids)]
-                team1_wins = (relevant_results['winner_id'] == team1_id).sum()
-                team2_wins = (relevant_results['winner_id'] == team2_id).sum()
-                relevant_tosses = toss[toss['match_id'].isin(match_ids)]
-                team1_toss_winds = (relevant_tosses['toss_winner'] == team1_id).sum()
-                team2_toss_winds = (relevant_tosses['toss_winner'] == team2_id).sum()
-                print(f"Head to head stats between {team1_name} and {team2_name}:")
-                print(f"Total matches played: {matches_played}")
-                print(f"{team1_name} wins: {team1_wins}")
-                print(f"{team2_name} wins: {team2_wins}")
-                print(f"{team1_name} toss wins: {team1_toss_winds}")
-                print(f"{team2_name} toss wins: {team2_toss_winds}")
-            end_time = time.time()
-            print(f"Execution time: {end_time - start_time:.4f} seconds")
-            
-        elif choice==9:
-            
-            player_name = input("Enter the name of the player: ")
-            start_time = time.time()
-            player_row = players[players['player'] == player_name]
-            if player_row.empty:
-                print("Invalid player name.")
-            else:
-                player_id = player_row['player_id'].values[0]
-                delivery_season = delivery.merge(match[['match_id', 'season']], on='match_id', how='left')
-                dismissals_with_season = dismissals.merge(
-                    delivery_season,
-                    on=['match_id', 'inning', 'over', 'ball'],
-                    how='left'
-                )
-                caught_fielding_rows = dismissals_with_season[
-                    (dismissals_with_season['dismissal_kind'] == 'caught') &
-                    (dismissals_with_season['fielder_id'] == player_id)
-                ]
-                is_batter = delivery_season['batter_id'] == player_id
-                is_bowler = delivery_season['bowler_id'] == player_id
-                
-                batter_rows = delivery_season[is_batter][['season', 'batting_team_id']].drop_duplicates('season')
-                bowler_rows = delivery_season[is_bowler][['season', 'bowling_team_id']].drop_duplicates('season')
-                fielder_rows = caught_fielding_rows[['season', 'bowling_team_id']].drop_duplicates('season')
-                team_history = {}
-                for _, row in batter_rows.iterrows():
-                    team_history[row['season']] = row['batting_team_id']
-                for _, row in bowler_rows.iterrows():
-                    team_history.setdefault(row['season'], row['bowling_team_id'])
-                for _, row in fielder_rows.iterrows():
-                    team_history.setdefault(row['season'], row['bowling_team_id'])
-                print(f"Player Name: {player_name}")
-                print("Team history:")
-                for season in sorted(team_history.keys()):
-                    team_id = team_history[season]
-                    team_name_row = teams[teams['team_id'] == team_id]['team']
-                    team_name = team_name_row.values[0] if not team_name_row.empty else "Not Played"
-                    print(f"Season {season}: {team_name}")
-                end_time = time.time()
-                print(f"Execution time: {end_time - start_time:.4f} seconds")
-            
-        elif choice==10:
-            
-            venue_name=input("Enter the name of the venue: ")
-            start_time = time.time()
-            venue_row = venue[venue['venue'] == venue_name]
-            if venue_row.empty:
-                print("Invalid venue name.")
-            else:
-                venue_id = venue_row['venue_id'].values[0]
-                venue_matches = match[match['venue_id'] == venue_id]
-                if venue_matches.empty:
-                    print("No matches played at this venue.")
-                else:
-                    venue_match_results = venue_matches.merge(match_result, on='match_id', how='left')
-                    venue_match_results = venue_match_results.merge(toss, on='match_id', how='left')
-                    # venue_match_results = venue_match_results[venue_match_results['winner_id']]
-                    matches_played = len(venue_match_results)
-                    first_bat_wins=0
-                    second_bat_wins=0
-                    matches_abandoned=0
-                    for _, row in venue_match_results.iterrows():
-                        
-                        winner = row['winner_id']
-                        toss_winner = row['toss_winner']
-                        toss_decision = row['toss_decision']
-                        if pd.isna(winner):
-                            matches_abandoned += 1
-                            continue
-                        if toss_decision == 'bat':
-                            if winner == toss_winner:
-                                first_bat_wins += 1
-                            else:
-                                second_bat_wins += 1
-                        elif toss_decision == 'field':
-                            if winner == toss_winner:
-                                second_bat_wins += 1
-                            else:
-                                first_bat_wins += 1
-                    print(f"Venue Name: {venue_name}")
-                    print("Stats:")
-                    print(f"Total matches played: {matches_played}")
-                    print(f"Matches won while batting first: {first_bat_wins}")
-                    print(f"Matches won while batting second: {second_bat_wins}")
-                    print(f"Matches abandoned: {matches_abandoned}")
-
-            end_time = time.time()
-            print(f"Execution time: {end_time - start_time:.4f} seconds")
-                        
-        elif choice==11:
-            
-            venue1=input("Enter the name of the venue: ")
-            start_time = time.time()
-            venue_row = venue[venue['venue'] == venue1]
-            if venue_row.empty:
-                print("Invalid venue name.")
-            else:
-                venue_id = venue_row['venue_id'].values[0]
-                venue_matches = match[match['venue_id'] == venue_id]
-                if venue_matches.empty:
-                    print("No matches played in this venue.")
-                else:
-                    first_innings = delivery[
-                        (delivery['match_id'].isin(venue_matches['match_id'])) &
-                        (delivery['inning'] == 1)
-                    ]
-                    total_runs = first_innings['total_runs'].sum()
-                    matches_played = venue_matches.shape[0]
-                    average_runs = total_runs / matches_played if matches_played > 0 else 0
-                    print(f"Venue Name: {venue1}")
-                    print("Stats:")
-                    print(f"Total matches played: {matches_played}")
-                    print(f"Average first innings score: {average_runs:.2f}")
-                end_time = time.time()
-                print(f"Execution time: {end_time - start_time:.4f} seconds")
-        elif choice==12:
-            start_time = time.time()
-            delivery_season = delivery.merge(match[['match_id', 'season']], on='match_id', how='left')
-            delivery_season['four'] = (delivery_season['batsman_runs'] == 4).astype(int)
-            delivery_season['six'] = (delivery_season['batsman_runs'] == 6).astype(int)
-            season_totals = delivery_season.groupby('season')[['four', 'six']].sum().reset_index()
-            print("Total number of 4s and 6s per season:")
-            for _, row in season_totals.iterrows():
-                print(f"Season {(row['season'])}: 4s = {row['four']}, 6s = {row['six']}")
-            end_time = time.time()
-            print(f"\nExecution time: {end_time - start_time:.4f} seconds")
-        elif choice==13:
-            
-            team_name = input("Enter the name of the team: ")
-            start_time = time.time()
-            team_id = teams[teams['team'] == team_name]['team_id'].values[0]
-            delivery_season = delivery.merge(match[['match_id', 'season']], on='match_id', how='left')
-            powerplay = delivery_season[(delivery_season['batting_team_id'] == team_id) & (delivery_season['over'] < 6)]
-            runs_by_season = powerplay.groupby('season')['total_runs'].sum().reset_index()
-            matches_by_season = powerplay[['season', 'match_id']].drop_duplicates().groupby('season').size().reset_index(name='matches')
-            stats = runs_by_season.merge(matches_by_season, on='season')
-            stats['avg_powerplay'] = stats['total_runs'] / stats['matches']
-            print("Average powerplay score for each season:")
-            for _, row in stats.iterrows():
-                 print(f"Season {(row['season'])}: Average powerplay score = {row['avg_powerplay']:.2f}")
-            end_time = time.time()
-            print(f"\nExecution time: {end_time - start_time:.4f} seconds")
-        elif choice==14:
-            
-            team_name = input("Enter the name of the team: ")
-            start_time = time.time()
-            team_row = teams[teams['team'] == team_name]
-            if team_row.empty:
-                print("Invalid team name")
-            else:
-                team_id = team_row['team_id'].values[0]
-                delivery_season = delivery.merge(match[['match_id', 'season']], on='match_id', how='left')
-                dismissals_season = dismissals.merge(
-                    delivery_season[['match_id', 'inning', 'over', 'ball', 'season', 'bowling_team_id']],
-                    on=['match_id', 'inning', 'over', 'ball'],
-                    how='left'
-                )
-                powerplay = dismissals_season[
-                    (dismissals_season['bowling_team_id'] == team_id) &
-                    (dismissals_season['over'] < 6)
-                ]
-            
-                wickets_by_season = powerplay.groupby('season').size().reset_index(name='wickets')
-                matches_by_season = powerplay[['season', 'match_id']].drop_duplicates().groupby('season').size().reset_index(name='matches')
-                stats = wickets_by_season.merge(matches_by_season, on='season')
-                stats['avg_powerplay'] = stats['wickets'] / stats['matches']
-                print("Average wickets taken in powerplay for each season:")
-                for _, row in stats.iterrows():
-                    print(f"Season {(row['season'])}: Average wickets taken = {row['avg_powerplay']:.2f}")
-                end_time = time.time()
-                print(f"\nExecution time: {end_time - start_time:.4f} seconds")
-        elif choice == 15:
-            start_time = time.time()
-            player_stats = defaultdict(lambda: defaultdict(lambda: {
-                'sixes': 0, 'fours': 0, 'dot_balls': 0, 'wickets': 0, 'runs': 0
-            }))
-            winner_ipl = {}
-            runner_up_ipl = {}
-
-            match_season = dict(zip(match['match_id'], match['season']))
-            match_type = dict(zip(match['match_id'], match['match_type']))
-            match_result_dict = dict(zip(match_result['match_id'], match_result['winner_id']))
-            match_teams_dict = match_teams.set_index('match_id')[['team_id1', 'team_id2']].to_dict(orient='index')
-            team_names = teams.set_index('team_id')['team'].to_dict()
-
-            merged_df = pd.merge(delivery, dismissals,
-                                on=['match_id', 'inning', 'over', 'ball'],
-                                how='left')
-
-            for idx, row in merged_df.iterrows():
-                match_id = row['match_id']
-                season = match_season.get(match_id)
-                type = match_type.get(match_id)
-                batter_id = row['batter_id']
-                bowler_id = row['bowler_id']
-                runs = row['batsman_runs']
-                total_runs = row['total_runs']
-
-                if type and "Final" in str(type) and season not in winner_ipl:
-                    winner_id = match_result_dict.get(match_id)
-                    team1_id = match_teams_dict.get(match_id, {}).get('team_id1')
-                    team2_id = match_teams_dict.get(match_id, {}).get('team_id2')
-                    if winner_id:
-                        winner_ipl[season] = team_names.get(winner_id, "Unknown")
-                        runner_up_id = team2_id if winner_id == team1_id else team1_id
-                        runner_up_ipl[season] = team_names.get(runner_up_id, "Unknown")
-
-                stats = player_stats[batter_id][season]
-                stats['runs'] += runs
-                if runs == 4:
-                    stats['fours'] += 1
-                elif runs == 6:
-                    stats['sixes'] += 1
-
-                # bowling stats
-                stats = player_stats[bowler_id][season]
-                if pd.notna(row.get('dismissal_kind')):
-                    stats['wickets'] += 1
-                elif total_runs == 0:
-                    stats['dot_balls'] += 1
-
-            orange_cap = defaultdict(lambda: (None, 0))
-            purple_cap = defaultdict(lambda: (None, 0))
-            most_sixes = defaultdict(lambda: (None, 0))
-            most_fours = defaultdict(lambda: (None, 0))
-
-            for player_id, seasons in player_stats.items():
-                for season, stats in seasons.items():
-                    if stats['runs'] > orange_cap[season][1]:
-                        orange_cap[season] = (player_id, stats['runs'])
-                    if stats['wickets'] > purple_cap[season][1]:
-                        purple_cap[season] = (player_id, stats['wickets'])
-                    if stats['sixes'] > most_sixes[season][1]:
-                        most_sixes[season] = (player_id, stats['sixes'])
-                    if stats['fours'] > most_fours[season][1]:
-                        most_fours[season] = (player_id, stats['fours'])
-
-            season_in = input("Enter season or press Enter for ALL: ").strip()
-
-            print("Season Awards:")
-            if season_in:
-                if season_in in orange_cap:
-                    seasons_to_print = [season_in]
-                else:
-                    print(f"No data found for season {season_in}.")
-                    seasons_to_print = []
-            else:
-                seasons_to_print = sorted(orange_cap.keys())
-
-            for season in seasons_to_print:
-                orange_player = players[players['player_id'] == orange_cap[season][0]]['player'].values[0]
-                purple_player = players[players['player_id'] == purple_cap[season][0]]['player'].values[0]
-                sixes_player = players[players['player_id'] == most_sixes[season][0]]['player'].values[0]
-                fours_player = players[players['player_id'] == most_fours[season][0]]['player'].values[0]
-                print(f"\n Season {season}:")
-                print(f" Orange Cap: {orange_player} ({orange_cap[season][1]} runs)")
-                print(f" Purple Cap: {purple_player} ({purple_cap[season][1]} wickets)")
-                print(f" Most Sixes: {sixes_player} ({most_sixes[season][1]} sixes)")
-                print(f" Most Fours: {fours_player} ({most_fours[season][1]} fours)")
-                print(f" Winner: {winner_ipl.get(season,'Unknown')}")
-                print(f" Runner Up: {runner_up_ipl.get(season,'Unknown')}")
-
-            end_time = time.time()
-            print(f"\nExecution time: {end_time - start_time:.4f} seconds")
-
-        elif choice==16:
-            
-            umpire_name = input("Enter the name of the umpire: ").strip()
-            start_time= time.time()
-            umpire_row = umpire[umpire['umpire'].str.lower() == umpire_name.lower()]
-            if umpire_row.empty:
-                print(f"Umpire '{umpire_name}' not found.")
-            else:
-                umpire_id = umpire_row['umpire_id'].values[0]
-                matches_judged = (umpire_match['umpire_id1'] == umpire_id).sum()
-                matches_judged+=(umpire_match['umpire_id2'] == umpire_id).sum()
-                print(f"Umpire Name: {umpire_name}")
-                print("Total number of matches judged by the umpire:", matches_judged)
-                print(f"\n Time taken: {time.time() - start_time:.4f} seconds\n")
-        elif choice==17:
-            start_time= time.time()
-            print("Calculating most 50s and 100s per season...")
-            delivery_with_season = delivery.merge(match[['match_id', 'season']], on='match_id')
-            match_runs = delivery_with_season.groupby(['batter_id', 'season', 'match_id'])['batsman_runs'].sum().reset_index()
-            match_runs['fifty'] = match_runs['batsman_runs'].between(50, 99)
-            match_runs['hundred'] = match_runs['batsman_runs'] >= 100
-            fifties_count = match_runs.groupby(['batter_id', 'season'])['fifty'].sum().reset_index()
-            hundreds_count = match_runs.groupby(['batter_id', 'season'])['hundred'].sum().reset_index()
-            stats = fifties_count.merge(hundreds_count, on=['batter_id', 'season'])
-            most_fifties = stats.loc[stats.groupby('season')['fifty'].idxmax()]
-            most_hundreds = stats.loc[stats.groupby('season')['hundred'].idxmax()]
-            print("Most Fifties and Hundreds per season:")
-            for season in sorted(stats['season'].unique()):
-                fifties_row = most_fifties[most_fifties['season'] == season]
-                hundreds_row = most_hundreds[most_hundreds['season'] == season]
-                fifties_player = players[players['player_id'] == fifties_row['batter_id'].values[0]]['player'].values[0]
-                hundreds_player = players[players['player_id'] == hundreds_row['batter_id'].values[0]]['player'].values[0]
-                print(f"\n Season {season}:")
-                print(f" Most Fifties: {fifties_player} ({fifties_row['fifty'].values[0]} fifties)")
-                print(f" Most Hundreds: {hundreds_player} ({hundreds_row['hundred'].values[0]} hundreds)")
-            print(f"\n Time taken: {time.time() - start_time:.4f} seconds\n")
-                                
-        elif choice==18:
-            start_time=time.time()
-            delivery_with_season = delivery.merge(match[['match_id', 'season']], on='match_id')
-            merged = delivery_with_season.merge(
-                dismissals[['match_id', 'inning', 'over', 'ball']],
-                on=['match_id', 'inning', 'over', 'ball'],
-                how='left',
-                indicator=True
-            )
-            merged['is_wicket'] = merged['_merge'] == 'both'
-            wickets_per_match = merged[merged['is_wicket']] \
-                .groupby(['bowler_id', 'season', 'match_id']).size().reset_index(name='wicket_count')
-            wickets_per_match = wickets_per_match[wickets_per_match['wicket_count'] >= 5]
-            five_wicket_hauls = wickets_per_match.groupby(['bowler_id', 'season']).size().reset_index(name='five_wicket_hauls')
-            most_five_wickets = five_wicket_hauls.loc[five_wicket_hauls.groupby('season')['five_wicket_hauls'].idxmax()]
-            print("Most 5-Wicket Takers per Season:")
-            for _, row in most_five_wickets.iterrows():
-                player_name = players[players['player_id'] == row['bowler_id']]['player'].values[0]
-                print(f"\n Season {row['season']}:")
-                print(f" Most 5-Wicket Taker: {player_name} ({row['five_wicket_hauls']} times)") 
-            print(f"\n Time taken: {time.time() - start_time:.4f} seconds\n")       
-        elif choice==19:
-            
-            print("Bowler vs Batter Comparison")
-            bowler_name = input("Enter the name of the bowler: ").strip()
-            batter_name = input("Enter the name of the batter: ").strip()
-            start_time=time.time()
-            bowler_row = players[players['player'].str.lower() == bowler_name.lower()]
-            batter_row = players[players['player'].str.lower() == batter_name.lower()]
-            if bowler_row.empty or batter_row.empty:
-                print(" Invalid bowler or batter name.")
-            else:
-                bowler_id = bowler_row['player_id'].values[0]
-                batter_id = batter_row['player_id'].values[0]
-                vs_df = delivery[(delivery['bowler_id'] == bowler_id) & (delivery['batter_id'] == batter_id)]
-                if vs_df.empty:
-                    print(" No deliveries found between this bowler and batter.")
-                else:
-                    vs_df = vs_df.copy()
-                    vs_df = vs_df.merge(
-                        dismissals[['match_id', 'inning', 'over', 'ball']],
-                        on=['match_id', 'inning', 'over', 'ball'],
-                        how='left',
-                        indicator=True
-                    )
-                    vs_df['is_wicket'] = vs_df['_merge'] == 'both'
-                    # vs_df['is_wicket'] = dismissals.loc[vs_df.index, 'is_wicket']
-                    total_balls = len(vs_df)
-                    total_runs = vs_df['batsman_runs'].sum()
-                    dot_balls = (vs_df['total_runs'] == 0).sum()
-                    wickets = vs_df['is_wicket'].sum()
-                    print(f"\n Head-to-Head: {bowler_name} vs {batter_name}")
-                    print(f" Balls Bowled: {total_balls}")
-                    print(f" Runs Scored: {total_runs}")
-                    print(f" Wickets Taken: {wickets}")
-                    print(f" Dot Balls: {dot_balls}")
-                    print(f"\n Time taken: {time.time() - start_time:.4f} seconds\n")                       
-        elif choice==20:
-            
-            old_team_name = input("Enter the old name of the team: ").strip()
-            new_team_name = input("Enter the new name of the team: ").strip()
-            start_time= time.time()
-
-            # Check if input is empty
-            if not old_team_name or not new_team_name:
-                print("Team names cannot be empty.")
-            else:
-                team_id = teams[teams['team'].str.lower() == old_team_name.lower()]['team_id'].values
-
-                if len(team_id) == 0:
-                    print(f"Team '{old_team_name}' not found.")
-                else:
-                    team_id = team_id[0]
-                    teams.loc[teams['team_id'] == team_id, 'team'] = new_team_name
-                    teams.to_csv('normalized csvs/teams.csv', index=False)
-                    print(f"Team name updated successfully from '{old_team_name}' to '{new_team_name}'.")
-                    print(f"\n Time taken: {time.time() - start_time:.4f} seconds\n")
-
-        elif choice==21:
-            old_venue_name = input("Enter the old name of the venue: ").strip()
-            new_venue_name = input("Enter the new name of the venue: ").strip()
-            start_time= time.time()
-
-            # Check if input is empty
-            if not old_venue_name or not new_venue_name:
-                print("Venue names cannot be empty.")
-            else:
-                venue_id = venue[venue['venue'].str.lower() == old_venue_name.lower()]['venue_id'].values
-
-                if len(venue_id) == 0:
-                    print(f"Venue '{old_venue_name}' not found.")
-                else:
-                    venue_id = venue_id[0]
-                    venue.loc[venue['venue_id'] == venue_id, 'venue'] = new_venue_name
-                    venue.to_csv('normalized csvs/venue.csv', index=False)
-                    print(f"Venue name updated successfully from '{old_venue_name}' to '{new_venue_name}'.")
-                    print(f"\n Time taken: {time.time() - start_time:.4f} seconds\n")
-       
-        elif choice==22:
-            team_name = input("Enter team name: ").strip()
-            season_in = input("Enter season or press Enter for all seasons: ").strip()
-            start_time = time.time()
-            trow = teams[teams['team'].str.lower() == team_name.lower()]
-            if trow.empty:
-                print("Invalid team name.")
-            else:
-                team_id = trow['team_id'].values[0]
-                mt = match_teams.merge(match[['match_id','season']], on='match_id', how='left')
-                # select rows where either team1 or team2 is the team
-                sel = mt[(mt['team_id1']==team_id) | (mt['team_id2']==team_id)].copy()
-                sel = sel[ season_mask_from_input(sel['season'], season_in) ]
-                if sel.empty:
-                    print("No matches found for given inputs.")
-                else:
-                    out = sel.groupby('season').size().reset_index(name='matches_played').sort_values('season')
-                    print(f"Matches for {team_name}:")
-                    for _, r in out.iterrows():
-                        print(f"Season {r['season']}: {int(r['matches_played'])}")
-            print(f"\n Time taken: {time.time() - start_time:.4f} seconds\n")
-
-        elif choice==23:
-            season_in = input("Enter season (e.g., 2017 or 2017/18): ").strip()
-            start_time = time.time()
-            d = delivery.merge(match[['match_id','season']], on='match_id', how='left')
-            mask = season_mask_from_input(d['season'], season_in)
-            dsel = d[mask]
-            if dsel.empty:
-                print("No data for that season.")
-            else:
-                runs = dsel.groupby('batter_id')['batsman_runs'].sum().reset_index()
-                runs = runs.merge(players[['player_id','player']], left_on='batter_id', right_on='player_id', how='left')
-                runs = runs.sort_values('batsman_runs', ascending=False).head(10)
-                print(f"Top run-scorers in season {season_in if season_in else 'ALL'} (top 10):")
-                for _, r in runs.iterrows():
-                    name = r['player'] if pd.notna(r['player']) else f"id:{int(r['batter_id'])}"
-                    print(f"{name}: {int(r['batsman_runs'])} runs")
-            print(f"\n Time taken: {time.time() - start_time:.4f} seconds\n")
-
-        elif choice==24:
-            season_in = input("Enter season: ").strip()
-            min_balls_in = input("Enter minimum balls threshold (press Enter for 100): ").strip()
-            try:
-                min_balls = int(min_balls_in) if min_balls_in else 100
-            except:
-                min_balls = 100
-            start_time = time.time()
-            d = delivery.merge(match[['match_id','season']], on='match_id', how='left')
-            dsel = d[ season_mask_from_input(d['season'], season_in) ]
-            if dsel.empty:
-                print("No data for that season.")
-            else:
-                grp = dsel[dsel['bowler_id']>0].groupby('bowler_id').agg(balls=('bowler_id','size'),
-                                                                          runs_conceded=('total_runs','sum')).reset_index()
-                grp = grp[grp['balls'] >= min_balls].copy()
-                if grp.empty:
-                    print(f"No bowlers with at least {min_balls} balls in given season.")
-                else:
-                    grp['economy'] = (grp['runs_conceded'] / grp['balls']) * 6.0
-                    grp = grp.merge(players[['player_id','player']], left_on='bowler_id', right_on='player_id', how='left')
-                    grp = grp.sort_values('economy').head(10)
-                    print(f"Top economical bowlers in season {season_in if season_in else 'ALL'} (min {min_balls} balls):")
-                    for _, r in grp.iterrows():
-                        name = r['player'] if pd.notna(r['player']) else f"id:{int(r['bowler_id'])}"
-                        print(f"{name}: economy {r['economy']:.2f} (Balls {int(r['balls'])}, Runs {int(r['runs_conceded'])})")
-            print(f"\n Time taken: {time.time() - start_time:.4f} seconds\n")
-
-
-        elif choice==25:
-            team_name = input("Enter team name: ").strip()
-            season_in = input("Enter season or press Enter for all: ").strip()
-            min_balls_in = input("Enter minimum balls threshold (default 60): ").strip()
-            try:
-                min_balls = int(min_balls_in) if min_balls_in else 60
-            except:
-                min_balls = 60
-            start_time = time.time()
-            trow = teams[teams['team'].str.lower() == team_name.lower()]
-            if trow.empty:
-                print("Invalid team name.")
-            else:
-                team_id = trow['team_id'].values[0]
-                d = delivery.merge(match[['match_id','season']], on='match_id', how='left')
-                sel = d[(d['batting_team_id']==team_id)]
-                sel = sel[ season_mask_from_input(sel['season'], season_in) ]
-                if sel.empty:
-                    print("No data for that team/season.")
-                else:
-                    grp = sel.groupby('batter_id').agg(balls=('batter_id','size'),
-                                                       runs=('batsman_runs','sum')).reset_index()
-                    grp = grp[grp['balls'] >= min_balls].copy()
-                    if grp.empty:
-                        print(f"No batters with at least {min_balls} balls.")
-                    else:
-                        grp['strike_rate'] = (grp['runs'] / grp['balls']) * 100.0
-                        grp = grp.merge(players[['player_id','player']], left_on='batter_id', right_on='player_id', how='left')
-                        grp = grp.sort_values('strike_rate', ascending=False).head(10)
-                        print(f"Top strike rates for {team_name} in {season_in if season_in else 'ALL'} (min {min_balls} balls):")
-                        for _, r in grp.iterrows():
-                            name = r['player'] if pd.notna(r['player']) else f"id:{int(r['batter_id'])}"
-                            print(f"{name}: SR {r['strike_rate']:.2f} (Runs {int(r['runs'])}, Balls {int(r['balls'])})")
-            print(f"\n Time taken: {time.time() - start_time:.4f} seconds\n")
-
-
-        elif choice == 26:
-            pname = input("Enter player name: ").strip()
-            pid = get_player_id_by_name(pname)
-            if pid is None:
-                print("Player not found.")
-            else:
-                start_time = time.time()
-                run_col = find_col(delivery, ['batsman_runs','batsman_id','runs','batsman_run','batter_runs'])
-                if run_col is None or 'match_id' not in delivery.columns:
-                    print("Required delivery columns missing to compute runs per season.")
-                else:
-                    d = delivery.merge(match[['match_id','season']], on='match_id', how='left')
-                    runs_season = d.loc[d['batter_id'] == pid].groupby('season')[run_col].sum().reset_index().sort_values(run_col, ascending=False)
-                    if {'match_id','inning','over','ball'}.issubset(dismissals.columns) and {'match_id','inning','over','ball','bowler_id'}.issubset(delivery.columns):
-                        merged = dismissals.merge(delivery[['match_id','inning','over','ball','bowler_id']], on=['match_id','inning','over','ball'], how='left')
-                        merged = merged.merge(match[['match_id','season']], on='match_id', how='left')
-                        wkts_season = merged.loc[merged['bowler_id'] == pid].groupby('season').size().reset_index(name='wickets').sort_values('wickets', ascending=False)
-                    else:
-                        wkts_season = pd.DataFrame(columns=['season','wickets'])
-                    if not runs_season.empty:
-                        top_run = runs_season.iloc[0]
-                        print(f"Best batting season: {top_run['season']} with {int(top_run[run_col])} runs")
-                    else:
-                        print("No batting records found.")
-                    if not wkts_season.empty:
-                        top_wkt = wkts_season.iloc[0]
-                        print(f"Best bowling season: {top_wkt['season']} with {int(top_wkt['wickets'])} wickets")
-                    else:
-                        print("No bowling records found.")
-                print(f"\nTime taken: {time.time() - start_time:.4f} s\n")
-
-        elif choice == 27:
-            pname = input("Enter player name: ").strip()
-            pid = get_player_id_by_name(pname)
-            if pid is None:
-                print("Player not found.")
-            else:
-                start_time = time.time()
-                run_col = find_col(delivery, ['batsman_runs','batsman_id','runs','batsman_run','batter_runs'])
-                if run_col is None:
-                    print("Batsman run column not found.")
-                else:
-                    d = delivery.merge(match[['match_id','season']], on='match_id', how='left')
-                    if {'match_id','inning','over','ball'}.issubset(dismissals.columns):
-                        merged = d.merge(dismissals[['match_id','inning','over','ball','dismissal_kind','fielder_id']],
-                                        on=['match_id','inning','over','ball'], how='left')
-                    else:
-                        merged = d.copy()
-                        merged['dismissal_kind'] = None
-                    player_rows = merged.loc[merged['batter_id'] == pid]
-                    if player_rows.empty:
-                        print("No batting records for this player.")
-                    else:
-                        stats = player_rows.groupby('season').agg(balls=('batter_id','count'),
-                                                                runs=(run_col,'sum'),
-                                                                outs=('dismissal_kind', lambda x: x.notna().sum())).reset_index()
-                        print(f"Season-wise SR & Avg for {pname}:")
-                        for _, r in stats.iterrows():
-                            balls = int(r['balls']); runs = int(r['runs']); outs = int(r['outs'])
-                            sr = (runs/balls)*100.0 if balls>0 else 0.0
-                            avg = (runs/outs) if outs>0 else float('nan')
-                            avg_str = f"{avg:.2f}" if outs>0 else "NA"
-                            print(f"{r['season']}: SR={sr:.2f}, Avg={avg_str} (Runs {runs}, Balls {balls}, Outs {outs})")
-                print(f"\nTime taken: {time.time() - start_time:.4f} s\n")
-
-
-        elif choice == 28:
-            season_in = input("Enter season or press Enter for ALL: ").strip()
-            start_time = time.time()
-            run_col = find_col(delivery, ['batsman_runs','batsman_id','runs','batsman_run','batter_runs'])
-            if run_col is None or 'non_striker_id' not in delivery.columns:
-                print("Partnership query requires 'non_striker_id' and a batsman-run column in delivery.")
-            else:
-                d = delivery.merge(match[['match_id','season']], on='match_id', how='left')
-                d = d[ season_mask_from_input(d['season'], season_in) ]
-                if d.empty:
-                    print("No deliveries for the specified season.")
-                else:
-                    d['p1'] = d[['batter_id','non_striker_id']].apply(lambda x: int(min(x['batter_id'], x['non_striker_id'])), axis=1)
-                    d['p2'] = d[['batter_id','non_striker_id']].apply(lambda x: int(max(x['batter_id'], x['non_striker_id'])), axis=1)
-                    agg = d.groupby(['season','match_id','inning','p1','p2'])[run_col].sum().reset_index(name='partnership_runs')
-                    top_per_season = agg.sort_values(['season','partnership_runs'], ascending=[True,False]).groupby('season').first().reset_index()
-                    top_per_season = top_per_season.merge(players[['player_id','player']], left_on='p1', right_on='player_id', how='left') \
-                                                .merge(players[['player_id','player']], left_on='p2', right_on='player_id', how='left', suffixes=('_p1','_p2'))
-                    print(f"Top partnership (approx) per season for '{season_in if season_in else 'ALL'}':")
-                    for _, r in top_per_season.iterrows():
-                        p1 = r['player_p1'] if pd.notna(r['player_p1']) else f"id:{int(r['p1'])}"
-                        p2 = r['player_p2'] if pd.notna(r['player_p2']) else f"id:{int(r['p2'])}"
-                        print(f"Season {r['season']}: {p1} & {p2} -> {int(r['partnership_runs'])} runs ")
-            print(f"\nTime taken: {time.time() - start_time:.4f} s\n")
-
-        elif choice == 29:
-            start_time = time.time()
-            um_df = get_umpire_match_df()
-            if um_df is None or um_df.empty:
-                print("Umpire-match data not available (expected 'umpire_match' or 'umpir_match').")
-            else:
-                um = um_df.copy()
-                um['u1'] = um[['umpire_id1','umpire_id2']].min(axis=1)
-                um['u2'] = um[['umpire_id1','umpire_id2']].max(axis=1)
-                top = um.groupby(['u1','u2']).size().reset_index(name='count').sort_values('count', ascending=False).head(10)
-                top = top.merge(umpire[['umpire_id','umpire']], left_on='u1', right_on='umpire_id', how='left') \
-                        .merge(umpire[['umpire_id','umpire']], left_on='u2', right_on='umpire_id', how='left', suffixes=('_u1','_u2'))
-                print("Most frequent umpire pairings:")
-                for _, r in top.iterrows():
-                    n1 = r['umpire_u1'] if pd.notna(r['umpire_u1']) else f"id:{int(r['u1'])}"
-                    n2 = r['umpire_u2'] if pd.notna(r['umpire_u2']) else f"id:{int(r['u2'])}"
-                    print(f"{n1} & {n2}: {int(r['count'])} matches")
-            print(f"\nTime taken: {time.time() - start_time:.4f} s\n")
-
-        elif choice == 30:
-            uname = input("Enter umpire name: ").strip()
-            start_time = time.time()
-            if 'umpire' not in globals() or 'umpire_id' not in umpire.columns:
-                print("Umpire table not present or missing columns.")
-            else:
-                urows = umpire[umpire['umpire'].str.lower().str.contains(uname.lower(), na=False)]
-                if urows.empty:
-                    print("Umpire not found.")
-                else:
-                    uid = int(urows.iloc[0]['umpire_id'])
-                    umdf = get_umpire_match_df()
-                    if umdf is None:
-                        print("Umpire-match table not available.")
-                    else:
-                        mids = umdf.loc[(umdf['umpire_id1'] == uid) | (umdf['umpire_id2'] == uid), 'match_id'].unique().tolist()
-                        if len(mids) == 0:
-                            print("No matches found for this umpire.")
-                        else:
-                            winners = match_result[match_result['match_id'].isin(mids)]
-                            win_counts = winners.groupby('winner_id').size().reset_index(name='wins')
-                            matches_played = match_teams[match_teams['match_id'].isin(mids)]
-                            mp = pd.melt(matches_played, id_vars=['match_id'], value_vars=['team_id1','team_id2'], value_name='team_id')[['match_id','team_id']]
-                            mp_counts = mp.groupby('team_id')['match_id'].nunique().reset_index(name='matches')
-                            info = mp_counts.merge(win_counts, left_on='team_id', right_on='winner_id', how='left').fillna(0)
-                            info = info.merge(teams[['team_id','team']], left_on='team_id', right_on='team_id', how='left')
-                            info['win_pct'] = info['wins'] / info['matches'] * 100.0
-                            info = info.sort_values('win_pct', ascending=False).head(15)
-                            print(f"Win % for teams in matches officiated by {urows.iloc[0]['umpire']}:")
-                            for _, r in info.iterrows():
-                                print(f"{r['team']}: {r['win_pct']:.2f}% ({int(r['wins'])}/{int(r['matches'])})")
-            print(f"\nTime taken: {time.time() - start_time:.4f} s\n")
-
-        elif choice == 31:
-            season_in = input("Enter season or press Enter for ALL: ").strip()
-            start_time = time.time()
-            if 'total_runs' not in delivery.columns:
-                print("Column 'total_runs' not found in delivery.")
-            else:
-                d = delivery.merge(match[['match_id','season','date']], on='match_id', how='left')
-                dsel = d[ season_mask_from_input(d['season'], season_in) ]
-                if dsel.empty:
-                    print("No deliveries for that season.")
-                else:
-                    totals = dsel.groupby('match_id')['total_runs'].sum().reset_index(name='total_runs').sort_values('total_runs', ascending=False).head(10)
-                    info = totals.merge(match[['match_id','season','date']], on='match_id', how='left') \
-                                .merge(match_teams, on='match_id', how='left') \
-                                .merge(teams.rename(columns={'team_id':'team_id1','team':'team1'}), on='team_id1', how='left') \
-                                .merge(teams.rename(columns={'team_id':'team_id2','team':'team2'}), on='team_id2', how='left')
-                    print(f"Top 10 highest-scoring matches in season {season_in if season_in else 'ALL'}:")
-                    for _, r in info.iterrows():
-                        print(f"{r['season']} | {r.get('date','')}: {r.get('team1','Unknown')} vs {r.get('team2','Unknown')} -> Total runs {int(r['total_runs'])}")
-            print(f"\nTime taken: {time.time() - start_time:.4f} s\n")
-
-        elif choice == 32:
-            start_time = time.time()
-            pmask = match['match_type'].astype(str).str.contains('Qualifier|Eliminator|Final', case=False, na=False)
-            playoffs = match.loc[pmask, 'match_id'].unique().tolist()
-            if len(playoffs) == 0:
-                print("No playoff matches found in 'match.match_type'.")
-            else:
-                mt = match_teams[match_teams['match_id'].isin(playoffs)]
-                counts = pd.concat([mt['team_id1'], mt['team_id2']]).value_counts().reset_index()
-                counts.columns = ['team_id','appearances']
-                counts = counts.merge(teams, left_on='team_id', right_on='team_id', how='left')
-                print("Top teams by playoff matches appearance:")
-                for _, r in counts.head(10).iterrows():
-                    print(f"{r['team']}: {int(r['appearances'])} playoff matches appearance")
-            print(f"\nTime taken: {time.time() - start_time:.4f} s\n")
-
-        elif choice == 33:
-            start_time = time.time()
-
-            finals_mask = match['match_type'].astype(str).str.contains('final', case=False, na=False)
-            finals_df = match.loc[finals_mask, ['match_id', 'season', 'date', 'match_type']].copy()
-
-            if finals_df.empty:
-                print("No Finals found (check match_type values).")
-            else:
-                finals_df['date_parsed'] = pd.to_datetime(finals_df['date'], errors='coerce')
-
-                def pick_one_final(g):
-                    if g['date_parsed'].notna().any():
-                        return g.loc[g['date_parsed'].idxmax()]
-                    else:
-                        return g.loc[g['match_id'].idxmax()]
-
-                finals_picked = finals_df.groupby('season', as_index=False).apply(pick_one_final).reset_index(drop=True)
-
-                finals_with_winner = finals_picked.merge(match_result[['match_id', 'winner_id']], on='match_id', how='left')
-
-                finals_with_winner = finals_with_winner.merge(teams[['team_id', 'team']], left_on='winner_id', right_on='team_id', how='left')
-
-                finals_with_winner = finals_with_winner.sort_values(by=['date_parsed', 'season'], ascending=[True, True])
-
-                print("Finals winners by season:")
-                for _, r in finals_with_winner.iterrows():
-                    season_str = str(r['season'])
-                    winner_name = r['team'] if pd.notna(r['team']) else 'Unknown'
-                    print(f"{season_str}: {winner_name}")
-
-            print(f"\nTime taken: {time.time() - start_time:.4f} s\n")
-
-
-
-        elif choice == 34:
-            start_time = time.time()
-            # Pick only playoff matches (Qualifier, Eliminator, Semi Final, Final)
-            pmask = match['match_type'].astype(str).str.contains('Qualifier|Eliminator|Final|Semi', case=False, na=False)
-            playoffs = match.loc[pmask, ['match_id', 'season', 'date', 'match_type']].copy()
-
-            if playoffs.empty:
-                print("No playoff matches found.")
-            else:
-                pom = player_of_the_match.merge(playoffs, on='match_id', how='inner')
-                pom = pom.merge(players, left_on='player_of_the_match_id', right_on='player_id', how='left')
-
-                if pom.empty:
-                    print("No Player-of-the-Match data for playoff matches.")
-                else:
-                    print("Player of the Match in playoff matches:")
-                    for _, r in pom.iterrows():
-                        mdate = r['date']
-                        pname = r['player'] if pd.notna(r['player']) else "Unknown Player"
-                        mtype = r['match_type'] if pd.notna(r['match_type']) else "Playoff Match"
-                        print(f"{mdate}: {pname} ({mtype})")
-
-            print(f"\nTime taken: {time.time() - start_time:.4f} s\n")
-
-
-
-
-        
-        elif choice==35:
+        if choice in QUERIES:
+            params = {name: input(prompt).strip() for name, prompt in QUERIES[choice][2]}
+            result, seconds = run_query(choice, params)
+            render_result(result, page_size=page_size, more=more)
+            print(f"\n Time taken: {seconds:.4f} seconds\n")
+        elif choice==EXIT_CHOICE:
             print("Exiting the program...")
-            time.sleep(1)
+            pause()
             print("Thank you for using the IPL Data Analysis Program!")
-            time.sleep(1)
+            pause()
             print("Goodbye!")
             break
         else:
             print("Invalid choice! Please try again.")
-            time.sleep(1)
-            
-
-
+            pause()
 
-                
+        pause()
 
-        
-        
-        
 
-
-
-            
-        time.sleep(1)
-        
-        # break
\ No newline at end of file
+if __name__ == "__main__":
+    args = parse_args()
+    instrumentation.enable(trace_memory=args.trace_memory, profile=bool(args.profile))
+    load_data(args.data_dir, lazy=True, sqlite=args.sqlite)
+    if args.prefetch:
+        prefetch()
+    for path in args.ingest:
+        added = ingest_match(read_ingest_file(path))
+        print(f"Ingested {path}: " + ", ".join(f"{n} {name}" for name, n in added.items() if n))
+    if args.batch:
+        write_batch_output(run_batch(read_batch_file(args.batch), args.limit, args.offset), args.output)
+    elif args.query is not None:
+        params = dict(p.split('=', 1) for p in args.params)
+        queries = [{'choice': args.query, 'params': params}]
+        if args.output:
+            write_batch_output(run_batch(queries, args.limit, args.offset), args.output)
+        elif args.export:
+            result, seconds = run_query(args.query, params)
+            if result['rows'] is None:
+                render_result(result)
+            else:
+                rows = page_rows(result['rows'], args.limit, args.offset)
+                export_rows(rows, args.export)
+                print(f"Wrote {len(rows)} rows to {args.export}")
+        else:
+            result, seconds = run_query(args.query, params)
+            render_result(result, limit=args.limit, offset=args.offset)
+            print(f"\n Time taken: {seconds:.4f} seconds\n")
+    elif not args.ingest:
+        run_menu(args.pauses, args.page_size)
+    instrumentation.disable()
+    if args.profile:
+        instrumentation.write_profile(args.profile)
+        print(instrumentation.profile_report(), file=sys.stderr)
+    if args.metrics:
+        instrumentation.write_summary(args.metrics)
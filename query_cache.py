@@ -0,0 +1,67 @@
+"""Size-bounded LRU cache for query results.
+
+Entries are keyed by (query id, normalized parameters) and carry tags naming
+the tables whose names the result shows or was resolved against. A rename
+of a team or venue then evicts only the entries tagged with that table
+instead of clearing the whole cache.
+"""
+import threading
+from collections import OrderedDict
+
+
+class QueryCache:
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(choice, params):
+        return (choice, tuple(sorted(params.items())))
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, tags=()):
+        with self._lock:
+            self._entries[key] = (value, frozenset(tags))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, tag):
+        """Drop every entry tagged with tag; returns how many were dropped."""
+        with self._lock:
+            stale = [key for key, (_, tags) in self._entries.items() if tag in tags]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
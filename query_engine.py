@@ -0,0 +1,285 @@
+"""Declarative reports over the ball-by-ball data.
+
+A report is described by a spec instead of a hand-written merge/groupby:
+
+    {"where": {"batter": ["V Kohli"], "phase": ["death"]},
+     "by": ["season"],
+     "metrics": ["runs", "balls", "strike_rate"],
+     "min": {"balls": 60}, "order_by": "-strike_rate", "limit": 10}
+
+``where`` filters dimensions on a list of allowed values, ``by`` names the
+group-by dimensions, ``min`` drops groups below a threshold, and
+``order_by`` sorts on a metric (descending with a leading ``-``).
+
+``plan`` picks where a spec is answered from. Sources are tried in the
+order given, smallest first:
+
+1. a rollup that is already built and holds every dimension and measure
+   the spec needs;
+2. otherwise a SQL database, when one is attached: the spec becomes one
+   GROUP BY query whose filters SQLite answers from its indexes;
+3. otherwise, when a filter hits an indexed column, the ball-by-ball
+   table read through that index, so only matching rows are touched;
+4. otherwise the smallest rollup that can answer it, built now and reused
+   by later specs;
+5. otherwise a scan of the ball-by-ball table.
+
+Every source already carries the columns it is filtered and grouped on,
+so no join is materialized. Filter values arrive resolved (ids, season
+labels) from the caller; this module knows nothing about names.
+"""
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ['season', 'phase', 'inning', 'batter', 'bowler', 'batting_team', 'bowling_team',
+              'venue', 'match']
+# summed per group; balls counts every delivery, wides and no-balls included,
+# wickets only those credited to the bowler and dismissals every wicket
+MEASURES = ['runs', 'total_runs', 'balls', 'wickets', 'dismissals', 'fours', 'sixes', 'dots']
+# computed from the summed measures after grouping
+DERIVED = {
+    'strike_rate': (['runs', 'balls'], lambda m: m['runs'] / m['balls'] * 100.0),
+    'economy': (['total_runs', 'balls'], lambda m: m['total_runs'] / m['balls'] * 6.0),
+    'average': (['runs', 'dismissals'], lambda m: m['runs'] / m['dismissals'].replace(0, np.nan)),
+    'bowling_average': (['total_runs', 'wickets'], lambda m: m['total_runs'] / m['wickets'].replace(0, np.nan)),
+    'boundaries': (['fours', 'sixes'], lambda m: m['fours'] + m['sixes']),
+    'dot_percentage': (['dots', 'balls'], lambda m: m['dots'] / m['balls'] * 100.0),
+}
+METRICS = MEASURES + list(DERIVED)
+
+
+def _as_list(value):
+    if isinstance(value, (list, tuple, set)):
+        return list(value)
+    return [value]
+
+
+def parse_spec(spec):
+    """Return a validated, normalized copy of spec; raises ValueError."""
+    unknown = set(spec) - {'where', 'by', 'metrics', 'min', 'order_by', 'limit'}
+    if unknown:
+        raise ValueError(f"unknown spec keys: {', '.join(sorted(unknown))}")
+    where = {dim: _as_list(values) for dim, values in (spec.get('where') or {}).items()}
+    by = _as_list(spec.get('by') or [])
+    metrics = _as_list(spec.get('metrics') or ['runs', 'balls'])
+    minimum = dict(spec.get('min') or {})
+    for dim in list(where) + by:
+        if dim not in DIMENSIONS:
+            raise ValueError(f"unknown dimension '{dim}': use one of {', '.join(DIMENSIONS)}")
+    for metric in metrics + list(minimum):
+        if metric not in METRICS:
+            raise ValueError(f"unknown metric '{metric}': use one of {', '.join(METRICS)}")
+    order_by = spec.get('order_by') or None
+    if order_by is not None and order_by.lstrip('-') not in metrics + by:
+        raise ValueError(f"order_by '{order_by}' is not one of the metrics or group-by dimensions")
+    limit = spec.get('limit')
+    return {'where': where, 'by': by, 'metrics': metrics, 'min': minimum,
+            'order_by': order_by, 'limit': int(limit) if limit not in (None, '') else None}
+
+
+def needed_measures(spec):
+    """The summed measures spec's metrics and thresholds are computed from."""
+    needed = []
+    for metric in spec['metrics'] + list(spec['min']):
+        for measure in DERIVED[metric][0] if metric in DERIVED else [metric]:
+            if measure not in needed:
+                needed.append(measure)
+    return needed
+
+
+class RollupSource:
+    """A pre-aggregated table: summed measures indexed by some dimensions.
+
+    dims maps spec dimensions to index levels and measures spec measures to
+    columns; fixed holds level filters every read applies (e.g. one role of
+    the phase cube). frame() returns the table, building it if need be, and
+    built() tells whether it exists yet.
+    """
+
+    def __init__(self, name, frame, built, dims, measures, fixed=None):
+        self.name = name
+        self.frame = frame
+        self.built = built
+        self.dims = dims
+        self.measures = measures
+        self.fixed = fixed or {}
+
+    def covers(self, dims, measures):
+        return set(dims) <= set(self.dims) and set(measures) <= set(self.measures)
+
+    def aggregate(self, where, by, measures):
+        table = self.frame()
+        mask = np.ones(len(table), dtype=bool)
+        for level, value in self.fixed.items():
+            mask &= table.index.get_level_values(level) == value
+        for dim, values in where.items():
+            mask &= table.index.get_level_values(self.dims[dim]).isin(values)
+        columns = [self.measures[m] for m in measures]
+        rows = table.loc[mask, columns]
+        if by:
+            rows = rows.groupby(level=[self.dims[d] for d in by], observed=True).sum()
+            rows.index = rows.index.set_names(by)
+        else:
+            rows = rows.sum().to_frame().T
+        return rows.set_axis(measures, axis=1).astype(np.int64)
+
+    def describe(self, where, by):
+        return f"rollup {self.name} ({len(self.frame())} rows)"
+
+
+class TableSource:
+    """An unaggregated table read row by row, optionally through an index.
+
+    columns maps spec dimensions and measures to a column name, or to a
+    function computing the values from a slice of the table. indexed lists
+    the dimensions index(column) can look rows up by, most selective first.
+    """
+
+    def __init__(self, name, frame, columns, index=None, indexed=()):
+        self.name = name
+        self.frame = frame
+        self.columns = columns
+        self.index = index
+        self.indexed = list(indexed)
+
+    def covers(self, dims, measures):
+        return set(dims) | set(measures) <= set(self.columns)
+
+    def lookup_dim(self, where):
+        """The filter dimension rows are looked up by, or None for a scan."""
+        return next((dim for dim in self.indexed if dim in where), None)
+
+    def _values(self, table, key):
+        column = self.columns[key]
+        return column(table) if callable(column) else table[column].to_numpy()
+
+    def aggregate(self, where, by, measures):
+        table = self.frame()
+        lookup = self.lookup_dim(where)
+        if lookup is not None:
+            # predicate pushdown: only the indexed rows are ever touched
+            rows = self.index(self.columns[lookup]).rows_many(where[lookup])
+            table = table.iloc[np.sort(rows)]
+        mask = np.ones(len(table), dtype=bool)
+        for dim, values in where.items():
+            if dim != lookup:
+                mask &= pd.Series(self._values(table, dim)).isin(values).to_numpy()
+        table = table[mask]
+        frame = pd.DataFrame({key: self._values(table, key) for key in list(by) + list(measures)})
+        if by:
+            return frame.groupby(by, observed=True)[measures].sum().astype(np.int64)
+        return frame[measures].sum().to_frame().T.astype(np.int64)
+
+    def describe(self, where, by):
+        lookup = self.lookup_dim(where)
+        if lookup is None:
+            return f"scan of {self.name}"
+        return f"{self.name} through the {self.columns[lookup]} index"
+
+
+class SqlSource:
+    """A SQL database answering a spec with one aggregate query.
+
+    query(sql, params) returns a DataFrame; tables is the FROM clause and
+    expressions maps spec dimensions to SQL expressions and measures to SQL
+    aggregates over it. categories gives dimensions whose values come back
+    as ordered categoricals (e.g. phases), so rows sort the way the other
+    sources sort them.
+    """
+
+    def __init__(self, name, query, tables, expressions, categories=None):
+        self.name = name
+        self.query = query
+        self.tables = tables
+        self.expressions = expressions
+        self.categories = categories or {}
+
+    def covers(self, dims, measures):
+        return set(dims) | set(measures) <= set(self.expressions)
+
+    def aggregate(self, where, by, measures):
+        select = [f"{self.expressions[key]} AS {key}" for key in list(by) + list(measures)]
+        conditions, params = [], []
+        for dim, values in where.items():
+            conditions.append(f"{self.expressions[dim]} IN ({', '.join('?' * len(values))})" if values else "0")
+            params.extend(values)
+        sql = f"SELECT {', '.join(select)} FROM {self.tables}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        if by:
+            sql += " GROUP BY " + ", ".join(by)
+        rows = self.query(sql, params)
+        rows[list(measures)] = rows[list(measures)].fillna(0).astype(np.int64)
+        if not by:
+            return rows
+        for dim in by:
+            if dim in self.categories:
+                rows[dim] = pd.Categorical(rows[dim], categories=self.categories[dim], ordered=True)
+        return rows.sort_values(list(by)).set_index(list(by))
+
+    def describe(self, where, by):
+        return f"SQL on {self.name}"
+
+
+class Plan:
+    """A parsed spec bound to the source that will answer it."""
+
+    def __init__(self, spec, source):
+        self.spec = spec
+        self.source = source
+
+    def __str__(self):
+        spec = self.spec
+        text = self.source.describe(spec['where'], spec['by'])
+        if spec['where']:
+            text += ", filter " + ", ".join(sorted(spec['where']))
+        if spec['by']:
+            text += ", group by " + ", ".join(spec['by'])
+        return text
+
+    def run(self):
+        """The report as a DataFrame: one row per group, by columns then metrics."""
+        spec = self.spec
+        measures = needed_measures(spec)
+        sums = self.source.aggregate(spec['where'], spec['by'], measures)
+        for metric, threshold in spec['min'].items():
+            sums = sums[_metric(sums, metric) >= threshold]
+        rows = sums.reset_index() if spec['by'] else sums.reset_index(drop=True)
+        for metric in spec['metrics']:
+            rows[metric] = _metric(rows, metric).to_numpy()
+        rows = rows[spec['by'] + spec['metrics']]
+        if spec['order_by']:
+            key = spec['order_by'].lstrip('-')
+            rows = rows.sort_values(key, ascending=not spec['order_by'].startswith('-'))
+        if spec['limit'] is not None:
+            rows = rows.head(spec['limit'])
+        return rows.reset_index(drop=True)
+
+
+def _metric(sums, metric):
+    if metric in DERIVED:
+        return DERIVED[metric][1](sums)
+    return sums[metric]
+
+
+def plan(spec, sources):
+    """Choose the source answering spec (see the module docstring)."""
+    spec = parse_spec(spec)
+    dims = set(spec['where']) | set(spec['by'])
+    measures = needed_measures(spec)
+    rollups = [s for s in sources if isinstance(s, RollupSource) and s.covers(dims, measures)]
+    tables = [s for s in sources if isinstance(s, TableSource) and s.covers(dims, measures)]
+    built = [s for s in rollups if s.built()]
+    if built:
+        return Plan(spec, built[0])
+    sql = [s for s in sources if isinstance(s, SqlSource) and s.covers(dims, measures)]
+    if sql:
+        return Plan(spec, sql[0])
+    indexed = [s for s in tables if s.lookup_dim(spec['where']) is not None]
+    if indexed:
+        return Plan(spec, indexed[0])
+    if rollups:
+        return Plan(spec, rollups[0])
+    if tables:
+        return Plan(spec, tables[0])
+    raise ValueError("no source holds " + ", ".join(sorted(dims | set(measures))))
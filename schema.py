@@ -0,0 +1,44 @@
+"""Column dtypes of the normalized tables, applied when they are loaded.
+
+Ids and ball-by-ball counts get the narrowest integer type that holds them
+with room to grow, ids that can be missing (no winner, no fielder, no player
+of the match) get pandas' nullable integers instead of float64, and
+low-cardinality text columns are categoricals. Names and dates stay plain
+strings. Columns not listed keep the type pandas infers.
+"""
+
+MATCH_ID = 'int32'
+TEAM_ID = 'int8'
+PLAYER_ID = 'int16'
+VENUE_ID = 'int16'
+UMPIRE_ID = 'int16'
+
+TABLE_DTYPES = {
+    'delivery': {
+        'match_id': MATCH_ID, 'inning': 'int8',
+        'batting_team_id': TEAM_ID, 'bowling_team_id': TEAM_ID,
+        'over': 'int8', 'ball': 'int8',
+        'batter_id': PLAYER_ID, 'bowler_id': PLAYER_ID, 'non_striker_id': PLAYER_ID,
+        'batsman_runs': 'int8', 'extra_runs': 'int8', 'total_runs': 'int8',
+    },
+    'dismissals': {
+        'match_id': MATCH_ID, 'inning': 'int8', 'over': 'int8', 'ball': 'int8',
+        'dismissal_kind': 'category', 'fielder_id': 'Int16',
+    },
+    'match': {
+        'match_id': MATCH_ID, 'season': 'category', 'match_type': 'category', 'venue_id': VENUE_ID,
+    },
+    'match_result': {
+        'match_id': MATCH_ID, 'winner_id': 'Int8', 'result': 'category',
+        'resut_margin': 'Int16', 'target_runs': 'Int16', 'target_over': 'float32',
+        'super_over': 'category', 'method': 'category',
+    },
+    'match_teams': {'match_id': MATCH_ID, 'team_id1': TEAM_ID, 'team_id2': TEAM_ID},
+    'player_of_the_match': {'match_id': MATCH_ID, 'player_of_the_match_id': 'Int16'},
+    'players': {'player_id': PLAYER_ID},
+    'teams': {'team_id': TEAM_ID},
+    'toss': {'match_id': MATCH_ID, 'toss_winner': TEAM_ID, 'toss_decision': 'category'},
+    'umpire': {'umpire_id': UMPIRE_ID},
+    'umpire_match': {'match_id': MATCH_ID, 'umpire_id1': UMPIRE_ID, 'umpire_id2': UMPIRE_ID},
+    'venue': {'venue_id': VENUE_ID},
+}
@@ -0,0 +1,309 @@
+"""Long-running HTTP/JSON service for the IPL queries.
+
+The normalized tables are loaded once and kept warm in this process. Every
+request is mapped onto one of the menu queries in ``main_code.QUERIES`` and
+run on a thread pool, so slow aggregations never block the event loop and
+all workers share the same copy of the data. Renames (choices 20 and 21)
+wait for running queries to finish and block new ones while they run.
+
+    python service.py --port 8000
+    curl localhost:8000/players/V%20Kohli/career
+    curl localhost:8000/seasons/2017%2F18/awards
+    curl -X POST 'localhost:8000/teams/Delhi%20Daredevils/rename?new_name=Delhi%20Capitals'
+
+``GET /queries`` lists every route, ``GET /cache`` shows the result
+cache counters and ``GET /metrics`` the per-stage and per-query timings
+(see ``instrumentation``). ``POST /matches`` with a JSON body adds a new match (see
+``main_code.ingest_match``). Any query can also be called by number as
+``/queries/{choice}?name=value``. ``limit`` and ``offset`` in the query
+string return only part of a long listing, e.g. ``/players?limit=50&offset=100``.
+"""
+import argparse
+import asyncio
+import json
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+import instrumentation
+import main_code
+
+# largest request body read; a new match's rows are well under a megabyte
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+# (method, path pattern, choice); {name} segments become query parameters
+ROUTES = [
+    ('GET', '/teams', 1),
+    ('GET', '/players', 2),
+    ('GET', '/umpires', 3),
+    ('GET', '/venues', 4),
+    ('GET', '/matches', 5),
+    ('GET', '/players/{player}/career', 6),
+    ('GET', '/players/{player}/player-of-the-match', 7),
+    ('GET', '/teams/head-to-head', 8),
+    ('GET', '/teams/{team1}/vs/{team2}', 8),
+    ('GET', '/players/{player}/teams', 9),
+    ('GET', '/venues/results', 10),
+    ('GET', '/venues/first-innings', 11),
+    ('GET', '/venues/{venue_name}/results', 10),
+    ('GET', '/venues/{venue_name}/first-innings', 11),
+    ('GET', '/seasons/boundaries', 12),
+    ('GET', '/teams/phases/runs', 13),
+    ('GET', '/teams/phases/wickets', 14),
+    ('GET', '/teams/{team}/powerplay/runs', 13),
+    ('GET', '/teams/{team}/powerplay/wickets', 14),
+    ('GET', '/seasons/awards', 15),
+    ('GET', '/seasons/{season}/awards', 15),
+    ('GET', '/umpires/{umpire_name}/matches', 16),
+    ('GET', '/seasons/milestones', 17),
+    ('GET', '/seasons/five-wicket-hauls', 18),
+    ('GET', '/players/{bowler}/vs/{batter}', 19),
+    ('POST', '/teams/{old_name}/rename', 20),
+    ('POST', '/venues/{old_name}/rename', 21),
+    ('GET', '/teams/{team}/matches', 22),
+    ('GET', '/seasons/{season}/top-scorers', 23),
+    ('GET', '/seasons/{season}/economy', 24),
+    ('GET', '/teams/{team}/strike-rates', 25),
+    ('GET', '/players/{player}/best-season', 26),
+    ('GET', '/players/{player}/seasons', 27),
+    ('GET', '/partnerships', 28),
+    ('GET', '/umpires/pairings', 29),
+    ('GET', '/umpires/{umpire_name}/win-bias', 30),
+    ('GET', '/matches/highest-scoring', 31),
+    ('GET', '/playoffs/appearances', 32),
+    ('GET', '/playoffs/finals', 33),
+    ('GET', '/playoffs/player-of-the-match', 34),
+    ('GET', '/players/{player}/matchups', 36),
+    ('GET', '/report', 37),
+]
+
+# queries that modify the loaded tables
+MUTATING_CHOICES = {20, 21}
+
+
+class ReadWriteLock:
+    """Many concurrent readers or a single writer.
+
+    A waiting writer holds back new readers, so a steady stream of reads
+    cannot starve a rename or an ingest.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+
+    def acquire_read(self):
+        with self._cond:
+            while self._writing or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        with self._cond:
+            self._waiting_writers += 1
+            try:
+                while self._writing or self._readers:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writing = True
+
+    def release_write(self):
+        with self._cond:
+            self._writing = False
+            self._cond.notify_all()
+
+
+def match_route(method, path):
+    """Return (choice, path params) for a request, or None."""
+    segments = [s for s in path.split('/') if s]
+    for route_method, pattern, choice in ROUTES:
+        parts = [p for p in pattern.split('/') if p]
+        if route_method != method or len(parts) != len(segments):
+            continue
+        params = {}
+        for part, segment in zip(parts, segments):
+            if part.startswith('{'):
+                params[part[1:-1]] = unquote(segment)
+            elif part != segment:
+                break
+        else:
+            return choice, params
+    if method == 'GET' and len(segments) == 2 and segments[0] == 'queries' and segments[1].isdigit():
+        choice = int(segments[1])
+        if choice not in MUTATING_CHOICES:
+            return choice, {}
+    return None
+
+
+def route_listing():
+    listing = []
+    for method, pattern, choice in ROUTES:
+        text, _, spec, _ = main_code.QUERIES[choice]
+        listing.append({'method': method, 'path': pattern, 'choice': choice,
+                        'description': text, 'params': [name for name, _ in spec]})
+    return listing
+
+
+class QueryService:
+
+    def __init__(self, workers=None):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='query')
+        self.lock = ReadWriteLock()
+
+    def execute(self, choice, params):
+        """Run one query on a worker thread; called through the executor."""
+        write = choice in MUTATING_CHOICES
+        if write:
+            self.lock.acquire_write()
+        else:
+            self.lock.acquire_read()
+        try:
+            return main_code.run_query(choice, params)
+        finally:
+            if write:
+                self.lock.release_write()
+            else:
+                self.lock.release_read()
+
+    def ingest(self, tables):
+        """Add a new match on a worker thread, with no query running."""
+        self.lock.acquire_write()
+        try:
+            return main_code.ingest_match(tables)
+        finally:
+            self.lock.release_write()
+
+    async def dispatch(self, method, target, body=b''):
+        """Return (status, payload) for a request line and body."""
+        url = urlsplit(target)
+        path = url.path.rstrip('/') or '/'
+        loop = asyncio.get_running_loop()
+        if method == 'GET' and path in ('/', '/queries'):
+            return HTTPStatus.OK, {'routes': route_listing()}
+        if method == 'GET' and path == '/cache':
+            return HTTPStatus.OK, main_code.cache.stats()
+        if method == 'GET' and path == '/metrics':
+            return HTTPStatus.OK, instrumentation.metrics.summary()
+        if method == 'POST' and path == '/matches':
+            try:
+                tables = json.loads(body or b'null')
+                if not isinstance(tables, dict):
+                    raise ValueError("expected a JSON object mapping table names to rows")
+                added = await loop.run_in_executor(self.executor, self.ingest, tables)
+            except (TypeError, ValueError, KeyError) as exc:
+                return HTTPStatus.BAD_REQUEST, {'error': str(exc)}
+            return HTTPStatus.CREATED, {'added': added}
+        found = match_route(method, path)
+        if found is None:
+            return HTTPStatus.NOT_FOUND, {'error': f"no route for {method} {path}"}
+        choice, params = found
+        params.update(parse_qsl(url.query, keep_blank_values=True))
+        try:
+            # limit/offset page through the rows and are not query parameters
+            limit = int(params.pop('limit')) if params.get('limit') else None
+            offset = int(params.pop('offset', 0) or 0)
+            params.pop('limit', None)
+            result, seconds = await loop.run_in_executor(self.executor, self.execute, choice, params)
+        except (TypeError, ValueError) as exc:
+            return HTTPStatus.BAD_REQUEST, {'error': str(exc)}
+        return HTTPStatus.OK, {'choice': choice, 'params': params, 'seconds': round(seconds, 6),
+                               'result': main_code.result_to_json(result, limit, offset)}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self.respond(writer, HTTPStatus.BAD_REQUEST, {'error': 'malformed request line'}, False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self.respond(writer, HTTPStatus.BAD_REQUEST, {'error': 'invalid Content-Length'}, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self.respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                       {'error': f"request body over {MAX_BODY_BYTES} bytes"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and version == 'HTTP/1.1')
+                try:
+                    status, payload = await self.dispatch(method.upper(), target, body)
+                except Exception as exc:
+                    # a failing query still gets an answer, and the connection stays usable
+                    traceback.print_exc()
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': f"{type(exc).__name__}: {exc}"}
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode()
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+
+async def serve(host='127.0.0.1', port=8000, workers=None):
+    service = QueryService(workers)
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"Serving IPL queries on http://{host}:{port}/ (GET /queries for the routes)")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the IPL queries over HTTP/JSON")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=None,
+                        help="size of the query thread pool (default: Python's ThreadPoolExecutor default)")
+    parser.add_argument('--data-dir', default=main_code.DATA_DIR)
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="record allocations per stage in /metrics (slower)")
+    parser.add_argument('--sqlite', metavar='FILE',
+                        help="answer reports from this SQLite file and load the other tables only when needed")
+    args = parser.parse_args(argv)
+    instrumentation.enable(trace_memory=args.trace_memory)
+    # with a database, tables are loaded on first use instead of up front
+    main_code.load_data(args.data_dir, lazy=bool(args.sqlite), sqlite=args.sqlite)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""Binary columnar snapshots of the normalized CSVs.
+
+The first time a table is loaded its CSV is parsed with pandas and every
+column is written next to it as a raw ``.npy`` file under
+``<csv dir>/.snapshot/<table>/``. Later loads memory-map those files instead
+of parsing the CSV again. Each snapshot records the source CSV's mtime and
+size and is rebuilt as soon as either one changes (for example after choice
+20 or 21 rewrites ``teams.csv`` or ``venue.csv``).
+
+Numeric columns are stored as-is, in whatever width they were loaded with.
+String and categorical columns are dictionary encoded into an ``int32`` codes
+file plus a categories file, and categoricals come back as categoricals
+without materialising their strings. Categories are stored as fixed-width
+unicode, or as numbers when they are numeric, and read back with the
+category dtype the column was written with, so a snapshot load compares
+equal to the CSV load it replaces. Nullable integer
+columns are stored as a values file plus a mask file. No column ever needs
+pickling and every file can be memory-mapped.
+
+``load_table`` takes the table's dtypes (see ``schema.py``) and casts the
+parsed CSV before snapshotting it, so later loads map narrow columns
+directly.
+
+Rows appended to CSVs through ``append_rows`` are written to the snapshot
+as an extra part directory instead of rebuilding it; once a snapshot has
+more than ``MAX_PARTS`` parts the next load compacts it back into one.
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+SNAPSHOT_DIR = '.snapshot'
+SNAPSHOT_VERSION = 3
+MAX_PARTS = 16
+
+
+def snapshot_path(csv_path):
+    """Return the snapshot directory used for csv_path."""
+    folder, filename = os.path.split(csv_path)
+    name = os.path.splitext(filename)[0]
+    return os.path.join(folder, SNAPSHOT_DIR, name)
+
+
+def _source_signature(csv_path):
+    st = os.stat(csv_path)
+    return {'mtime_ns': st.st_mtime_ns, 'size': st.st_size}
+
+
+def _read_meta(snap_dir):
+    try:
+        with open(os.path.join(snap_dir, 'meta.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_fresh(csv_path):
+    """True when csv_path has a snapshot matching its current mtime and size."""
+    meta = _read_meta(snapshot_path(csv_path))
+    if meta is None or meta.get('version') != SNAPSHOT_VERSION:
+        return False
+    return meta.get('source') == _source_signature(csv_path)
+
+
+def _column_file(snap_dir, index, suffix):
+    # Columns are stored by position so that odd header names never turn
+    # into odd file names.
+    return os.path.join(snap_dir, f"{index:03d}.{suffix}.npy")
+
+
+def _is_numeric(series):
+    return pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype)
+
+
+def _is_nullable_int(series):
+    return isinstance(series.dtype, pd.api.extensions.ExtensionDtype) \
+        and pd.api.types.is_integer_dtype(series.dtype)
+
+
+def _kind(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return 'category'
+    if _is_nullable_int(series):
+        return 'nullable'
+    return 'numeric' if _is_numeric(series) else 'string'
+
+
+def apply_dtypes(df, dtypes):
+    """Cast df's columns to dtypes (column -> dtype name), in place.
+
+    Integer casts are range-checked, so a value that does not fit raises
+    ValueError instead of silently wrapping around.
+    """
+    for col, dtype in (dtypes or {}).items():
+        if col not in df.columns or df[col].dtype == dtype:
+            continue
+        series = df[col]
+        target = pd.api.types.pandas_dtype(dtype)
+        if pd.api.types.is_integer_dtype(target) and len(series.dropna()):
+            info = np.iinfo(target.numpy_dtype if hasattr(target, 'numpy_dtype') else target)
+            if series.min() < info.min or series.max() > info.max:
+                raise ValueError(f"{col}: values out of range for {dtype}")
+        df[col] = series.astype(target)
+    return df
+
+
+def _write_columns(df, out_dir, kinds=None):
+    """Write every column of df into out_dir; returns the column metadata.
+
+    kinds forces each column's storage kind, so that an appended part is
+    stored the same way as the snapshot it extends.
+    """
+    columns = []
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        kind = kinds[i] if kinds else _kind(series)
+        column = {'name': col, 'kind': kind}
+        if kind == 'numeric':
+            np.save(_column_file(out_dir, i, 'values'), series.to_numpy())
+        elif kind == 'nullable':
+            mask = series.isna().to_numpy()
+            dtype = series.dtype.numpy_dtype if _is_nullable_int(series) else np.int64
+            np.save(_column_file(out_dir, i, 'values'), series.fillna(0).to_numpy().astype(dtype))
+            np.save(_column_file(out_dir, i, 'mask'), mask)
+        else:
+            if kind == 'category' and isinstance(series.dtype, pd.CategoricalDtype):
+                codes, categories = series.cat.codes.to_numpy(), series.cat.categories
+            else:
+                codes, categories = pd.factorize(series.astype(object), use_na_sentinel=True)
+            if kind == 'category':
+                column['categories_dtype'] = str(categories.dtype)
+            numeric = pd.api.types.is_numeric_dtype(categories.dtype) or pd.api.types.is_bool_dtype(categories.dtype)
+            categories = np.asarray(categories) if numeric else np.asarray(categories, dtype=str)
+            np.save(_column_file(out_dir, i, 'codes'), codes.astype(np.int32))
+            np.save(_column_file(out_dir, i, 'categories'), categories)
+        columns.append(column)
+    return columns
+
+
+def _write_meta(snap_dir, meta):
+    tmp = os.path.join(snap_dir, f'meta.json.tmp-{os.getpid()}')
+    with open(tmp, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp, os.path.join(snap_dir, 'meta.json'))
+
+
+def write_snapshot(df, csv_path):
+    """Write df as the snapshot of csv_path, replacing any previous one."""
+    snap_dir = snapshot_path(csv_path)
+    tmp_dir = f"{snap_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    meta = {
+        'version': SNAPSHOT_VERSION,
+        'source': _source_signature(csv_path),
+        'rows': len(df),
+        'columns': _write_columns(df, tmp_dir),
+        'parts': [],
+    }
+    _write_meta(tmp_dir, meta)
+
+    shutil.rmtree(snap_dir, ignore_errors=True)
+    os.replace(tmp_dir, snap_dir)
+
+
+def _read_columns(in_dir, columns):
+    data = {}
+    for i, col in enumerate(columns):
+        if col['kind'] == 'numeric':
+            # copy-on-write mapping: in-place edits stay private to the process
+            data[col['name']] = np.load(_column_file(in_dir, i, 'values'), mmap_mode='c')
+        elif col['kind'] == 'nullable':
+            values = np.load(_column_file(in_dir, i, 'values'))
+            mask = np.load(_column_file(in_dir, i, 'mask'))
+            data[col['name']] = pd.arrays.IntegerArray(values, mask)
+        elif col['kind'] == 'category':
+            codes = np.load(_column_file(in_dir, i, 'codes'), mmap_mode='r')
+            categories = pd.Index(np.load(_column_file(in_dir, i, 'categories')).astype(object))
+            categories = categories.astype(col.get('categories_dtype', object))
+            data[col['name']] = pd.Categorical.from_codes(codes, categories=categories)
+        else:
+            codes = np.load(_column_file(in_dir, i, 'codes'), mmap_mode='r')
+            categories = np.load(_column_file(in_dir, i, 'categories'))
+            values = np.full(len(codes), np.nan, dtype=object)
+            values[codes >= 0] = categories.astype(object)[codes[codes >= 0]]
+            data[col['name']] = values
+    return data
+
+
+def read_snapshot(csv_path):
+    """Load the snapshot of csv_path, memory-mapping every column file."""
+    snap_dir = snapshot_path(csv_path)
+    meta = _read_meta(snap_dir)
+    data = _read_columns(snap_dir, meta['columns'])
+    parts = [_read_columns(os.path.join(snap_dir, part['dir']), meta['columns'])
+             for part in meta.get('parts', [])]
+    if parts:
+        data = {name: _concat([values] + [part[name] for part in parts])
+                for name, values in data.items()}
+    return pd.DataFrame({name: values if isinstance(values, np.ndarray) and values.dtype != object
+                         else pd.Series(values, name=name)
+                         for name, values in data.items()}, copy=False)
+
+
+def _concat(arrays):
+    if isinstance(arrays[0], pd.Categorical):
+        # each part has its own dictionary; new categories go at the end. A
+        # part whose column was all missing has an empty, untyped one.
+        dtype = next((a.categories.dtype for a in arrays if len(a.categories)), object)
+        return union_categoricals([a if len(a.categories) else
+                                   pd.Categorical.from_codes(a.codes, a.categories.astype(dtype))
+                                   for a in arrays])
+    if isinstance(arrays[0], pd.api.extensions.ExtensionArray):
+        return pd.concat([pd.Series(a) for a in arrays], ignore_index=True).array
+    return np.concatenate(arrays)
+
+
+def append_rows(frames):
+    """Append rows to several CSVs and, where their snapshots are fresh, to the snapshots.
+
+    frames maps CSV paths to DataFrames holding each CSV's columns. Each CSV
+    is copied with its new rows into a temp file, and the copies are moved
+    into place only once all of them are written, so a failure part way
+    leaves every CSV as it was. The new rows then go into a new part of each
+    snapshot, so the existing column files are never rewritten; a snapshot
+    left behind by a failure there no longer matches its CSV and is rebuilt
+    on the next load.
+    """
+    fresh = {csv_path: is_fresh(csv_path) for csv_path in frames}
+    written = {}
+    try:
+        for csv_path, df in frames.items():
+            tmp = f"{csv_path}.tmp-{os.getpid()}"
+            written[csv_path] = tmp
+            shutil.copyfile(csv_path, tmp)
+            df.to_csv(tmp, mode='a', header=False, index=False)
+    except BaseException:
+        for tmp in written.values():
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        raise
+    for csv_path, tmp in written.items():
+        os.replace(tmp, csv_path)
+    for csv_path, df in frames.items():
+        if fresh[csv_path]:
+            _append_part(df, csv_path)
+
+
+def _append_part(df, csv_path):
+    snap_dir = snapshot_path(csv_path)
+    meta = _read_meta(snap_dir)
+    kinds = [col['kind'] for col in meta['columns']]
+    if any(kind in ('numeric', 'nullable') and not _is_numeric(df[col])
+           for kind, col in zip(kinds, df.columns)):
+        # e.g. text in a column that has only ever been empty: rebuild on next load
+        shutil.rmtree(snap_dir, ignore_errors=True)
+        return
+    part_dir = f"part-{len(meta.get('parts', [])) + 1:03d}"
+    os.makedirs(os.path.join(snap_dir, part_dir))
+    _write_columns(df, os.path.join(snap_dir, part_dir), kinds)
+    meta.setdefault('parts', []).append({'dir': part_dir, 'rows': len(df)})
+    meta['rows'] += len(df)
+    meta['source'] = _source_signature(csv_path)
+    _write_meta(snap_dir, meta)
+
+
+def load_table(csv_path, dtypes=None):
+    """Return csv_path as a DataFrame, served from its snapshot when fresh.
+
+    dtypes maps columns to the dtype they are loaded as. A stale or missing
+    snapshot is rebuilt from the CSV. If the snapshot cannot be written
+    (read-only checkout, full disk) the parsed CSV is returned anyway.
+    """
+    if is_fresh(csv_path):
+        try:
+            df = apply_dtypes(read_snapshot(csv_path), dtypes)
+        except (OSError, ValueError, KeyError):
+            pass
+        else:
+            if len(_read_meta(snapshot_path(csv_path)).get('parts', [])) > MAX_PARTS:
+                try:
+                    write_snapshot(df, csv_path)
+                except OSError:
+                    pass
+            return df
+    df = apply_dtypes(pd.read_csv(csv_path), dtypes)
+    try:
+        write_snapshot(df, csv_path)
+    except OSError:
+        pass
+    return df
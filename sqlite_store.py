@@ -0,0 +1,177 @@
+"""The normalized tables in one SQLite file, with keys and indexes.
+
+    python sqlite_store.py --data-dir "normalized csvs" --db ipl.sqlite
+
+Every CSV becomes a table of the same name and columns. Delivery is keyed
+by the ball, (match_id, inning, over, ball), and indexed by batter and
+bowler; match is keyed by match_id and indexed by season and venue;
+dismissals are indexed by the ball; the other match tables are keyed by
+match_id and the dictionaries by their id. ``ANALYZE`` runs after loading so
+SQLite's planner knows how selective each index is.
+
+The file records the size and mtime of every CSV it was built from, and
+``is_fresh`` compares them, the way ``snapshot_cache`` does for snapshots.
+``Database`` hands out one read-only connection per thread for queries and
+keeps a single writable one, behind a lock, for renames and new matches.
+"""
+import argparse
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from schema import TABLE_DTYPES
+
+BALL_KEY = ['match_id', 'inning', 'over', 'ball']
+# table -> (primary key columns, [indexed column lists])
+SCHEMA = {
+    'delivery': (BALL_KEY, [['batter_id'], ['bowler_id']]),
+    'dismissals': (None, [BALL_KEY]),
+    'match': (['match_id'], [['season'], ['venue_id']]),
+    'match_teams': (['match_id'], []),
+    'toss': (['match_id'], []),
+    'match_result': (['match_id'], []),
+    'umpire_match': (['match_id'], []),
+    'player_of_the_match': (None, [['match_id']]),
+    'players': (['player_id'], []),
+    'teams': (['team_id'], []),
+    'venue': (['venue_id'], []),
+    'umpire': (['umpire_id'], []),
+}
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _sql_type(dtype):
+    dtype = pd.api.types.pandas_dtype(dtype)
+    if pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'REAL'
+    return 'TEXT'
+
+
+def _create_table(conn, name, df):
+    dtypes = TABLE_DTYPES.get(name, {})
+    columns = [f"{_quote(col)} {_sql_type(dtypes.get(col, df[col].dtype))}" for col in df.columns]
+    key, indexes = SCHEMA[name]
+    if key:
+        columns.append(f"PRIMARY KEY ({', '.join(map(_quote, key))})")
+    conn.execute(f"CREATE TABLE {_quote(name)} ({', '.join(columns)})")
+    for cols in indexes:
+        conn.execute(f"CREATE INDEX {_quote(name + '_' + '_'.join(cols))} "
+                     f"ON {_quote(name)} ({', '.join(map(_quote, cols))})")
+
+
+def _rows(df):
+    """df's rows as lists of Python scalars, None for missing values."""
+    return df.astype(object).where(df.notna(), None).to_numpy().tolist()
+
+
+def insert_rows(conn, name, df):
+    placeholders = ', '.join('?' * len(df.columns))
+    columns = ', '.join(map(_quote, df.columns))
+    conn.executemany(f"INSERT INTO {_quote(name)} ({columns}) VALUES ({placeholders})", _rows(df))
+
+
+def _signature(csv_path):
+    st = os.stat(csv_path)
+    return st.st_mtime_ns, st.st_size
+
+
+def build(data_dir, db_path):
+    """Write every CSV of data_dir into a new SQLite file at db_path."""
+    tmp = f"{db_path}.tmp-{os.getpid()}"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.execute("CREATE TABLE source (name TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER)")
+        for name in SCHEMA:
+            csv_path = os.path.join(data_dir, f'{name}.csv')
+            df = pd.read_csv(csv_path)
+            _create_table(conn, name, df)
+            insert_rows(conn, name, df)
+            conn.execute("INSERT INTO source VALUES (?, ?, ?)", (name, *_signature(csv_path)))
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp, db_path)
+
+
+def is_fresh(data_dir, db_path):
+    """True when db_path was built from data_dir's CSVs as they are now."""
+    if not os.path.exists(db_path):
+        return False
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            recorded = dict((name, (mtime, size)) for name, mtime, size
+                            in conn.execute("SELECT name, mtime_ns, size FROM source"))
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return False
+    return all(recorded.get(name) == _signature(os.path.join(data_dir, f'{name}.csv')) for name in SCHEMA)
+
+
+def record_sources(conn, data_dir, names):
+    """Store the current signature of names' CSVs after they were changed alongside the database."""
+    for name in names:
+        conn.execute("UPDATE source SET mtime_ns = ?, size = ? WHERE name = ?",
+                     (*_signature(os.path.join(data_dir, f'{name}.csv')), name))
+
+
+class Database:
+    """Thread-safe access to a database built by build()."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+    def _reader(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        return conn
+
+    def query(self, sql, params=()):
+        """Run a SELECT and return its rows as a DataFrame."""
+        cursor = self._reader().execute(sql, list(params))
+        columns = [c[0] for c in cursor.description]
+        return pd.DataFrame(cursor.fetchall(), columns=columns)
+
+    def write(self, func):
+        """Call func(conn) on the writable connection inside one transaction."""
+        with self._write_lock:
+            conn = sqlite3.connect(self.path)
+            try:
+                with conn:
+                    func(conn)
+            finally:
+                conn.close()
+
+
+def open_database(data_dir, db_path):
+    """A Database for db_path, (re)built from data_dir first if it is missing or stale."""
+    if not is_fresh(data_dir, db_path):
+        build(data_dir, db_path)
+    return Database(db_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load the normalized CSVs into a SQLite file")
+    parser.add_argument('--data-dir', default='normalized csvs',
+                        help="folder holding the normalized CSVs (default: %(default)s)")
+    parser.add_argument('--db', default='ipl.sqlite', help="SQLite file to write (default: %(default)s)")
+    args = parser.parse_args(argv)
+    build(args.data_dir, args.db)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Write a synthetic copy of the normalized CSVs, scaled up N times.
+
+    python synthetic_data.py --scale 10 --out "synthetic csvs/x10"
+
+Every match-level and ball-level table is written scale times. Copy k moves
+its matches 17k years forward (season labels and dates alike, so the data
+grows by seasons the way the real league does), gives them fresh match ids
+and shuffles which player is which, so per-player numbers do not simply
+multiply. Team, venue and umpire dictionaries are shared by every copy, and
+players.csv is copied as is. Copies are written one after another, so memory
+stays that of the source data.
+"""
+import argparse
+import os
+import re
+import shutil
+
+import numpy as np
+import pandas as pd
+
+SOURCE_DIR = 'normalized csvs'
+# seasons spanned by the source data; copy k is shifted by k times this
+SEASON_SPAN = 17
+
+DICTIONARY_TABLES = ['players', 'teams', 'venue', 'umpire']
+MATCH_TABLES = ['match', 'match_teams', 'toss', 'match_result', 'umpire_match',
+                'player_of_the_match', 'dismissals', 'delivery']
+# player id columns of each table, remapped per copy
+PLAYER_COLUMNS = {
+    'delivery': ['batter_id', 'bowler_id', 'non_striker_id'],
+    'dismissals': ['fielder_id'],
+    'player_of_the_match': ['player_of_the_match_id'],
+}
+
+
+def shift_years(text, years):
+    """'2007/08' -> '2024/25', '2008-04-18' -> '2025-04-18' for years=17."""
+    def long_year(m):
+        return str(int(m.group(0)) + years)
+
+    def short_year(m):
+        return '/' + f"{(int(m.group(1)) + years) % 100:02d}"
+    return re.sub(r'/(\d\d)\b', short_year, re.sub(r'\b\d{4}\b', long_year, text))
+
+
+def id_stride(match_ids):
+    """Smallest power of ten above every source match id."""
+    return 10 ** len(str(int(match_ids.max())))
+
+
+def synthetic_copy(tables, k, stride, player_ids, rng):
+    """Copy k of the match-level tables."""
+    out = {}
+    years = k * SEASON_SPAN
+    remap = dict(zip(player_ids, rng.permutation(player_ids))) if k else None
+    for name in MATCH_TABLES:
+        df = tables[name].copy()
+        df['match_id'] += k * stride
+        if name == 'match' and years:
+            for col in ['season', 'date']:
+                labels = df[col].astype(str)
+                df[col] = labels.map({v: shift_years(v, years) for v in labels.unique()})
+        if remap:
+            for col in PLAYER_COLUMNS.get(name, []):
+                df[col] = df[col].map(remap)
+        out[name] = df
+    return out
+
+
+def generate(scale, out_dir, source_dir=SOURCE_DIR, seed=0):
+    """Write the source tables scale times over into out_dir."""
+    os.makedirs(out_dir, exist_ok=True)
+    for name in DICTIONARY_TABLES:
+        shutil.copyfile(os.path.join(source_dir, f'{name}.csv'), os.path.join(out_dir, f'{name}.csv'))
+    tables = {name: pd.read_csv(os.path.join(source_dir, f'{name}.csv')) for name in MATCH_TABLES}
+    stride = id_stride(tables['match']['match_id'])
+    if (scale - 1) * stride + tables['match']['match_id'].max() > np.iinfo(np.int32).max:
+        raise ValueError(f"scale {scale} overflows the int32 match ids")
+    player_ids = pd.read_csv(os.path.join(source_dir, 'players.csv'))['player_id'].to_numpy()
+    rng = np.random.default_rng(seed)
+    for k in range(scale):
+        copy = synthetic_copy(tables, k, stride, player_ids, rng)
+        for name, df in copy.items():
+            df.to_csv(os.path.join(out_dir, f'{name}.csv'), mode='w' if k == 0 else 'a',
+                      header=k == 0, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a scaled synthetic copy of the normalized CSVs")
+    parser.add_argument('--scale', type=int, default=10, help="copies of the source data (default: %(default)s)")
+    parser.add_argument('--out', help="output folder (default: 'synthetic csvs/x<scale>')")
+    parser.add_argument('--source', default=SOURCE_DIR, help="folder with the real CSVs (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=0, help="seed for the player shuffles (default: %(default)s)")
+    args = parser.parse_args(argv)
+    if args.scale < 1:
+        parser.error("--scale must be at least 1")
+    generate(args.scale, args.out or f'synthetic csvs/x{args.scale}', args.source, args.seed)
+
+
+if __name__ == "__main__":
+    main()
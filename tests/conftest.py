@@ -0,0 +1,94 @@
+"""Shared fixtures: a small, self-contained copy of the normalized CSVs.
+
+delivery.csv is not shipped, so the fixture keeps a few matches from each of
+three seasons of the real match-level tables and generates their balls
+(seeded, so every run sees the same data). Every dismissal of those matches
+falls on a generated ball, and overs run to 20 so every phase is covered.
+"""
+import os
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SOURCE_DIR = os.path.join(ROOT, 'normalized csvs')
+SEASONS = ['2007/08', '2009', '2011']
+MATCHES_PER_SEASON = 4
+DICTIONARY_TABLES = ['players', 'teams', 'venue', 'umpire']
+MATCH_TABLES = ['match', 'match_teams', 'toss', 'match_result', 'umpire_match',
+                'player_of_the_match', 'dismissals']
+DELIVERY_COLUMNS = ['match_id', 'inning', 'batting_team_id', 'bowling_team_id', 'over', 'ball',
+                    'batter_id', 'bowler_id', 'non_striker_id', 'batsman_runs', 'extra_runs', 'total_runs']
+
+
+def generate_deliveries(match, match_teams, toss, dismissals, player_ids, seed=0):
+    """Ball-by-ball rows for every match, with a wicket on each dismissal's ball."""
+    rng = np.random.default_rng(seed)
+    games = match[['match_id']].merge(match_teams, on='match_id').merge(toss, on='match_id')
+    wickets = {key: set(zip(g['over'], g['ball'])) for key, g in dismissals.groupby(['match_id', 'inning'])}
+    rows = []
+    for game in games.itertuples():
+        if game.toss_decision == 'bat':
+            first = game.toss_winner
+        else:
+            first = game.team_id2 if game.toss_winner == game.team_id1 else game.team_id1
+        second = game.team_id2 if first == game.team_id1 else game.team_id1
+        squads = {first: rng.choice(player_ids, 11, replace=False),
+                  second: rng.choice(player_ids, 11, replace=False)}
+        innings = sorted({1, 2} | {inning for (match_id, inning) in wickets if match_id == game.match_id})
+        for inning in innings:
+            bat, bowl = (first, second) if inning % 2 else (second, first)
+            falls = wickets.get((game.match_id, inning), set())
+            batters, bowlers = squads[bat], squads[bowl]
+            striker, non_striker, next_in = batters[0], batters[1], 2
+            for over in range(20 if inning <= 2 else 1):
+                bowler = bowlers[6 + over % 5]
+                for ball in range(1, max([6] + [b for (o, b) in falls if o == over]) + 1):
+                    runs = int(rng.choice([0, 1, 2, 3, 4, 6], p=[.38, .33, .07, .01, .14, .07]))
+                    extras = int(rng.random() < .05)
+                    rows.append((game.match_id, inning, bat, bowl, over, ball, striker, bowler,
+                                 non_striker, runs, extras, runs + extras))
+                    if (over, ball) in falls:
+                        striker, next_in = batters[next_in % 11], next_in + 1
+                    elif runs % 2:
+                        striker, non_striker = non_striker, striker
+                striker, non_striker = non_striker, striker
+    return pd.DataFrame(rows, columns=DELIVERY_COLUMNS)
+
+
+def write_dataset(out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    for name in DICTIONARY_TABLES:
+        shutil.copyfile(os.path.join(SOURCE_DIR, f'{name}.csv'), os.path.join(out_dir, f'{name}.csv'))
+    match = pd.read_csv(os.path.join(SOURCE_DIR, 'match.csv'), dtype={'season': str})
+    keep = match[match['season'].isin(SEASONS)].groupby('season').head(MATCHES_PER_SEASON)['match_id']
+    tables = {}
+    for name in MATCH_TABLES:
+        df = pd.read_csv(os.path.join(SOURCE_DIR, f'{name}.csv'))
+        tables[name] = df[df['match_id'].isin(keep)]
+        tables[name].to_csv(os.path.join(out_dir, f'{name}.csv'), index=False)
+    player_ids = pd.read_csv(os.path.join(SOURCE_DIR, 'players.csv'))['player_id'].to_numpy()
+    delivery = generate_deliveries(tables['match'], tables['match_teams'], tables['toss'],
+                                   tables['dismissals'], player_ids)
+    delivery.to_csv(os.path.join(out_dir, 'delivery.csv'), index=False)
+
+
+@pytest.fixture(scope='session')
+def source_dir(tmp_path_factory):
+    """The generated dataset; tests that write to their data use data_dir."""
+    out_dir = str(tmp_path_factory.mktemp('source'))
+    write_dataset(out_dir)
+    return out_dir
+
+
+@pytest.fixture
+def data_dir(source_dir, tmp_path):
+    """A private copy of the dataset that a test may rename or ingest into."""
+    out_dir = str(tmp_path / 'data')
+    shutil.copytree(source_dir, out_dir, ignore=shutil.ignore_patterns('.snapshot'))
+    return out_dir
@@ -0,0 +1,14 @@
+import json
+
+import benchmark
+import main_code
+
+
+def test_benchmark_runs_every_read_only_query(data_dir, tmp_path, capsys):
+    output = tmp_path / 'report.json'
+    benchmark.main(['--data-dir', data_dir, '--repeat', '1', '--output', str(output)])
+    report = json.loads(output.read_text())
+    assert len(report['queries']) == len(main_code.QUERIES) - len(main_code.RENAME_TAGS)
+    assert 'deliveries, loaded in' in capsys.readouterr().out
+    # the renames write the CSVs and are skipped even when asked for
+    assert [q['choice'] for q in benchmark.run(data_dir, 1, [1, 20, 21])['queries']] == [1]
@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+
+from csr_index import CSRIndex
+
+
+def test_rows_are_the_positions_holding_each_key_in_table_order():
+    values = np.array([5, 3, 5, 1, 3, 5])
+    index = CSRIndex(values)
+    assert index.rows(5).tolist() == [0, 2, 5]
+    assert index.count(3) == 2 and index.count(4) == 0
+    assert index.rows(4).tolist() == []
+    assert sorted(index.rows_many([1, 3]).tolist()) == [1, 3, 4]
+
+
+def test_categorical_columns_are_looked_up_by_label():
+    seasons = pd.Categorical(['2009', '2007/08', '2009', '2011'])
+    index = CSRIndex(seasons.codes, seasons.categories)
+    assert index.rows('2009').tolist() == [0, 2]
+    assert index.rows_many(['2007/08', '2011']).tolist() == [1, 3]
+    assert index.count('2030') == 0
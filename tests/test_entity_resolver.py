@@ -0,0 +1,46 @@
+from entity_resolver import EntityResolver, normalize_name
+
+NAMES = ['V Kohli', 'Virat Singh', 'MS Dhoni', 'Rahul', 'Rahul Sharma', 'Rahu',
+         'Wankhede Stadium', 'Wankhede Stadium', 'Wankhede Stadium, Mumbai', 'Eden Gardens', 'Eden Gardens']
+
+
+def make_resolver():
+    return EntityResolver(range(len(NAMES)), NAMES)
+
+
+def test_normalize_name_ignores_case_accents_and_punctuation():
+    assert normalize_name('  Sanjú  SAMSON. ') == 'sanju samson'
+
+
+def test_exact_then_unique_prefix_then_closest_typo():
+    resolver = make_resolver()
+    assert resolver.resolve('ms dhoni') == 2
+    assert resolver.resolve('dhoni') == 2
+    assert resolver.resolve('kohl') == 0
+    assert resolver.resolve('Dhonni') == 2
+
+
+def test_ambiguous_and_unknown_names_do_not_resolve():
+    resolver = make_resolver()
+    assert resolver.resolve('v') is None
+    assert resolver.resolve('zzzz') is None
+    assert resolver.resolve('kohli', exact=True) is None
+
+
+def test_candidates_rank_exact_then_prefix_then_fuzzy():
+    assert make_resolver().candidates('rahul') == ['Rahul', 'Rahul Sharma', 'Rahu']
+
+
+def test_ids_sharing_a_name_count_once():
+    resolver = make_resolver()
+    assert resolver.candidates('wankhede') == ['Wankhede Stadium', 'Wankhede Stadium, Mumbai']
+    assert resolver.complete('wank') == ['Wankhede Stadium', 'Wankhede Stadium, Mumbai']
+    assert resolver.resolve('wankhede stadium') == 6
+    assert resolver.resolve('eden') == 9
+
+
+def test_rename_reindexes():
+    resolver = make_resolver()
+    resolver.rename(2, 'Mahendra Dhoni')
+    assert resolver.resolve('mahendra') == 2
+    assert resolver.resolve('ms dhoni') is None
@@ -0,0 +1,61 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import etl
+
+RAW = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), etl.RAW_DIR, 'matches.csv')
+
+
+def raw_dir(tmp_path, rows=None):
+    """A raw folder holding matches.csv, or only its rows[start:stop]."""
+    folder = tmp_path / 'raw'
+    folder.mkdir(exist_ok=True)
+    if rows is None:
+        shutil.copyfile(RAW, folder / 'matches.csv')
+    else:
+        pd.read_csv(RAW).iloc[rows].to_csv(folder / 'matches.csv', index=False)
+    return str(folder)
+
+
+def outputs(out_dir):
+    return {name: open(os.path.join(out_dir, name), 'rb').read() for name in sorted(os.listdir(out_dir))}
+
+
+def test_rerun_is_byte_identical_whatever_the_workers(tmp_path):
+    raw = raw_dir(tmp_path)
+    out = str(tmp_path / 'out')
+    etl.run(raw, out, workers=1, lines=200)
+    first = outputs(out)
+    etl.run(raw, out, workers=1, lines=200)
+    assert outputs(out) == first
+    etl.run(raw, str(tmp_path / 'parallel'), workers=2, lines=150)
+    assert outputs(str(tmp_path / 'parallel')) == first
+
+
+def test_ids_survive_the_raw_data_growing(tmp_path):
+    out = str(tmp_path / 'out')
+    # the latest seasons first, so numbering the full file afresh would give other ids
+    etl.run(raw_dir(tmp_path, slice(-300, None)), out, workers=1)
+    names = ('teams.csv', 'venue.csv', 'umpire.csv', 'players.csv')
+    before = {name: pd.read_csv(os.path.join(out, name)) for name in names}
+    etl.run(raw_dir(tmp_path), out, workers=1)
+    for name, old in before.items():
+        new = pd.read_csv(os.path.join(out, name))
+        # every name keeps its id and new names are appended after them
+        assert len(new) > len(old)
+        pd.testing.assert_frame_equal(new.head(len(old)), old)
+    etl.run(raw_dir(tmp_path), str(tmp_path / 'fresh'), workers=1, fresh=True)
+    assert not pd.read_csv(tmp_path / 'fresh' / 'players.csv').head(len(before['players.csv'])) \
+        .equals(before['players.csv'])
+
+
+def test_fresh_needs_deliveries_once_delivery_csv_exists(tmp_path):
+    raw = raw_dir(tmp_path)
+    out = tmp_path / 'out'
+    etl.run(raw, str(out), workers=1, fresh=True)
+    (out / 'delivery.csv').write_text('match_id\n')
+    with pytest.raises(ValueError):
+        etl.run(raw, str(out), workers=1, fresh=True)
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import main_code
+
+
+def csv_columns(name):
+    return list(pd.read_csv(f'{main_code.loaded_dir}/{name}.csv', nrows=0).columns)
+
+
+def new_match_rows(new_id, season, date):
+    """The rows of the last loaded match under a new id, season and date."""
+    source_id = main_code.match['match_id'].iloc[-1]
+    tables = {}
+    for name in main_code.INGEST_TABLES:
+        rows = main_code.loaded(name)
+        rows = rows.loc[rows['match_id'] == source_id, [c for c in rows.columns if c in csv_columns(name)]].copy()
+        rows['match_id'] = new_id
+        if name == 'match':
+            rows['season'] = season
+            rows['date'] = date
+        tables[name] = rows.astype(object).where(rows.notna(), None).to_dict('records')
+    return tables
+
+
+def assert_stores_match_rebuild():
+    if main_code.profiles is not None:
+        seasons, career = main_code.player_profiles(main_code.delivery)
+        pd.testing.assert_frame_equal(main_code.profiles[0], seasons, check_categorical=False)
+        pd.testing.assert_frame_equal(main_code.profiles[1], career)
+    if main_code.matchup_tables is not None:
+        pairs, splits = main_code.matchups(main_code.delivery)
+        pd.testing.assert_frame_equal(main_code.matchup_tables[0], pairs)
+        pd.testing.assert_frame_equal(main_code.matchup_tables[1], splits, check_categorical=False)
+    if main_code.cube is not None:
+        pd.testing.assert_frame_equal(main_code.cube, main_code.phase_cube(main_code.delivery),
+                                      check_categorical=False)
+    if main_code.team_arrays is not None:
+        rebuilt = main_code.team_aggregates(main_code.match, main_code.match_teams,
+                                            main_code.match_result, main_code.toss)
+        for key, values in rebuilt.items():
+            assert np.array_equal(np.asarray(main_code.team_arrays[key]), np.asarray(values)), key
+
+
+def build_stores():
+    main_code.profile_store()
+    main_code.matchup_store()
+    main_code.cube_store()
+    main_code.team_store()
+
+
+@pytest.mark.parametrize('season, date, kept', [('2011', '2011-05-30', True), ('2030', '2030-04-01', False)])
+def test_ingest_matches_full_rebuild(data_dir, season, date, kept):
+    main_code.load_data(data_dir)
+    build_stores()
+    balls = len(main_code.delivery)
+    added = main_code.ingest_match(new_match_rows(9000001, season, date))
+    assert len(main_code.delivery) == balls + added['delivery']
+    # a season the stores have seen is added in place; a new one drops them
+    assert (main_code.profiles is not None) == kept
+    assert_stores_match_rebuild()
+    build_stores()
+    assert_stores_match_rebuild()
+
+
+def test_ingested_match_survives_a_reload(data_dir):
+    main_code.load_data(data_dir)
+    main_code.ingest_match(new_match_rows(9000001, '2011', '2011-05-30'))
+    main_code.ingest_match(new_match_rows(9000002, '2030', '2030-04-01'))
+    ingested = main_code.delivery
+    main_code.load_data(data_dir)
+    pd.testing.assert_frame_equal(main_code.delivery, ingested, check_categorical=False, check_dtype=False)
+    assert (main_code.match['match_id'] == 9000002).sum() == 1
+
+
+def test_ingest_rejects_a_loaded_match(data_dir):
+    main_code.load_data(data_dir)
+    rows = new_match_rows(9000001, '2011', '2011-05-30')
+    main_code.ingest_match(rows)
+    with pytest.raises(ValueError):
+        main_code.ingest_match(rows)
+
+
+def csv_bytes():
+    return {name: open(f'{main_code.loaded_dir}/{name}.csv', 'rb').read() for name in main_code.INGEST_TABLES}
+
+
+@pytest.mark.parametrize('table, rows', [('delivery', None), ('toss', 'x'), ('dismissals', 'ball')])
+def test_rejected_match_leaves_the_csvs_unchanged(data_dir, table, rows):
+    main_code.load_data(data_dir)
+    tables = new_match_rows(9000001, '2011', '2011-05-30')
+    if rows == 'ball':
+        # a dismissal on a ball the match never bowled
+        tables[table][0]['over'] = 99
+    else:
+        tables[table] = rows
+    before = csv_bytes()
+    with pytest.raises(ValueError):
+        main_code.ingest_match(tables)
+    assert csv_bytes() == before
+    assert not (main_code.match['match_id'] == 9000001).any()
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+import main_code
+
+
+def innings(match_id, inning, pairs, runs, wickets):
+    """Balls of one innings: (batter, non_striker) pairs, runs and wicket flags per ball."""
+    n = len(pairs)
+    over, ball = np.divmod(np.arange(n), 6)
+    return pd.DataFrame({
+        'season': '2009', 'match_id': match_id, 'inning': inning, 'batting_team_id': inning,
+        'over': over, 'ball': ball + 1,
+        'batter_id': [p[0] for p in pairs], 'non_striker_id': [p[1] for p in pairs],
+        'total_runs': runs, 'is_wicket': wickets,
+    })
+
+
+def test_pair_batting_twice_in_an_innings_is_two_partnerships():
+    first = innings(1, 1, [(1, 2), (2, 1), (1, 2), (3, 1), (1, 3), (2, 1), (1, 2)],
+                    [1, 4, 0, 6, 1, 2, 3], [False, False, True, False, True, False, False])
+    second = innings(1, 2, [(7, 8), (8, 7)], [0, 4], [False, False])
+    delivery = pd.concat([second, first], ignore_index=True)
+    delivery['ball_key'] = main_code.ball_key(delivery['match_id'], delivery['inning'],
+                                              delivery['over'], delivery['ball'])
+    parts = main_code.partnerships(delivery)
+    assert parts[['inning', 'wicket', 'p1', 'p2', 'runs', 'balls']].values.tolist() == [
+        [1, 1, 1, 2, 5, 3],
+        [1, 2, 1, 3, 7, 2],
+        # the second wicket's batter retired and came back: a new stand for the same pair
+        [1, 3, 1, 2, 5, 2],
+        [2, 1, 7, 8, 4, 2],
+    ]
+    top = main_code.top_partnerships(parts, 'inning')
+    assert top[['inning', 'runs']].values.tolist() == [[1, 7], [2, 4]]
+
+
+def test_partnerships_add_up_to_every_innings(data_dir):
+    main_code.load_data(data_dir)
+    d = main_code.delivery
+    parts = main_code.partnerships(d)
+    totals = d.groupby(['match_id', 'inning'], observed=True)['total_runs'].agg(['sum', 'size'])
+    summed = parts.groupby(['match_id', 'inning'], observed=True)[['runs', 'balls']].sum()
+    assert summed['runs'].tolist() == totals['sum'].tolist()
+    assert summed['balls'].tolist() == totals['size'].tolist()
+    wickets = d.groupby(['match_id', 'inning'], observed=True)['is_wicket'].sum()
+    # a new stand starts only after a wicket
+    assert (parts.groupby(['match_id', 'inning'], observed=True).size() <= wickets + 1).all()
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+import main_code
+
+
+def test_season_awards_match_a_groupby(data_dir):
+    main_code.load_data(data_dir)
+    d = main_code.delivery
+    match = main_code.match.copy()
+    final = match.index[match['season'] == '2009'][-1]
+    match['match_type'] = match['match_type'].astype(object)
+    match.loc[final, 'match_type'] = 'Final'
+    awards = main_code.season_awards(d, match, main_code.match_result, main_code.match_teams)
+
+    for stat, by, values in [('orange_cap', 'batter_id', d['batsman_runs']),
+                             ('purple_cap', 'bowler_id', d['bowler_wicket']),
+                             ('most_fours', 'batter_id', d['batsman_runs'] == 4),
+                             ('most_sixes', 'batter_id', d['batsman_runs'] == 6),
+                             ('most_dot_balls', 'bowler_id', d['total_runs'] == 0)]:
+        totals = values.astype(np.int64).groupby([d['season'], d[by]], observed=True).sum()
+        assert awards[stat].tolist() == totals.groupby(level=0, observed=True).max().tolist(), stat
+        for season, row in awards.iterrows():
+            assert totals[(season, row[f'{stat}_id'])] == row[stat], stat
+
+    final_id = match.loc[final, 'match_id']
+    winner = main_code.match_result.set_index('match_id').loc[final_id, 'winner_id']
+    teams = main_code.match_teams.set_index('match_id').loc[final_id, ['team_id1', 'team_id2']].tolist()
+    assert awards.loc['2009', 'winner_id'] == winner
+    assert awards.loc['2009', 'runner_up_id'] == next(t for t in teams if t != winner)
+    # a season without a final has no winner
+    assert pd.isna(awards.loc['2011', 'winner_id']) and pd.isna(awards.loc['2011', 'runner_up_id'])
+
+
+def test_first_innings_average_leaves_out_abandoned_matches(data_dir):
+    main_code.load_data(data_dir)
+    d = main_code.delivery
+    venue_id = main_code.match['venue_id'].value_counts().idxmax()
+    games = main_code.match.loc[main_code.match['venue_id'] == venue_id, 'match_id'].tolist()
+    assert len(games) > 1
+    abandoned = games[0]
+    result = main_code.match_result
+    result.loc[result['match_id'] == abandoned, 'winner_id'] = pd.NA
+    main_code.venue_tables = None
+
+    first = d[(d['inning'] == 1) & d['match_id'].isin(games[1:])].groupby('match_id')['total_runs'].sum()
+    venue_name = main_code.resolvers['venue'].name(int(venue_id))
+    summary = dict(main_code.venue_first_innings_average(venue_name)['summary'])
+    assert summary['Total matches played'] == len(games)
+    assert summary['Matches counted (abandoned excluded)'] == len(games) - 1
+    assert summary['Average first innings score'] == f"{first.mean():.2f}"
+    ranked = main_code.venue_first_innings_report()['rows']
+    assert ranked.loc[ranked['venue'] == venue_name, 'innings'].tolist() == [len(games) - 1]
+
+
+def per_innings(balls, column):
+    """Per-season total of column divided by the innings the balls come from."""
+    innings = balls.drop_duplicates(['match_id', 'inning']).groupby('season', observed=True).size()
+    return (balls.groupby('season', observed=True)[column].sum() / innings).tolist()
+
+
+def test_powerplay_averages_leave_out_super_overs(data_dir):
+    main_code.load_data(data_dir)
+    d = main_code.delivery
+    team_id = int(d['batting_team_id'].iloc[0])
+    team = main_code.resolvers['team'].name(team_id)
+    powerplay = d[(d['over'] < 6) & d['inning'].isin([1, 2])]
+    expected_runs = per_innings(powerplay[powerplay['batting_team_id'] == team_id], 'total_runs')
+    expected_wickets = per_innings(powerplay[powerplay['bowling_team_id'] == team_id], 'is_wicket')
+
+    # a super over for each side of the team's first match, with a wicket on every ball
+    game = d[(d['match_id'] == d['match_id'].iloc[0]) & (d['over'] == 0) & d['inning'].isin([1, 2])].copy()
+    game['inning'] = (game['inning'] + 2).astype(d['inning'].dtype)
+    game['total_runs'] = game['batsman_runs'] = np.int8(6)
+    game['is_wicket'] = game['bowler_wicket'] = True
+    game['ball_key'] = main_code.ball_key(game['match_id'], game['inning'], game['over'], game['ball'])
+    main_code.delivery = pd.concat([d, game], ignore_index=True)
+    main_code.cube = None
+
+    for choice, stat, expected in [(13, 'runs', expected_runs), (14, 'dismissals', expected_wickets)]:
+        rows = main_code.run_query(choice, {'team': team, 'phase': 'powerplay'})[0]['rows']
+        assert rows['average'].tolist() == expected, stat
@@ -0,0 +1,42 @@
+import main_code
+from query_cache import QueryCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = QueryCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_invalidate_drops_only_tagged_entries():
+    cache = QueryCache()
+    cache.put('teams', 1, {'team'})
+    cache.put('both', 2, {'team', 'venue'})
+    cache.put('venues', 3, {'venue'})
+    cache.put('players', 4)
+    assert cache.invalidate('team') == 2
+    assert cache.get('teams') is None and cache.get('both') is None
+    assert cache.get('venues') == 3 and cache.get('players') == 4
+
+
+def test_team_rename_evicts_only_team_results(data_dir):
+    main_code.load_data(data_dir)
+    old_name = main_code.teams['team'].iloc[0]
+    calls = {1: {}, 2: {}, 4: {}}
+    for choice, params in calls.items():
+        main_code.run_query(choice, params)
+    keys = {choice: main_code.cache_key(choice, params, main_code.QUERIES[choice][2])
+            for choice, params in calls.items()}
+
+    result, _ = main_code.run_query(20, {'old_name': old_name, 'new_name': 'Renamed XI'})
+    assert result['ok']
+    assert main_code.cache.get(keys[1]) is None
+    assert main_code.cache.get(keys[2]) is not None
+    assert main_code.cache.get(keys[4]) is not None
+    teams, _ = main_code.run_query(1, {})
+    assert 'Renamed XI' in teams['rows']['value'].tolist()
@@ -0,0 +1,26 @@
+import pandas as pd
+import pytest
+
+import main_code
+
+
+def old_mask(series, season_input):
+    """The row scan season_mask_from_input replaced."""
+    s = str(season_input).strip()
+    if s == "":
+        return pd.Series(True, index=series.index)
+    if s.isdigit():
+        return series.astype(str).str.contains(s)
+    return series.astype(str) == s
+
+
+@pytest.mark.parametrize('season_input', ['2009', '2007/08', '2008', '08', '20', '2011 ', '', '2030', 'x', '2009/10'])
+def test_season_partition_matches_the_old_mask(data_dir, season_input):
+    main_code.load_data(data_dir)
+    d = main_code.delivery
+    expected = old_mask(d['season'], season_input).to_numpy()
+    assert (main_code.season_mask_from_input(d['season'], season_input).to_numpy() == expected).all()
+    assert main_code.season_partition(season_input).index.tolist() == d.index[expected].tolist()
+    m = main_code.match
+    assert (main_code.season_mask_from_input(m['season'], season_input).to_numpy()
+            == old_mask(m['season'], season_input).to_numpy()).all()
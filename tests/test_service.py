@@ -0,0 +1,51 @@
+import asyncio
+import threading
+import time
+from http import HTTPStatus
+from urllib.parse import quote
+
+import main_code
+from service import ROUTES, QueryService, ReadWriteLock
+
+
+def test_waiting_writer_holds_back_new_readers():
+    lock = ReadWriteLock()
+    lock.acquire_read()
+    order = []
+    writer = threading.Thread(target=lambda: (lock.acquire_write(), order.append('write'), lock.release_write()))
+    writer.start()
+    while not lock._waiting_writers:
+        time.sleep(0.001)
+    reader = threading.Thread(target=lambda: (lock.acquire_read(), order.append('read'), lock.release_read()))
+    reader.start()
+    reader.join(0.2)
+    assert reader.is_alive() and order == []
+    lock.release_read()
+    writer.join(5)
+    reader.join(5)
+    assert order == ['write', 'read']
+
+
+def request(service, method, target, body=b''):
+    return asyncio.run(service.dispatch(method, target, body))
+
+
+def test_dispatch_round_trip(data_dir):
+    main_code.load_data(data_dir)
+    service = QueryService(workers=2)
+    status, payload = request(service, 'GET', '/teams?limit=2')
+    assert status == HTTPStatus.OK and payload['choice'] == 1
+    assert payload['result']['total_rows'] == len(main_code.teams)
+    assert len(payload['result']['rows']) == 2
+    player = main_code.resolvers['player'].name(int(main_code.delivery['batter_id'].iloc[0]))
+    status, payload = request(service, 'GET', f"/players/{quote(player)}/teams")
+    assert status == HTTPStatus.OK and payload['params'] == {'player': player}
+    assert payload['result']['ok']
+    assert request(service, 'GET', '/nowhere')[0] == HTTPStatus.NOT_FOUND
+    assert request(service, 'GET', '/teams?limit=x')[0] == HTTPStatus.BAD_REQUEST
+    assert request(service, 'POST', '/matches', b'[1]')[0] == HTTPStatus.BAD_REQUEST
+
+
+def test_routes_point_at_queries_and_exit_keeps_its_number():
+    assert main_code.EXIT_CHOICE == 35 and main_code.EXIT_CHOICE not in main_code.QUERIES
+    assert {choice for _, _, choice in ROUTES} <= set(main_code.QUERIES)
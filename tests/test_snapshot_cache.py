@@ -0,0 +1,60 @@
+import os
+
+import pandas as pd
+import pytest
+
+from schema import TABLE_DTYPES
+from snapshot_cache import append_rows, apply_dtypes, is_fresh, load_table
+
+
+def assert_same_frame(loaded, expected, check_categorical=True):
+    # copy() turns memory-mapped columns into plain arrays
+    pd.testing.assert_frame_equal(loaded.copy(), expected, check_categorical=check_categorical)
+    for col in expected.columns:
+        assert loaded[col].dtype == expected[col].dtype, col
+        if isinstance(expected[col].dtype, pd.CategoricalDtype):
+            assert loaded[col].cat.categories.dtype == expected[col].cat.categories.dtype, col
+
+
+def test_snapshot_load_matches_csv_load(data_dir):
+    for name, dtypes in TABLE_DTYPES.items():
+        csv_path = os.path.join(data_dir, f'{name}.csv')
+        parsed = load_table(csv_path, dtypes)
+        assert is_fresh(csv_path), name
+        assert_same_frame(load_table(csv_path, dtypes), parsed)
+
+
+def test_numeric_categories_keep_their_dtype(tmp_path):
+    csv_path = str(tmp_path / 'scores.csv')
+    pd.DataFrame({'inning': [1, 2, 1, 3], 'margin': [2.5, None, 2.5, 7.0],
+                  'season': ['2017', '2017/18', None, '2009']}).to_csv(csv_path, index=False)
+    dtypes = {'inning': 'category', 'margin': 'category', 'season': 'category'}
+    parsed = load_table(csv_path, dtypes)
+    mapped = load_table(csv_path, dtypes)
+    assert_same_frame(mapped, parsed)
+    assert (mapped['inning'] == 1).sum() == 2
+
+
+def test_appended_rows_match_the_csv(tmp_path):
+    csv_path = str(tmp_path / 'scores.csv')
+    pd.DataFrame({'inning': [1, 2], 'kind': ['caught', None], 'runs': [4, 6]}).to_csv(csv_path, index=False)
+    dtypes = {'inning': 'category', 'kind': 'category', 'runs': 'int8'}
+    load_table(csv_path, dtypes)
+    append_rows({csv_path: pd.DataFrame({'inning': [3], 'kind': ['bowled'], 'runs': [1]})})
+    assert is_fresh(csv_path)
+    # an appended part's new categories go after the existing ones
+    assert_same_frame(load_table(csv_path, dtypes), apply_dtypes(pd.read_csv(csv_path), dtypes),
+                      check_categorical=False)
+
+
+def test_failed_append_leaves_every_csv_as_it_was(tmp_path):
+    csv_path = str(tmp_path / 'scores.csv')
+    pd.DataFrame({'inning': [1, 2], 'runs': [4, 6]}).to_csv(csv_path, index=False)
+    load_table(csv_path, {'inning': 'category'})
+    before = open(csv_path).read()
+    rows = pd.DataFrame({'inning': [3], 'runs': [1]})
+    with pytest.raises(OSError):
+        append_rows({csv_path: rows, str(tmp_path / 'missing.csv'): rows})
+    assert open(csv_path).read() == before
+    assert is_fresh(csv_path)
+    assert sorted(os.listdir(tmp_path)) == ['.snapshot', 'scores.csv']
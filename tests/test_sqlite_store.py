@@ -0,0 +1,44 @@
+import os
+
+import pandas as pd
+import pytest
+
+import main_code
+import sqlite_store
+from query_engine import SqlSource
+
+SPECS = [
+    {'by': ['season'], 'metrics': ['runs', 'total_runs', 'balls', 'wickets', 'dismissals', 'fours', 'sixes', 'dots']},
+    {'by': ['season', 'phase'], 'metrics': ['strike_rate', 'economy', 'average', 'bowling_average']},
+    {'where': {'phase': ['death']}, 'by': ['batting_team'], 'metrics': ['runs', 'boundaries', 'dot_percentage']},
+    {'where': {'season': ['2009']}, 'by': ['bowler'], 'metrics': ['economy', 'balls'], 'min': {'balls': 12}},
+    {'where': {'inning': ['1']}, 'by': ['venue', 'bowling_team'], 'metrics': ['wickets', 'runs']},
+    {'metrics': ['runs', 'balls', 'wickets']},
+]
+
+
+def report(spec):
+    rows, plan = main_code.run_report(spec)
+    rows = rows.astype({col: str for col in spec.get('by', []) if col in ('season', 'phase')})
+    return rows.sort_values(spec.get('by') or list(rows.columns)).reset_index(drop=True), plan
+
+
+@pytest.mark.parametrize('spec', SPECS)
+def test_sql_reports_match_in_memory_reports(data_dir, tmp_path, spec):
+    main_code.load_data(data_dir)
+    expected, _ = report(spec)
+    main_code.load_data(data_dir, lazy=True, sqlite=str(tmp_path / 'ipl.sqlite'))
+    got, plan = report(spec)
+    assert isinstance(plan.source, SqlSource)
+    assert main_code.delivery is None
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+
+
+def test_database_is_rebuilt_when_a_csv_changes(data_dir, tmp_path):
+    db_path = str(tmp_path / 'ipl.sqlite')
+    sqlite_store.open_database(data_dir, db_path)
+    assert sqlite_store.is_fresh(data_dir, db_path)
+    os.utime(os.path.join(data_dir, 'teams.csv'), ns=(1, 1))
+    assert not sqlite_store.is_fresh(data_dir, db_path)
+    sqlite_store.open_database(data_dir, db_path)
+    assert sqlite_store.is_fresh(data_dir, db_path)